@@ -0,0 +1,81 @@
+"""CLI 시작 시간 회귀 벤치마크 (python -X importtime)
+
+main 모듈을 가져오는 데 걸린 누적 시간과 무거운 의존성(Selenium 등)을 가져왔는지 확인한다.
+예산을 넘거나 금지된 모듈을 가져오면 종료 코드 1.
+
+    python -m benchmarks.import_time [--budget-ms 300] [--runs 5]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 크롤링 작업을 실행할 때만 필요한 모듈 (main을 가져올 때 로드되면 안 됨)
+HEAVY_MODULES = ("selenium", "webdriver_manager", "requests", "tqdm", "psutil")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def measure_import(module="main"):
+    """-X importtime 출력 파싱: (모듈 누적 시간(us), 로드된 모듈 목록별 누적 시간)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules.get(module, 0), modules
+
+
+def measure_help():
+    """'main.py --help' 실행 전체 시간(초)"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "main.py", "--help"], cwd=ROOT, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="main 가져오기 누적 시간 예산 (ms)")
+    parser.add_argument("--runs", type=int, default=5, help="측정 횟수 (중앙값 사용)")
+    options = parser.parse_args()
+
+    totals = []
+    modules = {}
+    for _ in range(options.runs):
+        total, modules = measure_import()
+        totals.append(total)
+    totals.sort()
+    median_ms = totals[len(totals) // 2] / 1000
+
+    heavy = sorted(name for name in modules if name.split(".")[0] in HEAVY_MODULES)
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+
+    print(f"import main: {median_ms:.1f}ms (중앙값, {options.runs}회)")
+    print(f"main.py --help: {measure_help() * 1000:.0f}ms")
+    print("누적 시간 상위 모듈:")
+    for name, cumulative in slowest:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failed = False
+    if heavy:
+        print(f"무거운 모듈을 가져옴: {', '.join(heavy[:10])}")
+        failed = True
+    if median_ms > options.budget_ms:
+        print(f"예산 초과: {median_ms:.1f}ms > {options.budget_ms:.0f}ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""리뷰 모델 메모리/생성 속도 마이크로벤치마크
+
+기존 방식(속성 딕셔너리 + 행마다 딕셔너리를 거치는 from_dict)과
+슬롯 모델의 from_row를 같은 행 데이터로 비교한다.
+
+    python -m benchmarks.model_memory [리뷰 수]
+"""
+import time
+import tracemalloc
+from datetime import datetime
+
+import sys
+
+from data.review_model import Review
+
+
+class DictReview:
+    """슬롯 도입 전 Review와 같은 구조 (비교용)"""
+
+    def __init__(self):
+        self.review_id = ""
+        self.asin = ""
+        self.title = ""
+        self.rating = 0.0
+        self.date = ""
+        self.reviewer_name = ""
+        self.verified_purchase = False
+        self.body = ""
+        self.helpful_count = 0
+        self.crawl_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @classmethod
+    def from_dict(cls, data):
+        review = cls()
+        for key, value in data.items():
+            if hasattr(review, key):
+                setattr(review, key, value)
+        return review
+
+
+def make_rows(count):
+    """DB에서 읽은 것과 같은 형태의 리뷰 행"""
+    return [
+        (f"R{i:012d}", "B000000001", "Great product", 5.0, "Reviewed on January 1, 2025",
+         "Reviewer", 1, "Body text", i % 7, "2025-01-01 00:00:00")
+        for i in range(count)
+    ]
+
+
+def measure(label, build, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = build(rows)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {current / len(rows):8.1f} bytes/review  {elapsed * 1e6 / len(rows):6.2f} us/review")
+    return objects
+
+
+def build_dict_reviews(rows):
+    columns = Review.COLUMNS
+    return [DictReview.from_dict(dict(zip(columns, row))) for row in rows]
+
+
+def build_slotted_reviews(rows):
+    from_row = Review.from_row
+    return [from_row(row) for row in rows]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = make_rows(count)
+    print(f"리뷰 {count}개 (행 데이터 자체의 메모리는 제외)")
+    measure("dict + from_dict", build_dict_reviews, rows)
+    measure("__slots__ + from_row", build_slotted_reviews, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,105 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = os.path.join(BASE_DIR, "data_output")
 LOG_DIR = os.path.join(BASE_DIR, "logs")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
 
 # 데이터베이스 설정
 DATABASE = {
     "type": "sqlite",  # sqlite, mysql, postgresql 등
     "path": os.path.join(DATA_DIR, "amazon_data.db"),
+    "read_batch_size": 1000,  # iter_reviews/iter_products가 한 번에 읽는 행 수
+    "compress_min_bytes": 256,  # 이 크기 이상의 JSON 열은 zlib 압축 블롭으로 저장
+    "review_fts": True,  # 리뷰 제목/본문 전문 검색 색인 (FTS5, SQLite에 없으면 생략)
+    "fts_tokenizer": "porter unicode61 remove_diacritics 2",  # 영어 어간 추출 + 유니코드 단어 분리
+    "fts_weights": (2.0, 1.0),  # bm25 순위 계산 시 제목, 본문 가중치
+}
+
+# 로그 설정 (파일/콘솔 출력은 백그라운드 스레드 하나가 처리)
+LOGGING = {
+    "level": os.environ.get("AMZN_LOG_LEVEL", "INFO"),
+    "format": os.environ.get("AMZN_LOG_FORMAT", "text"),  # text 또는 json (JSON Lines)
+    "console": True,
+    "max_bytes": 10 * 1024 * 1024,  # 로그 파일 회전 크기
+    "backup_count": 5,  # 보관할 이전 로그 파일 수
 }
 
 # 브라우저 설정
 BROWSER = {
-    "headless": False,  # 헤드리스 모드 여부
+    "profile": os.environ.get("AMZN_BROWSER_PROFILE", "server"),  # 브라우저 프로필 (BROWSER_PROFILES 키)
     "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-    "window_size": (1920, 1080),
     "implicitly_wait": 3,  # 암시적 대기 시간(초) - 값 축소
     "page_load_timeout": 15,  # 페이지 로드 타임아웃(초) - 값 축소
+    "driver_cache_path": os.path.join(CACHE_DIR, "chromedriver.json"),  # 크롬드라이버 경로 캐시
+    "driver_cache_max_age": 7 * 24 * 3600,  # 크롬 버전 확인 불가 시 캐시 유효 기간(초)
+    "prewarm_sessions": 1,  # 백그라운드에서 미리 띄워 둘 브라우저 세션 수
+    "max_sessions": 4,  # 세션 풀 최대 크기
+}
+
+# 브라우저 프로필
+BROWSER_PROFILES = {
+    # 로컬 실행용 (브라우저 창 표시)
+    "desktop": {
+        "headless": False,
+        "window_size": (1920, 1080),
+        "extra_args": [],
+    },
+    # 크롤링 서버용 (헤드리스, 세션당 메모리 최소화)
+    "server": {
+        "headless": True,
+        "window_size": (1280, 800),
+        "extra_args": [
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+            "--metrics-recording-only",
+            "--mute-audio",
+            "--no-first-run",
+            "--renderer-process-limit=2",  # 렌더러 프로세스 수 제한
+            "--disk-cache-size=33554432",  # 디스크 캐시 32MB
+            "--media-cache-size=1",
+            "--js-flags=--max-old-space-size=256",
+        ],
+    },
+}
+
+# 장시간 실행 메모리 관리 (세션 재시작, 누수 추적)
+MEMORY = {
+    "sample_every": 20,  # 세션당 이 페이지 수마다 크롬/파이썬 RSS 측정
+    "max_session_rss_mb": 1500,  # 크롬 세션 RSS가 이 값을 넘으면 쿠키를 유지한 채 브라우저 재시작
+    "max_session_pages": 400,  # 세션당 최대 페이지 수 (넘으면 재시작, 0이면 제한 없음)
+    "tracemalloc": os.getenv("AMZN_TRACEMALLOC", "") == "1",  # 파이썬 할당 위치별 증가량 추적 (오버헤드 있음)
+    "tracemalloc_top": 10,  # 보고서에 기록할 증가량 상위 할당 위치 수
+    "trend_points": 500,  # 실행 보고서에 남길 RSS 추이 최대 지점 수
+}
+
+# 리소스 차단 정책 (이미지/폰트/미디어/광고·분석 도메인)
+RESOURCE_POLICY = {
+    "enabled": True,
+    "page_load_strategy": "eager",  # DOMContentLoaded 시점에 제어 반환
+    "block_images": True,  # 이미지 URL은 src 속성만 사용하므로 실제 다운로드 불필요
+    "block_fonts": True,
+    "block_media": True,
+    "blocked_domains": [
+        "doubleclick.net",
+        "googlesyndication.com",
+        "google-analytics.com",
+        "googletagmanager.com",
+        "amazon-adsystem.com",
+        "fls-na.amazon.com",
+        "unagi.amazon.com",
+        "aax-us-east.amazon.com",
+        "facebook.net",
+        "scorecardresearch.com",
+    ],
+    # 페이지 유형별 허용 리소스 (product, review, store, search, login, captcha, other)
+    "allow": {
+        "login": ["images"],
+        "captcha": ["images"],
+    },
 }
 
 # 크롤링 설정
@@ -27,12 +112,72 @@ CRAWLING = {
         "min": 0.5,  # 최소 지연 시간(초) - 값 축소
         "max": 1.5,  # 최대 지연 시간(초) - 값 축소
     },
+    # 실패 분류별 재시도 (대기 시간 = base_delay × backoff_factor^시도, 최대 max_delay, ±jitter)
     "retry": {
-        "max_attempts": 2,  # 최대 재시도 횟수 - 값 축소
-        "backoff_factor": 1.5,  # 재시도 간격 증가 인자 - 값 축소
+        "jitter": 0.2,
+        "transient": {"max_attempts": 2, "base_delay": 1.0, "backoff_factor": 1.5, "max_delay": 30},  # 타임아웃, stale 요소, 빈 페이지
+        "block": {"max_attempts": 0},  # 캡차/로그인/503: 세션 안에서 재시도하지 않음 (스케줄러가 지연 후 재시도)
+        "permanent": {"max_attempts": 0},  # 없는 상품, 잘못된 URL
+    },
+    # 호스트 + 페이지 유형별 차단기 (실패가 몰리면 잠시 요청 중단)
+    "circuit_breaker": {
+        "enabled": True,
+        "window": 20,  # 실패 비율 계산에 쓰는 최근 요청 수
+        "min_calls": 8,  # 판단에 필요한 최소 요청 수
+        "failure_rate": 0.6,  # 이 비율 이상 실패하면 차단
+        "cooldown": 60,  # 첫 차단 시간(초), 시험 요청이 실패할 때마다 두 배
+        "max_cooldown": 900,
     },
     "max_products": 100,  # 스토어당 최대 상품 수집 수
     "max_reviews": 100,  # 상품당 최대 리뷰 수집 수
+    "review_pagination": "parallel",  # parallel: pageNumber URL로 병렬 수집, sequential: 다음 버튼 클릭
+    "review_page_size": 10,  # 리뷰 페이지당 리뷰 수
+    "review_parallel_sessions": 3,  # 리뷰 페이지 병렬 수집에 사용할 최대 세션 수 (작업 세션 포함)
+    "store_scroll_pause": 0.8,  # 스토어 스크롤 단계 간 대기 시간(초)
+    "store_scroll_stall_steps": 2,  # 신규 상품 없이 이 횟수만큼 스크롤하면 중단
+    "store_scroll_max_steps": 60,  # 스토어 페이지당 최대 스크롤 횟수
+    "store_follow_tabs": True,  # 스토어 하위 페이지 탭도 수집
+    "store_max_tabs": 20,  # 최대 하위 페이지 수
+    "refetch_after": 24 * 3600,  # 이 시간(초) 이내에 수집한 ASIN은 다시 수집하지 않음
+    "single_flight_wait": 600,  # 다른 작업자가 수집 중인 같은 상품을 기다리는 최대 시간(초)
+    "result_cache_ttl": 1800,  # 실행 중 수집 결과 재사용 시간(초)
+    "result_cache_size": 2000,  # 캐시할 최대 결과 수
+}
+
+# 필드 추출 상태 감시 (페이지 구조 변경 감지)
+EXTRACTION = {
+    "window": 50,  # 필드별 성공률을 계산할 최근 추출 수
+    "min_samples": 20,  # 판단에 필요한 최소 추출 수
+    "min_hit_rate": 0.3,  # 필수 필드 성공률이 이 값 아래로 떨어지면 크롤링 중단
+    "required": {
+        "product": ["title", "price"],  # price는 구매 상자가 있는 상품에서만 기록 (품절 상품 제외)
+        "review": ["rating", "body"],
+    },
+    "dead_selector_after": 40,  # 한 번도 맞지 않은 채 이 횟수만큼 시도한 선택자는 건너뜀
+    "dead_selector_probe_every": 25,  # 건너뛴 선택자도 이 횟수마다 한 번씩 다시 시도
+    "snapshot_pages": 5,  # 진단 스냅샷에 남길 최근 실패 페이지 수
+}
+
+# 작업 스케줄러 설정 (배치 실행)
+SCHEDULER = {
+    "workers": 1,  # 동시 실행 작업 수 (작업자당 브라우저 세션 1개)
+    "max_attempts": 3,  # 예외로 실패한 작업의 최대 시도 횟수
+    "requeue_delay": 30,  # 실패 작업 재시도 대기 시간(초)
+    # 작업 종류별 제한 시간(초). 넘기면 워치독이 세션을 강제 종료하고 작업을 다시 큐에 넣음
+    "job_deadline": {"store": 1800, "product": 300, "reviews": 1800, "default": 900},
+    "watchdog_interval": 5,  # 워치독 확인 주기(초)
+    "stuck_factor": 3,  # 완료 시간 중앙값의 이 배수를 넘기면 멈춘 세션으로 기록
+    "stuck_min_samples": 5,  # 중앙값 계산에 필요한 최소 완료 작업 수
+}
+
+# 캡차/로그인 요구 처리
+CHALLENGE = {
+    "block_for_operator": False,  # True면 기존처럼 콘솔 입력을 기다림 (desktop 프로필 단독 실행용)
+    "requeue_delay": 60,  # 해당 작업 재시도까지 기본 대기 시간(초)
+    "backoff_factor": 2,  # 재시도마다 대기 시간 증가 배수
+    "max_requeues": 3,  # 캡차/로그인으로 인한 최대 재시도 횟수
+    "screenshot": True,  # 감지 시 스크린샷 저장 (data_output/challenges)
+    "operator_hook": None,  # "모듈:함수" - 세션을 넘겨받아 비동기로 수동 해결 (True 반환 시 세션 재사용)
 }
 
 # 아마존 URL 설정
@@ -44,6 +189,8 @@ AMAZON = {
 # 프록시 설정 (필요한 경우)
 PROXIES = []
 
-# 폴더 생성
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
\ No newline at end of file
+
+def ensure_dir(path):
+    """폴더가 없으면 생성 (가져오기 시점이 아니라 실제로 쓸 때 호출)"""
+    os.makedirs(path, exist_ok=True)
+    return path
\ No newline at end of file
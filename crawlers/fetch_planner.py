@@ -0,0 +1,93 @@
+import re
+
+from config import AMAZON
+from utils.logger import setup_logger
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+ASIN_IN_URL = re.compile(r"/(?:dp|gp/product|product-reviews)/([A-Z0-9]{10})")
+REVIEWS_URL_PATTERN = "{base_url}/product-reviews/{asin}/ref=cm_cr_dp_d_show_all_btm?ie=UTF8&reviewerType=all_reviews"
+
+
+def extract_asin(url):
+    """URL에서 ASIN 추출 (없으면 빈 문자열)"""
+    match = ASIN_IN_URL.search(url or "")
+    return match.group(1) if match else ""
+
+
+def reviews_url_for(asin):
+    """ASIN의 전체 리뷰 페이지 URL"""
+    return REVIEWS_URL_PATTERN.format(base_url=AMAZON["base_url"], asin=asin)
+
+
+class FetchPlan:
+    """작업 하나에 필요한 최소 페이지 로드 계획
+
+    - 리뷰만 필요하고 ASIN을 알면 상품 페이지 없이 리뷰 페이지로 바로 이동
+    - 상품 정보와 리뷰가 모두 필요하면 상품 페이지 한 번으로 상품 정보와 리뷰 링크를 함께 수집
+    - 작업 안에서 같은 URL은 두 번 로드하지 않음
+    """
+
+    def __init__(self, product_url, want_product=True, want_reviews=False):
+        self.product_url = product_url
+        self.want_product = want_product
+        self.want_reviews = want_reviews
+        self.asin = extract_asin(product_url)
+        self.reviews_url = reviews_url_for(self.asin) if self.asin else None
+        self.fetched = []
+
+    @property
+    def needs_product_page(self):
+        """상품 페이지 로드가 필요한지 (상품 정보 요청 또는 리뷰 링크를 찾아야 하는 경우)"""
+        return self.want_product or (self.want_reviews and not self.reviews_url)
+
+    def learn(self, asin=None, reviews_url=None):
+        """상품 페이지에서 알아낸 ASIN/리뷰 링크 반영"""
+        if asin and not self.asin:
+            self.asin = asin
+        if reviews_url:
+            self.reviews_url = reviews_url
+            self.asin = self.asin or extract_asin(reviews_url)
+        elif self.asin and not self.reviews_url:
+            self.reviews_url = reviews_url_for(self.asin)
+
+    def navigate(self, browser, url, page_type=None):
+        """계획된 페이지 로드 (이미 로드해 현재 보고 있는 URL이면 생략)"""
+        if url in self.fetched and self._is_current(browser, url):
+            logger.info(f"이미 로드된 페이지 재사용: {url}")
+            return True
+
+        success = browser.get_page(url, page_type=page_type)
+        if success:
+            self.fetched.append(url)
+        return success
+
+    def forget(self, url):
+        """로드한 페이지를 다시 로드하도록 기록에서 제거 (내용 없이 열린 페이지 재시도용)"""
+        if url in self.fetched:
+            self.fetched.remove(url)
+
+    @staticmethod
+    def _is_current(browser, url):
+        try:
+            return browser.driver.current_url.split("#")[0] == url.split("#")[0]
+        except Exception:
+            return False
+
+    def finish(self):
+        """작업당 계획 페이지 로드 수 기록"""
+        run_report.add_sample("planned_page_loads", len(self.fetched))
+        return len(self.fetched)
+
+
+def plan_fetches(product_url, want_product=True, want_reviews=False):
+    """작업 종류에 맞는 페이지 로드 계획 생성"""
+    plan = FetchPlan(product_url, want_product, want_reviews)
+    steps = []
+    if plan.needs_product_page:
+        steps.append("product")
+    if want_reviews:
+        steps.append("reviews")
+    logger.debug(f"페이지 로드 계획 ({product_url}): {' -> '.join(steps)}")
+    return plan
@@ -1,61 +1,139 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
 import json
 import re
-
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
 
 from config import CRAWLING
 from utils.logger import setup_logger
+from utils.asin_set import ASIN_RE, asin_from_url
+from utils.retry_policy import TRANSIENT, retry_policy
+from utils.field_health import LayoutChanged, field_health
 from data.product_model import Product
 
 logger = setup_logger(__name__)
 
+# 필드별 선택자 (앞에서부터 시도, 한 번도 맞지 않은 선택자는 field_health가 건너뜀)
+TITLE_SELECTORS = ["#productTitle"]
+PRICE_SELECTORS = [
+    "#priceblock_ourprice",
+    "#priceblock_dealprice",
+    ".a-price .a-offscreen",
+    ".a-price .a-price-whole",
+]
+RATING_SELECTORS = ["span[data-hook='rating-out-of-text']", "#acrPopover"]
+REVIEW_COUNT_SELECTORS = ["span[data-hook='total-review-count']", "#acrCustomerReviewText"]
+DESCRIPTION_SELECTORS = ["#productDescription", "#feature-bullets"]
+
+# 페이지 스크립트에 들어 있는 변형 그룹 부모 ASIN ("parentAsin":"B0...")
+PARENT_ASIN_SCRIPT = """
+for (const script of document.scripts) {
+    const match = /"parentAsin"\\s*:\\s*"([A-Z0-9]{10})"/.exec(script.textContent);
+    if (match) return match[1];
+}
+return null;
+"""
+
+# 구매 가능한 상품인지 (품절/판매 중단 상품은 가격이 없으므로 가격 추출 성공률에서 제외)
+PURCHASABLE_SCRIPT = """
+if (document.querySelector('#outOfStock, #unavailable')) return false;
+var availability = document.querySelector('#availability');
+if (availability && /unavailable|out of stock/i.test(availability.textContent)) return false;
+return document.querySelector('#add-to-cart-button, #buy-now-button, #buybox') !== null;
+"""
+
 class ProductCrawler:
     def __init__(self, browser_manager):
         self.browser = browser_manager
-        self.driver = browser_manager.driver
+        self.reviews_url = None
+        self.parent_asin = None
     
-    def crawl_product(self, product_url):
-        """상품 정보 크롤링"""
-        success = self.browser.get_page(product_url)
-        
-        if not success:
-            logger.error(f"Failed to access product page: {product_url}")
-            return None
-        
-        # 페이지 로딩 대기
-        try:
-            self.browser.wait_for_element(By.ID, "productTitle")
-        except TimeoutException:
-            logger.error("Product page structure not found or has changed")
-            return None
+    @property
+    def driver(self):
+        """현재 드라이버 (세션이 재시작되면 바뀌므로 보관하지 않음)"""
+        return self.browser.driver
+    
+    def crawl_product(self, product_url, plan=None):
+        """상품 정보 크롤링 (plan이 있으면 리뷰 링크도 같은 페이지 로드에서 수집)"""
+        self.reviews_url = None
+        self.parent_asin = None
+        attempt = 0
+        while True:
+            if plan is not None:
+                success = plan.navigate(self.browser, product_url, page_type="product")
+            else:
+                success = self.browser.get_page(product_url)
+            
+            if not success:
+                logger.error(f"Failed to access product page: {product_url}")
+                return None
+            
+            # 페이지 로딩 대기 (상품 정보 없이 열린 페이지는 일시적 오류로 보고 다시 로드)
+            # wait_for_element는 시간 초과 시 예외 대신 None을 반환함
+            if self.browser.wait_for_element(By.ID, "productTitle") is not None:
+                break
+            if not retry_policy.should_retry(TRANSIENT, attempt):
+                logger.error("Product page structure not found or has changed")
+                field_health.record("product", {"title": False}, url=product_url, driver=self.driver)
+                return None
+            wait_time = retry_policy.delay(TRANSIENT, attempt)
+            logger.warning(f"상품 정보가 없는 페이지, {wait_time:.1f}초 후 다시 로드합니다: {product_url}")
+            time.sleep(wait_time)
+            if plan is not None:
+                plan.forget(product_url)
+            attempt += 1
         
-        # 상품 정보 추출
+        # 상품 정보 추출 (추출 중 요소가 교체되면 다시 찾아 재시도)
         try:
-            product = Product()
-            product.url = product_url
-            product.asin = self._extract_asin(product_url)
-            product.title = self._extract_title()
-            product.price = self._extract_price()
-            product.rating = self._extract_rating()
-            product.review_count = self._extract_review_count()
-            product.description = self._extract_description()
-            product.features = self._extract_features()
-            product.details = self._extract_details()
-            product.variations = self._extract_variations()
-            product.images = self._extract_images()
+            product = retry_policy.call(self._extract_product, product_url, describe="상품 정보 추출")
+            
+            # 필드별 추출 성공 기록 (필수 필드 성공률이 무너지면 LayoutChanged로 중단)
+            fields = {
+                "title": product.title,
+                "rating": product.rating,
+                "review_count": product.review_count,
+                "description": product.description,
+                "images": product.images,
+            }
+            # 가격은 구매 상자가 있는 상품만 기록 (품절 상품의 0.0을 선택자 실패로 세지 않음)
+            if self._is_purchasable():
+                fields["price"] = product.price
+            field_health.record("product", fields, url=product_url, driver=self.driver)
+            
+            # 리뷰 페이지 링크 (리뷰 크롤링 시 상품 페이지 재방문 방지)
+            self.reviews_url = self._extract_reviews_url()
+            # 변형 그룹 부모 ASIN (같은 그룹의 하위 상품은 리뷰를 공유하므로 한 번만 수집)
+            self.parent_asin = self._extract_parent_asin()
+            if plan is not None:
+                plan.learn(asin=product.asin, reviews_url=self.reviews_url)
             
-            logger.info(f"Successfully crawled product: {product.title}")
+            logger.info(f"Successfully crawled product: {product.title}",
+                        extra={"asin": product.asin, "url": product_url, "stage": "product"})
             return product
             
+        except LayoutChanged:
+            raise
         except Exception as e:
             logger.error(f"Error during product crawling: {str(e)}")
             return None
     
+    def _extract_product(self, product_url):
+        """현재 페이지에서 상품 정보 추출"""
+        product = Product()
+        product.url = product_url
+        product.asin = self._extract_asin(product_url)
+        product.title = self._extract_title()
+        product.price = self._extract_price()
+        product.rating = self._extract_rating()
+        product.review_count = self._extract_review_count()
+        product.description = self._extract_description()
+        product.features = self._extract_features()
+        product.details = self._extract_details()
+        product.variations = self._extract_variations()
+        product.images = self._extract_images()
+        return product
+    
     def _extract_asin(self, url):
         """URL에서 ASIN 추출"""
         asin_match = re.search(r"/dp/([A-Z0-9]{10})", url)
@@ -77,100 +155,101 @@ class ProductCrawler:
         
         return ""
     
+    def _extract_reviews_url(self):
+        """전체 리뷰 페이지 링크 추출"""
+        try:
+            for selector in [
+                "a[data-hook='see-all-reviews-link-foot']",
+                "a[href*='/product-reviews/']"
+            ]:
+                links = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                for link in links:
+                    href = link.get_attribute("href")
+                    if href and "/product-reviews/" in href:
+                        return href
+            return None
+        except Exception:
+            return None
+    
+    def _extract_parent_asin(self):
+        """변형 그룹의 부모 ASIN 추출 (변형이 없는 상품이면 None)"""
+        try:
+            for selector, attribute in [
+                ("input[name='parentASIN']", "value"),
+                ("[data-parent-asin]", "data-parent-asin"),
+            ]:
+                for element in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                    value = (element.get_attribute(attribute) or "").strip()
+                    if ASIN_RE.fullmatch(value):
+                        return value
+            value = self.driver.execute_script(PARENT_ASIN_SCRIPT)
+            return value if value and ASIN_RE.fullmatch(value) else None
+        except Exception:
+            return None
+    
+    def _is_purchasable(self):
+        """구매 상자가 있고 품절/판매 중단 표시가 없는 상품인지"""
+        try:
+            return bool(self.driver.execute_script(PURCHASABLE_SCRIPT))
+        except Exception:
+            return False
+    
+    def _find_first(self, key, selectors):
+        """선택자를 순서대로 시도해 (선택자, 요소) 반환 (적중 기록, 한 번도 맞지 않은 선택자는 건너뜀)"""
+        for selector in field_health.live_selectors(key, selectors):
+            element = self.browser.find_element(By.CSS_SELECTOR, selector)
+            field_health.selector_result(key, selector, element is not None)
+            if element is not None:
+                return selector, element
+        return None, None
+    
     def _extract_title(self):
         """상품 제목 추출"""
-        try:
-            title_element = self.browser.find_element(By.ID, "productTitle")
-            return title_element.text.strip() if title_element else ""
-        except NoSuchElementException:
-            return ""
+        _, title_element = self._find_first("product.title", TITLE_SELECTORS)
+        return title_element.text.strip() if title_element else ""
     
     def _extract_price(self):
-        """상품 가격 추출"""
+        """상품 가격 추출 (float, 없으면 0.0)"""
         try:
             # 여러 가격 요소 선택자 시도
-            selectors = [
-                "#priceblock_ourprice",
-                "#priceblock_dealprice",
-                ".a-price .a-offscreen",
-                ".a-price .a-price-whole"
-            ]
-            
-            for selector in selectors:
-                try:
-                    price_element = self.browser.find_element(By.CSS_SELECTOR, selector)
-                    if price_element:
-                        price_text = price_element.text.strip() if selector != ".a-price .a-offscreen" else price_element.get_attribute("innerText")
-                        # 가격에서 숫자만 추출
-                        price_num = re.search(r"[\d,]+\.?\d*", price_text)
-                        if price_num:
-                            return price_num.group().replace(",", "")
-                except NoSuchElementException:
-                    continue
+            selector, price_element = self._find_first("product.price", PRICE_SELECTORS)
+            if price_element:
+                price_text = price_element.text.strip() if selector != ".a-price .a-offscreen" else price_element.get_attribute("innerText")
+                # 가격에서 숫자만 추출
+                price_num = re.search(r"[\d,]+\.?\d*", price_text)
+                if price_num:
+                    return float(price_num.group().replace(",", ""))
             
-            return ""
+            return 0.0
         except Exception:
-            return ""
+            return 0.0
     
     def _extract_rating(self):
         """평점 추출"""
-        try:
-            rating_element = self.browser.find_element(By.CSS_SELECTOR, "span[data-hook='rating-out-of-text']")
-            if rating_element:
-                rating_text = rating_element.text
-                rating_match = re.search(r"([\d.]+) out of 5", rating_text)
-                if rating_match:
-                    return float(rating_match.group(1))
-            
-            # 다른 방법으로 시도
-            rating_element = self.browser.find_element(By.CSS_SELECTOR, "#acrPopover")
-            if rating_element:
-                rating_text = rating_element.get_attribute("title")
-                rating_match = re.search(r"([\d.]+) out of 5", rating_text)
-                if rating_match:
-                    return float(rating_match.group(1))
-            
-            return 0.0
-        except NoSuchElementException:
-            return 0.0
+        selector, rating_element = self._find_first("product.rating", RATING_SELECTORS)
+        if rating_element:
+            # #acrPopover는 title 속성에 평점 문구가 있음
+            rating_text = rating_element.get_attribute("title") if selector == "#acrPopover" else rating_element.text
+            rating_match = re.search(r"([\d.]+) out of 5", rating_text or "")
+            if rating_match:
+                return float(rating_match.group(1))
+        
+        return 0.0
     
     def _extract_review_count(self):
         """리뷰 수 추출"""
-        try:
-            review_count_element = self.browser.find_element(By.CSS_SELECTOR, "span[data-hook='total-review-count']")
-            if review_count_element:
-                review_text = review_count_element.text
-                review_match = re.search(r"([\d,]+)", review_text)
-                if review_match:
-                    return int(review_match.group(1).replace(",", ""))
-            
-            # 다른 방법으로 시도
-            review_count_element = self.browser.find_element(By.ID, "acrCustomerReviewText")
-            if review_count_element:
-                review_text = review_count_element.text
-                review_match = re.search(r"([\d,]+)", review_text)
-                if review_match:
-                    return int(review_match.group(1).replace(",", ""))
-            
-            return 0
-        except NoSuchElementException:
-            return 0
+        _, review_count_element = self._find_first("product.review_count", REVIEW_COUNT_SELECTORS)
+        if review_count_element:
+            review_match = re.search(r"([\d,]+)", review_count_element.text)
+            if review_match:
+                return int(review_match.group(1).replace(",", ""))
+        
+        return 0
     
     def _extract_description(self):
-        """상품 설명 추출"""
-        try:
-            description_element = self.browser.find_element(By.ID, "productDescription")
-            if description_element:
-                return description_element.text.strip()
-            
-            # 다른 방법으로 시도
-            feature_bullets = self.browser.find_element(By.ID, "feature-bullets")
-            if feature_bullets:
-                return feature_bullets.text.strip()
-            
-            return ""
-        except NoSuchElementException:
-            return ""
+        """상품 설명 추출 (없으면 특징 목록 텍스트)"""
+        _, description_element = self._find_first("product.description", DESCRIPTION_SELECTORS)
+        return description_element.text.strip() if description_element else ""
     
     def _extract_features(self):
         """상품 특징 추출"""
@@ -222,7 +301,8 @@ class ProductCrawler:
                     variation = {
                         "title": element.get_attribute("title"),
                         "value": element.text.strip(),
-                        "selected": "selected" in element.get_attribute("class").split()
+                        "selected": "selected" in element.get_attribute("class").split(),
+                        "asin": self._variation_asin(element)
                     }
                     variations.append(variation)
                 except:
@@ -232,6 +312,14 @@ class ProductCrawler:
         except NoSuchElementException:
             return []
     
+    def _variation_asin(self, element):
+        """변형 옵션 요소의 하위 ASIN (data-defaultasin, data-asin 또는 data-dp-url)"""
+        for attribute in ("data-defaultasin", "data-asin"):
+            value = (element.get_attribute(attribute) or "").strip()
+            if ASIN_RE.fullmatch(value):
+                return value
+        return asin_from_url(element.get_attribute("data-dp-url")) or ""
+    
     def _extract_images(self):
         """상품 이미지 URL 추출"""
         images = []
@@ -1,41 +1,85 @@
+import math
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 import re
 
 from config import CRAWLING
 from utils.logger import setup_logger
 from data.review_model import Review
+from utils.page_events import PageChallenge
+from utils.retry_policy import CircuitOpen, retry_policy
+from utils.field_health import LayoutChanged, field_health
+from crawlers.fetch_planner import FetchPlan
 
 logger = setup_logger(__name__)
 
+REVIEW_SELECTORS = [
+    "div[id^='customer_review-']",           # 가장 정확한 선택자
+    "div[data-hook='review']",              # 일반적인 선택자
+    ".review",                              # 단순 클래스 선택자
+    ".a-section.review",                    # 복합 클래스 선택자
+    ".review-views .a-section.celwidget"    # 컨테이너 내부 선택자
+]
+
+def review_page_url(reviews_url, page):
+    """리뷰 목록 URL의 pageNumber를 지정한 페이지로 변경"""
+    parts = urlparse(reviews_url)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != "pageNumber"]
+    query.append(("pageNumber", str(page)))
+    return urlunparse(parts._replace(query=urlencode(query)))
+
 class ReviewCrawler:
     def __init__(self, browser_manager):
         self.browser = browser_manager
-        self.driver = browser_manager.driver
         self.reviews = []
+        self.collected = 0  # 전달한 리뷰 수
+        self.max_reviews = CRAWLING["max_reviews"]
+        self.asin = ""
+        self.on_page = None
+        self.page_loaded = False  # 리뷰를 읽을 페이지까지 도달했는지 (실패면 수집 완료로 기록하지 않음)
+        self._seen = set()
+    
+    @property
+    def driver(self):
+        """현재 브라우저 드라이버 (메모리 기준으로 세션이 재시작되면 새 드라이버로 바뀌므로 매번 관리자에서 읽음)"""
+        return self.browser.driver
     
     # 리뷰 추출 시작 부분 수정 (속도 개선, 스레드 없음)
-    def crawl_reviews(self, product_url, max_reviews=None):
-        """상품 리뷰 크롤링"""
-        max_reviews = max_reviews or CRAWLING["max_reviews"]
+    def crawl_reviews(self, product_url, max_reviews=None, plan=None, review_count=None, session_pool=None,
+                      on_page=None):
+        """상품 리뷰 크롤링 (plan이 있으면 이미 알아낸 리뷰 링크/로드한 페이지 재사용,
+        session_pool이 있으면 pageNumber URL로 여러 세션에서 병렬 수집)
+        
+        on_page가 있으면 페이지마다 ASIN을 붙인 리뷰 목록을 on_page(reviews)로 바로 전달하고
+        메모리에 모아 두지 않는다 (반환값은 빈 목록, 수집 수는 self.collected).
+        페이지 접근에 실패하면 self.page_loaded가 False로 남는다 (리뷰가 없는 상품과 구분).
+        """
+        plan = plan or FetchPlan(product_url, want_product=False, want_reviews=True)
+        self.max_reviews = max_reviews = max_reviews or CRAWLING["max_reviews"]
         self.reviews = []  # 리뷰 목록 초기화
+        self.collected = 0
+        self.asin = plan.asin
+        self.on_page = on_page
+        self.page_loaded = False
+        self._seen = set()
         
-        # ASIN 추출 - 바로 리뷰 페이지로 접근
-        asin_match = re.search(r"/dp/([A-Z0-9]{10})", product_url)
-        if asin_match:
-            asin = asin_match.group(1)
+        # ASIN 또는 상품 페이지에서 찾은 리뷰 링크로 바로 리뷰 페이지 접근
+        if plan.reviews_url:
+            reviews_url = plan.reviews_url
             # 바로 리뷰 페이지로 이동 (상품 페이지 건너뛰기)
-            reviews_url = f"https://www.amazon.com/product-reviews/{asin}/ref=cm_cr_dp_d_show_all_btm?ie=UTF8&reviewerType=all_reviews"
             logger.info(f"직접 리뷰 페이지로 이동: {reviews_url}")
-            success = self.browser.get_page(reviews_url)
+            success = plan.navigate(self.browser, reviews_url, page_type="review")
             if not success:
                 logger.error("리뷰 페이지 접근 실패")
                 return []
         else:
-            # ASIN을 추출할 수 없을 경우 상품 페이지부터 시작
-            success = self.browser.get_page(product_url)
+            # ASIN을 추출할 수 없을 경우 상품 페이지부터 시작 (이미 로드했다면 재사용)
+            success = plan.navigate(self.browser, product_url, page_type="product")
             if not success:
                 logger.error(f"상품 페이지 접근 실패: {product_url}")
                 return []
@@ -69,71 +113,225 @@ class ReviewCrawler:
                 
                 if all_reviews_url:
                     logger.info(f"Navigating to all reviews page: {all_reviews_url}")
-                    success = self.browser.get_page(all_reviews_url)
+                    plan.learn(reviews_url=all_reviews_url)
+                    success = plan.navigate(self.browser, all_reviews_url, page_type="review")
                     if not success:
                         logger.error("Failed to access all reviews page")
                         return []
             
+            except (PageChallenge, CircuitOpen):
+                raise
             except Exception as e:
                 logger.error(f"Error navigating to reviews: {str(e)}")
                 return []
         
+        # 리뷰 링크에서 알게 된 ASIN 반영
+        self.asin = plan.asin
+        self.page_loaded = True
+        
+        # URL로 페이지를 지정할 수 있으면 여러 세션에서 병렬 수집
+        if session_pool is not None and plan.reviews_url and CRAWLING["review_pagination"] == "parallel":
+            return self._crawl_pages_parallel(plan.reviews_url, max_reviews, review_count, session_pool)
+        
         # 리뷰 추출 시작
         page = 1
         
-        while len(self.reviews) < max_reviews:
+        while self.collected < max_reviews:
             logger.info(f"Crawling reviews page {page}")
             
-            # 현재 페이지의 리뷰 추출 (가장 효과적인 선택자 우선 시도)
-            review_elements = []
-            
-            selectors = [
-                "div[id^='customer_review-']",           # 가장 정확한 선택자
-                "div[data-hook='review']",              # 일반적인 선택자
-                ".review",                              # 단순 클래스 선택자
-                ".a-section.review",                    # 복합 클래스 선택자
-                ".review-views .a-section.celwidget"    # 컨테이너 내부 선택자
-            ]
-            
-            for selector in selectors:
-                review_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if review_elements:
-                    logger.info(f"Found {len(review_elements)} reviews with selector: {selector}")
-                    break
-            
-            if not review_elements:
+            # 현재 페이지의 리뷰 추출 후 바로 전달
+            reviews = self._parse_current_page()
+            if not reviews:
                 logger.warning("No review elements found on current page")
                 break
             
-            # 단일 스레드로 리뷰 추출 (속도 최적화)
-            for review_element in review_elements:
-                try:
-                    review = self._extract_review(review_element)
-                    if review:
-                        self.reviews.append(review)
-                        logger.debug(f"Extracted review by {review.reviewer_name}: {review.title}")
-                    
-                    # 최대 리뷰 수 도달 시 중단
-                    if len(self.reviews) >= max_reviews:
-                        logger.info(f"Reached maximum number of reviews: {max_reviews}")
-                        break
-                except Exception as e:
-                    logger.warning(f"Error extracting review: {str(e)}")
-                    continue
+            if self._emit(reviews):
+                logger.info(f"Reached maximum number of reviews: {max_reviews}")
+                break
             
             # 다음 페이지로 이동
-            if len(self.reviews) >= max_reviews:
-                break
-                
             if not self._go_to_next_page():
                 logger.info("No more review pages available")
                 break
                 
             page += 1
             
-        logger.info(f"Collected {len(self.reviews)} reviews")
+        logger.info(f"Collected {self.collected} reviews", extra={"asin": self.asin, "stage": "reviews"})
+        return self.reviews
+    
+    def _emit(self, reviews):
+        """페이지 하나의 리뷰를 ASIN을 붙여 전달 (이미 전달한 리뷰 제외, max_reviews까지)
+        
+        on_page가 있으면 바로 넘기고(예: DB 저장), 없으면 self.reviews에 모은다. 최대 수에 도달하면 True.
+        """
+        batch = []
+        for review in reviews:
+            if self.collected >= self.max_reviews:
+                break
+            key = review.review_id or id(review)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            if self.asin:
+                review.asin = self.asin
+            batch.append(review)
+            self.collected += 1
+        
+        if batch:
+            if self.on_page is not None:
+                self.on_page(batch)
+            else:
+                self.reviews.extend(batch)
+        return self.collected >= self.max_reviews
+    
+    def _find_review_elements(self):
+        """현재 페이지의 리뷰 요소 찾기"""
+        for selector in field_health.live_selectors("review.list", REVIEW_SELECTORS):
+            review_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
+            field_health.selector_result("review.list", selector, bool(review_elements))
+            if review_elements:
+                logger.info(f"Found {len(review_elements)} reviews with selector: {selector}")
+                return review_elements
+        return []
+    
+    def _parse_current_page(self):
+        """현재 페이지의 리뷰 목록 추출 (파싱 중 요소가 교체되면 요소를 다시 찾아 재시도)"""
+        return retry_policy.call(self._parse_review_elements, describe="리뷰 파싱")
+    
+    def _parse_review_elements(self):
+        reviews = []
+        for review_element in self._find_review_elements():
+            try:
+                review = self._extract_review(review_element)
+                if review:
+                    reviews.append(review)
+            except StaleElementReferenceException:
+                raise
+            except Exception as e:
+                logger.warning(f"Error extracting review: {str(e)}")
+        
+        # 필드별 추출 성공 기록 (필수 필드 성공률이 무너지면 LayoutChanged로 중단)
+        page_url = self._current_url() if reviews else None
+        for review in reviews:
+            field_health.record("review", {
+                "rating": review.rating,
+                "body": review.body,
+                "title": review.title,
+                "date": review.date,
+            }, url=page_url, driver=self.driver)
+        return reviews
+    
+    def _current_url(self):
+        try:
+            return self.driver.current_url
+        except Exception:
+            return None
+    
+    def _extract_total_reviews(self):
+        """리뷰 목록 페이지에서 전체 리뷰 수 추출 (찾지 못하면 None)"""
+        try:
+            elements = self.driver.find_elements(By.CSS_SELECTOR,
+                "div[data-hook='cr-filter-info-review-rating-count'], div[data-hook='total-review-count']")
+            for element in elements:
+                text = element.text
+                match = re.search(r"([\d,]+)\s+with reviews", text) or re.search(r"([\d,]+)", text)
+                if match:
+                    return int(match.group(1).replace(",", ""))
+        except Exception:
+            pass
+        return None
+    
+    def _crawl_pages_parallel(self, reviews_url, max_reviews, review_count, session_pool):
+        """리뷰 페이지 URL을 미리 계산해 풀의 여러 세션에서 동시에 수집 (페이지가 도착하는 대로 전달)"""
+        page_size = CRAWLING["review_page_size"]
+        first_page = self._parse_current_page()
+        if not first_page:
+            logger.warning("No review elements found on current page")
+            return self.reviews
+        if self._emit(first_page):
+            return self.reviews
+        
+        review_count = review_count or self._extract_total_reviews()
+        target = min(max_reviews, review_count) if review_count else max_reviews
+        last_page = max(1, math.ceil(target / page_size))
+        state = {"next": 2, "stop_at": last_page, "failed": [], "challenge": None}
+        pages_done = 1
+        
+        if last_page > 1:
+            # 현재 세션 + 풀에서 즉시 얻을 수 있는 세션으로 병렬 수집
+            helpers = []
+            for _ in range(min(CRAWLING["review_parallel_sessions"] - 1, last_page - 2)):
+                try:
+                    helpers.append(session_pool.acquire(timeout=0))
+                except Exception:
+                    break
+            
+            crawlers = [self] + [ReviewCrawler(helper) for helper in helpers]
+            lock = threading.Lock()
+            logger.info(f"리뷰 페이지 2-{last_page} 병렬 수집 ({len(crawlers)}개 세션)")
+            
+            def deliver(page, reviews):
+                # lock 안에서 호출됨: 전달 순서와 개수 제한을 한곳에서 관리
+                nonlocal pages_done
+                pages_done += 1
+                if self._emit(reviews):
+                    state["stop_at"] = min(state["stop_at"], page)
+            
+            try:
+                with ThreadPoolExecutor(max_workers=len(crawlers)) as executor:
+                    list(executor.map(
+                        lambda crawler: crawler._fetch_pages(reviews_url, state, lock, deliver, primary=crawler is self),
+                        crawlers))
+            finally:
+                for helper in helpers:
+                    session_pool.release(helper)
+            
+            if state["challenge"] is not None:
+                raise state["challenge"]
+            
+            # 다른 세션에서 실패한 페이지는 현재 세션으로 다시 시도
+            for page in sorted(state["failed"]):
+                if self.collected >= max_reviews or page > state["stop_at"]:
+                    break
+                if self.browser.get_page(review_page_url(reviews_url, page), page_type="review"):
+                    deliver(page, self._parse_current_page())
+        
+        logger.info(f"Collected {self.collected} reviews from {pages_done} pages",
+                    extra={"asin": self.asin, "stage": "reviews"})
         return self.reviews
     
+    def _fetch_pages(self, reviews_url, state, lock, deliver, primary=False):
+        """공유 카운터에서 페이지 번호를 받아 수집 (빈 페이지를 만나면 이후 페이지 중단)"""
+        while True:
+            with lock:
+                page = state["next"]
+                if page > state["stop_at"]:
+                    return
+                state["next"] += 1
+            
+            try:
+                success = self.browser.get_page(review_page_url(reviews_url, page), page_type="review")
+                reviews = self._parse_current_page() if success else None
+            except (PageChallenge, CircuitOpen, LayoutChanged) as event:
+                # 보조 세션은 중단(반납 시 교체), 작업 세션이면 수집 후 작업에 전달
+                with lock:
+                    state["failed"].append(page)
+                    if primary:
+                        state["challenge"] = event
+                return
+            except Exception as e:
+                logger.warning(f"리뷰 페이지 {page} 수집 실패: {str(e)}")
+                reviews = None
+            
+            with lock:
+                if reviews is None:
+                    state["failed"].append(page)
+                elif not reviews:
+                    # 첫 빈 페이지에서 중단
+                    state["stop_at"] = min(state["stop_at"], page - 1)
+                else:
+                    deliver(page, reviews)
+    
     def _extract_review(self, review_element):
         """리뷰 요소에서 정보 추출 (최적화 버전)"""
         try:
@@ -221,6 +419,8 @@ class ReviewCrawler:
             
             return review
             
+        except StaleElementReferenceException:
+            raise
         except Exception as e:
             logger.error(f"Error parsing review: {str(e)}")
             return None
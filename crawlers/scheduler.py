@@ -0,0 +1,325 @@
+import csv
+import heapq
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+
+from config import AMAZON, SCHEDULER, CHALLENGE
+from utils.logger import setup_logger
+from utils.run_report import run_report
+from data.job_model import CrawlJob
+from utils.page_events import PageChallenge
+from utils.watchdog import Watchdog
+from utils.retry_policy import PERMANENT, TRANSIENT, CircuitOpen, classify_error
+from utils.field_health import LayoutChanged
+
+logger = setup_logger(__name__)
+
+JOB_KINDS = ("store", "product", "reviews")
+ASIN_PATTERN = re.compile(r"^[A-Z0-9]{10}$")
+
+
+def target_to_url(target):
+    """작업 대상(ASIN 또는 URL)을 상품 URL로 변환"""
+    target = target.strip()
+    if ASIN_PATTERN.match(target):
+        return f"{AMAZON['base_url']}/dp/{target}"
+    return target
+
+
+def infer_kind(target, default_kind=None):
+    """작업 대상으로 작업 종류 추정"""
+    if default_kind:
+        return default_kind
+    if "/stores/" in target:
+        return "store"
+    return "product"
+
+
+def _int_or_none(value):
+    if value in (None, ""):
+        return None
+    return int(value)
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "y", "yes", "true")
+
+
+def make_job(data, default_kind=None, defaults=None):
+    """딕셔너리(작업 파일의 한 행)로 작업 생성"""
+    defaults = defaults or {}
+    target = (data.get("target") or data.get("url") or data.get("store_url")
+              or data.get("asin") or "").strip()
+    if not target:
+        raise ValueError(f"작업 대상이 없습니다: {data}")
+
+    kind = (data.get("kind") or "").strip() or infer_kind(target, default_kind)
+    if kind not in JOB_KINDS:
+        raise ValueError(f"알 수 없는 작업 종류: {kind}")
+
+    job = CrawlJob(kind, target)
+    job.max_products = _int_or_none(data.get("max_products")) or defaults.get("max_products")
+    job.max_reviews = _int_or_none(data.get("max_reviews")) or defaults.get("max_reviews")
+    crawl_reviews = data.get("crawl_reviews")
+    job.crawl_reviews = _bool(crawl_reviews) if crawl_reviews not in (None, "") else defaults.get("crawl_reviews", False)
+    for flag in ("reviews_only", "expand_variations", "refresh"):
+        value = data.get(flag)
+        setattr(job, flag, _bool(value) if value not in (None, "") else defaults.get(flag, False))
+    return job
+
+
+def load_jobs_file(file_path, default_kind=None, defaults=None):
+    """작업 파일(CSV/JSONL/URL 목록) 읽기. '-'이면 표준 입력에서 읽음"""
+    if file_path == "-":
+        lines = sys.stdin.read().splitlines()
+        name = ""
+    else:
+        with open(file_path, "r", encoding="utf-8-sig") as f:
+            lines = f.read().splitlines()
+        name = file_path.lower()
+
+    lines = [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+    if not lines:
+        return []
+
+    if name.endswith(".jsonl") or lines[0].lstrip().startswith("{"):
+        rows = [json.loads(line) for line in lines]
+    elif name.endswith(".csv") or "," in lines[0]:
+        rows = list(csv.DictReader(lines))
+    else:
+        # 한 줄에 URL 또는 ASIN 하나
+        rows = [{"target": line} for line in lines]
+
+    jobs = [make_job(row, default_kind, defaults) for row in rows]
+    logger.info(f"작업 파일에서 {len(jobs)}개의 작업을 읽었습니다: {file_path}")
+    return jobs
+
+
+class CrawlScheduler:
+    """크롤링 작업 스케줄러 (세션 풀의 브라우저를 재사용하며 작업을 순차/병렬 실행)"""
+
+    def __init__(self, db_manager, session_pool, handler, workers=None):
+        self.db = db_manager
+        self.pool = session_pool
+        self.handler = handler  # handler(job, browser_manager, scheduler) -> bool
+        self.workers = workers or SCHEDULER["workers"]
+        self.queue = []  # (not_before, seq, job) 힙
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.total = 0
+        self.stats = {"done": 0, "failed": 0, "requeued": 0, "challenges": 0, "timeouts": 0, "deferred": 0,
+                      "layout_changed": 0, "session_failures": 0}
+        self.stopped = None  # 실행 중단 사유 (페이지 구조 변경 등)
+        self.watchdog = Watchdog()
+
+    def submit(self, job):
+        """작업 하나 등록"""
+        return self.submit_many([job])
+
+    def submit_many(self, jobs):
+        """작업 일괄 등록 (DB에 한 번에 기록 후 큐에 추가)"""
+        if not jobs:
+            return 0
+        self.db.add_jobs(jobs)
+        with self.cond:
+            self.total += len(jobs)
+            for job in jobs:
+                heapq.heappush(self.queue, (job.not_before, next(self.seq), job))
+            self.cond.notify_all()
+        return len(jobs)
+
+    def resume(self):
+        """DB에 남은 미완료 작업을 큐에 추가"""
+        jobs = self.db.get_pending_jobs()
+        with self.cond:
+            self.total += len(jobs)
+            for job in jobs:
+                heapq.heappush(self.queue, (job.not_before or 0, next(self.seq), job))
+            self.cond.notify_all()
+        logger.info(f"미완료 작업 {len(jobs)}개를 재개합니다")
+        return len(jobs)
+
+    def requeue(self, job, delay):
+        """작업을 지연 후 다시 실행하도록 큐에 추가"""
+        job.status = CrawlJob.PENDING
+        job.not_before = time.time() + delay
+        self.db.update_job(job)
+        with self.cond:
+            heapq.heappush(self.queue, (job.not_before, next(self.seq), job))
+            self.stats["requeued"] += 1
+            self.cond.notify_all()
+
+    def stop(self, reason):
+        """남은 작업을 실행하지 않고 중단 (작업은 DB에 pending으로 남아 resume으로 재개 가능)"""
+        with self.cond:
+            if self.stopped is None:
+                self.stopped = reason
+                logger.error(f"크롤링 중단: {reason} (남은 작업 {len(self.queue)}개는 resume으로 재개)")
+            self.queue.clear()
+            self.cond.notify_all()
+
+    def _next_job(self):
+        """실행 가능한 다음 작업 (모든 작업이 끝나거나 중단되면 None)"""
+        with self.cond:
+            while True:
+                if self.stopped is not None:
+                    return None
+                if self.queue:
+                    not_before = self.queue[0][0]
+                    wait = not_before - time.time()
+                    if wait <= 0:
+                        job = heapq.heappop(self.queue)[2]
+                        self.in_flight += 1
+                        return job
+                    self.cond.wait(wait)
+                elif self.in_flight == 0:
+                    return None
+                else:
+                    # 실행 중인 작업이 하위 작업을 추가할 수 있으므로 대기
+                    self.cond.wait()
+
+    def _count(self, name):
+        """통계 증가 (여러 작업자가 동시에 갱신하므로 잠금 안에서)"""
+        with self.cond:
+            self.stats[name] += 1
+
+    def _finish(self, job, ok):
+        with self.cond:
+            self.in_flight -= 1
+            if ok is not None:
+                self.stats["done" if ok else "failed"] += 1
+            self.cond.notify_all()
+
+    def _run_job(self, job, browser_manager):
+        """작업 하나 실행 및 상태 기록"""
+        job.status = CrawlJob.RUNNING
+        job.attempts += 1
+        self.db.update_job(job)
+        with self.cond:
+            finished = self.stats["done"] + self.stats["failed"]
+        logger.info(f"작업 시작 {job.job_id} ({job.kind}, {finished + 1}/{self.total}): {job.target}")
+        start = time.time()
+
+        token = self.watchdog.watch(job, browser_manager)
+        try:
+            try:
+                ok = bool(self.handler(job, browser_manager, self))
+            finally:
+                if self.watchdog.finish(token):
+                    # 워치독이 세션을 종료함: 작업 결과(세션 종료로 인한 오류 포함)와 관계없이 새 세션으로 다시 실행
+                    self._count("timeouts")
+                    raise TimeoutError(f"작업 제한 시간 초과 ({self.watchdog.deadline_for(job.kind)}초)")
+            job.last_error = "" if ok else job.last_error
+        except LayoutChanged as event:
+            # 필수 필드를 추출하지 못하는 페이지가 이어짐: 같은 결과만 반복되므로 실행 전체 중단
+            job.attempts -= 1
+            job.status = CrawlJob.PENDING
+            job.last_error = str(event)
+            self.db.update_job(job)
+            self._count("layout_changed")
+            self.stop(str(event))
+            self._finish(job, None)
+            return
+        except CircuitOpen as event:
+            # 차단기가 열려 요청하지 않음: 시도 횟수에 넣지 않고 차단이 풀릴 때까지 미룸
+            job.attempts -= 1
+            job.last_error = str(event)
+            self._count("deferred")
+            delay = event.retry_after * random.uniform(1.0, 1.2)
+            logger.warning(f"작업 {job.job_id}: {event.key} 차단 중, {delay:.0f}초 후 재시도")
+            self.requeue(job, delay)
+            self._finish(job, None)
+            return
+        except PageChallenge as event:
+            # 캡차/로그인: 이 작업만 지연 후 재시도, 세션은 작업자가 교체
+            job.last_error = str(event)
+            self._count("challenges")
+            # 일반 오류로 인한 시도는 제외하고 캡차/로그인 재시도만 센다
+            if job.challenge_requeues < CHALLENGE["max_requeues"]:
+                job.challenge_requeues += 1
+                delay = CHALLENGE["requeue_delay"] * CHALLENGE["backoff_factor"] ** (job.challenge_requeues - 1)
+                delay *= random.uniform(0.8, 1.2)
+                logger.warning(f"작업 {job.job_id}: {event.kind} 감지, {delay:.0f}초 후 재시도")
+                self.requeue(job, delay)
+                self._finish(job, None)
+                return
+            ok = False
+        except Exception as e:
+            logger.error(f"작업 {job.job_id} 실행 중 오류: {str(e)}", exc_info=True)
+            job.last_error = str(e)
+            # 재시도해도 결과가 같은 오류는 바로 실패 처리, 그 외에는 지터를 넣은 지수 백오프로 재시도
+            if classify_error(e, default=TRANSIENT) != PERMANENT and job.attempts < SCHEDULER["max_attempts"]:
+                delay = SCHEDULER["requeue_delay"] * 2 ** (job.attempts - 1) * random.uniform(0.8, 1.2)
+                self.requeue(job, delay)
+                self._finish(job, None)
+                return
+            ok = False
+
+        job.status = CrawlJob.DONE if ok else CrawlJob.FAILED
+        self.db.update_job(job)
+        duration = time.time() - start
+        run_report.add_sample(f"job_time.{job.kind}", duration)
+        logger.info(f"작업 종료 {job.job_id} ({job.status}, {duration:.1f}s): {job.target}", extra={
+            "job_id": job.job_id, "stage": job.kind, "url": job.target, "duration": round(duration, 3),
+        })
+        self._finish(job, ok)
+
+    def _worker(self, index):
+        """작업자 스레드: 세션 하나를 확보해 큐가 빌 때까지 작업 실행"""
+        browser_manager = None
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    break
+                if browser_manager is None:
+                    try:
+                        browser_manager = self.pool.acquire()
+                    except Exception as e:
+                        # 브라우저를 띄우지 못함: 꺼낸 작업은 실행하지 않았으므로 다시 큐에 넣고 이 작업자만 종료
+                        # (_finish를 호출하지 않으면 in_flight가 남아 다른 작업자가 영원히 대기함)
+                        logger.error(f"작업자 {index}: 브라우저 세션을 시작하지 못했습니다: {str(e)}")
+                        job.last_error = str(e)
+                        self._count("session_failures")
+                        self.requeue(job, SCHEDULER["requeue_delay"])
+                        self._finish(job, None)
+                        raise
+                else:
+                    browser_manager.request_origin = time.time()
+                    browser_manager.first_request_at = None
+                self._run_job(job, browser_manager)
+                
+                # 캡차/로그인을 받았거나 종료된(멈춤, 드라이버 오류) 세션은 반납(격리/교체)하고 다음 작업에서 새 세션 사용
+                if not browser_manager.is_alive():
+                    browser_manager.dead = True
+                if browser_manager.degraded or browser_manager.dead:
+                    self.pool.release(browser_manager)
+                    browser_manager = None
+        finally:
+            self.pool.release(browser_manager)
+            logger.info(f"작업자 {index} 종료")
+
+    def run(self):
+        """모든 작업이 끝날 때까지 실행"""
+        self.watchdog.start()
+        threads = [threading.Thread(target=self._worker, args=(i,), name=f"crawl-worker-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.watchdog.stop()
+
+        run_report.record("scheduler", "jobs", dict(self.stats))
+        logger.info(f"작업 완료: 성공 {self.stats['done']}, 실패 {self.stats['failed']}, 재시도 {self.stats['requeued']}, "
+                    f"시간 초과 {self.stats['timeouts']}, 차단 대기 {self.stats['deferred']}, "
+                    f"세션 시작 실패 {self.stats['session_failures']}")
+        return self.stats
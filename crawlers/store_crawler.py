@@ -2,22 +2,103 @@ import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
-import re
-
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import AMAZON, CRAWLING
 from utils.logger import setup_logger
+from utils.asin_set import OrderedAsinSet
 
 logger = setup_logger(__name__)
 
+# 스크롤 한 단계: 아직 수집하지 않은 상품 링크를 표시하며 반환한 뒤 하단으로 스크롤
+# (상품 그리드가 있는 페이지는 그리드 안의 링크만 수집하고, 그리드가 없는 페이지에서만 전체 링크 사용)
+HARVEST_SCRIPT = """
+var hasGrid = document.querySelector("[class*='ProductGridItem__itemOuter']") !== null;
+var links = document.querySelectorAll(hasGrid
+    ? "[class*='ProductGridItem__itemOuter'] a[href*='/dp/']:not([data-crawler-seen])"
+    : "a[href*='/dp/']:not([data-crawler-seen])");
+var hrefs = [];
+for (var i = 0; i < links.length; i++) {
+    links[i].setAttribute('data-crawler-seen', '1');
+    hrefs.push(links[i].href);
+}
+window.scrollTo(0, document.body.scrollHeight);
+return {hrefs: hrefs, height: document.body.scrollHeight};
+"""
+
+# 상품 항목 선택자별로 항목당 첫 링크의 href를 한 번에 반환
+ITEM_LINKS_SCRIPT = """
+var itemSelectors = arguments[0], linkSelectors = arguments[1];
+for (var i = 0; i < itemSelectors.length; i++) {
+    var items = document.querySelectorAll(itemSelectors[i]);
+    if (!items.length) continue;
+    var hrefs = [];
+    for (var j = 0; j < items.length; j++) {
+        var link = null;
+        for (var k = 0; k < linkSelectors.length && !link; k++) {
+            link = items[j].matches(linkSelectors[k]) ? items[j] : items[j].querySelector(linkSelectors[k]);
+        }
+        if (link && link.href) hrefs.push(link.href);
+    }
+    return {selector: itemSelectors[i], count: items.length, hrefs: hrefs};
+}
+return {selector: null, count: 0, hrefs: []};
+"""
+
+ALL_PRODUCT_LINKS_SCRIPT = """
+return Array.prototype.map.call(document.querySelectorAll("a[href*='/dp/']"), function (a) { return a.href; });
+"""
+
+ITEM_SELECTORS = [
+    ".ProductGridItem__itemOuter__KUtvv",  # 아마존 스토어 페이지
+    "[data-component-type='s-search-result']",  # 검색 결과
+    ".s-result-item",                      # 다른 검색 결과 형식
+    ".a-carousel-card",                    # 캐러셀 항목
+    ".a-link-normal[href*='/dp/']"         # 상품 링크가 포함된 일반 링크
+]
+
+LINK_SELECTORS = [
+    "a.ProductGridItem__overlay__IQ3Kw",  # 스토어 페이지
+    "a.a-link-normal",                  # 일반 링크
+    "a.a-text-normal",                  # 텍스트 링크
+    "a[href*='/dp/']"                   # 상품 상세 페이지 링크
+]
+
+# 스토어 하위 페이지 탭 링크
+STORE_TABS_SCRIPT = """
+var links = document.querySelectorAll("a[href*='/stores/'][href*='/page/']");
+var hrefs = [];
+for (var i = 0; i < links.length; i++) { hrefs.push(links[i].href.split('?')[0]); }
+return hrefs;
+"""
+
 class StoreCrawler:
-    def __init__(self, browser_manager):
+    def __init__(self, browser_manager, asin_index=None):
         self.browser = browser_manager
-        self.driver = browser_manager.driver
-        self.product_urls = []
+        self.asins = OrderedAsinSet()  # 현재 스토어에서 수집한 ASIN
+        self.asin_index = asin_index  # 배치 내 여러 스토어가 공유하는 ASIN 집합 (선택)
+        self.new_asins = []  # 공유 집합에 처음 추가된 ASIN (merge_new_asins 호출 후)
+    
+    @property
+    def driver(self):
+        """현재 드라이버 (스크롤 도중 세션이 재시작되어도 새 드라이버 사용)"""
+        return self.browser.driver
+    
+    @property
+    def product_urls(self):
+        """수집한 상품 URL 목록 (발견 순서)"""
+        return self.asins.urls()
+    
+    def merge_new_asins(self):
+        """수집한 ASIN을 공유 집합에 반영하고 처음 추가된 ASIN 목록 반환
+        
+        스토어 작업이 성공한 뒤에만 호출한다. 수집 도중 공유 집합에 바로 넣으면 작업이 실패해 재시도될 때
+        모든 ASIN이 이미 등록된 것으로 보여 하위 작업이 만들어지지 않는다.
+        """
+        if self.asin_index is None:
+            self.new_asins = list(self.asins)
+        else:
+            self.new_asins = [asin for asin in self.asins if self.asin_index.add(asin)]
+        return self.new_asins
     
     def crawl_store(self, store_id):
         """스토어 ID로 스토어의 모든 상품 URL 수집 (기존 메서드 유지)"""
@@ -27,7 +108,8 @@ class StoreCrawler:
     def crawl_store_by_url(self, store_url, max_products=None):
         """스토어 URL로 모든 상품 URL 수집 (새로운 메서드)"""
         max_products = max_products or CRAWLING["max_products"]
-        self.product_urls = []  # 재설정
+        self.asins = OrderedAsinSet()  # 재설정
+        self.new_asins = []
         
         success = self.browser.get_page(store_url)
         
@@ -46,88 +128,56 @@ class StoreCrawler:
         
         page_loaded = False
         for selector in selectors:
-            try:
-                self.browser.wait_for_element(By.CSS_SELECTOR, selector, timeout=5)
+            # wait_for_element는 시간 초과 시 예외 대신 None을 반환함
+            if self.browser.wait_for_element(By.CSS_SELECTOR, selector, timeout=5) is not None:
                 logger.info(f"페이지 구조 감지됨: {selector}")
                 page_loaded = True
                 break
-            except TimeoutException:
-                continue
         
         if not page_loaded:
             # 페이지는 로드되었지만 알려진 구조가 없음 - 계속 진행하고 다른 방법 시도
             logger.warning("알려진 스토어 페이지 구조를 찾을 수 없습니다. 대체 방법으로 시도합니다.")
         
+        # 브랜드 스토어는 스크롤 시 상품을 지연 로드하므로 무한 스크롤 수집 사용
+        if "/stores/" in store_url or self.driver.find_elements(By.CSS_SELECTOR, "[class*='ProductGridItem__itemOuter']"):
+            return self.harvest_store(store_url, max_products)
+        
         # 여러 페이지를 처리하기 위한 로직 (페이지네이션이 있을 경우)
         current_page = 1
         
-        while len(self.product_urls) < max_products:
+        while len(self.asins) < max_products:
             logger.info(f"스토어 페이지 {current_page} 크롤링 중")
             
-            # 페이지 구조에 따라 상품 항목 추출 시도
-            product_items = []
-            
-            # 여러 선택자 시도
-            for selector in [
-                ".ProductGridItem__itemOuter__KUtvv",  # 아마존 스토어 페이지
-                "[data-component-type='s-search-result']",  # 검색 결과
-                ".s-result-item",                      # 다른 검색 결과 형식
-                ".a-carousel-card",                    # 캐러셀 항목
-                ".a-link-normal[href*='/dp/']"         # 상품 링크가 포함된 일반 링크
-            ]:
-                product_items = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if product_items:
-                    logger.info(f"{len(product_items)}개의 상품 항목을 찾았습니다 (선택자: {selector})")
-                    break
+            # 페이지 구조에 따라 상품 항목의 링크를 한 번의 스크립트 호출로 추출
+            try:
+                result = self.driver.execute_script(ITEM_LINKS_SCRIPT, ITEM_SELECTORS, LINK_SELECTORS)
+            except Exception as e:
+                logger.warning(f"상품 링크 추출 중 오류: {str(e)}")
+                result = {"count": 0, "hrefs": []}
             
             # 상품 항목이 없으면 링크 직접 추출 시도
-            if not product_items:
+            if not result.get("count"):
                 logger.warning("상품 항목을 찾을 수 없습니다. 링크 직접 추출을 시도합니다.")
-                self._extract_all_product_links()
+                self._extract_all_product_links(max_products)
                 
-                if self.product_urls:
-                    logger.info(f"{len(self.product_urls)}개의 상품 URL을 직접 추출했습니다.")
+                if self.asins:
+                    logger.info(f"{len(self.asins)}개의 상품 URL을 직접 추출했습니다.")
                     break
                 else:
                     logger.error("상품 URL을 찾을 수 없습니다.")
                     break
             
-            # 각 상품의 URL 추출
-            for item in product_items:
-                try:
-                    # 여러 선택자 시도
-                    link_element = None
-                    for link_selector in [
-                        "a.ProductGridItem__overlay__IQ3Kw",  # 스토어 페이지
-                        "a.a-link-normal",                  # 일반 링크
-                        "a.a-text-normal",                  # 텍스트 링크
-                        "a[href*='/dp/']"                   # 상품 상세 페이지 링크
-                    ]:
-                        try:
-                            link_elements = item.find_elements(By.CSS_SELECTOR, link_selector)
-                            if link_elements:
-                                link_element = link_elements[0]
-                                break
-                        except NoSuchElementException:
-                            continue
-                    
-                    if link_element:
-                        product_url = link_element.get_attribute("href")
-                        
-                        if product_url:
-                            product_url = self._normalize_url(product_url)
-                            if product_url and product_url not in self.product_urls:
-                                self.product_urls.append(product_url)
-                                logger.debug(f"상품 URL 발견: {product_url}")
-                    
-                    # 최대 상품 수 도달 시 중단
-                    if len(self.product_urls) >= max_products:
-                        logger.info(f"최대 상품 수에 도달: {max_products}")
-                        break
-                        
-                except Exception as e:
-                    logger.warning(f"상품 URL 추출 중 오류: {str(e)}")
-                    continue
+            logger.info(f"{result['count']}개의 상품 항목을 찾았습니다 (선택자: {result['selector']})")
+            
+            # 각 상품의 URL 추가 (ASIN 기준 중복 제거)
+            for href in result["hrefs"]:
+                if self._add_product_url(href):
+                    logger.debug(f"상품 URL 발견: {href}")
+                
+                # 최대 상품 수 도달 시 중단
+                if len(self.asins) >= max_products:
+                    logger.info(f"최대 상품 수에 도달: {max_products}")
+                    break
             
             # 다음 페이지로 이동 (페이지네이션 처리)
             if not self._go_to_next_page():
@@ -136,57 +186,90 @@ class StoreCrawler:
                 
             current_page += 1
             
-        logger.info(f"스토어에서 {len(self.product_urls)}개의 상품 URL을 수집했습니다")
+        logger.info(f"스토어에서 {len(self.asins)}개의 상품 URL을 수집했습니다")
+        return self.product_urls
+    
+    def harvest_store(self, store_url, max_products):
+        """스토어 페이지(및 하위 탭)를 스크롤하며 새로 나타난 상품 링크를 수집"""
+        tabs = []
+        if CRAWLING["store_follow_tabs"]:
+            try:
+                tabs = self.driver.execute_script(STORE_TABS_SCRIPT) or []
+            except Exception as e:
+                logger.warning(f"스토어 탭 링크 추출 실패: {str(e)}")
+        
+        self._harvest_scroll(max_products)
+        
+        # 하위 페이지 탭 순회 (이미 방문한 페이지 제외)
+        visited = {store_url.split("?")[0]}
+        for tab_url in tabs[:CRAWLING["store_max_tabs"]]:
+            if len(self.asins) >= max_products:
+                break
+            if tab_url in visited:
+                continue
+            visited.add(tab_url)
+            
+            logger.info(f"스토어 하위 페이지 수집: {tab_url}")
+            if self.browser.get_page(tab_url, page_type="store"):
+                self._harvest_scroll(max_products)
+        
+        logger.info(f"스토어에서 {len(self.asins)}개의 상품 URL을 수집했습니다")
         return self.product_urls
     
-    def _extract_all_product_links(self):
-        """페이지에서 모든 상품 링크를 직접 추출"""
+    def _harvest_scroll(self, max_products):
+        """스크롤 단계마다 한 번의 execute_script로 새 링크 수집, 개수가 늘지 않으면 중단"""
+        stalled = 0
+        last_height = None
+        
+        for step in range(CRAWLING["store_scroll_max_steps"]):
+            try:
+                result = self.driver.execute_script(HARVEST_SCRIPT)
+            except Exception as e:
+                logger.warning(f"스크롤 수집 중 오류: {str(e)}")
+                break
+            
+            before = len(self.asins)
+            for href in result.get("hrefs", []):
+                self._add_product_url(href)
+                if len(self.asins) >= max_products:
+                    logger.info(f"최대 상품 수에 도달: {max_products}")
+                    return
+            
+            new_count = len(self.asins) - before
+            height = result.get("height")
+            logger.debug(f"스크롤 {step + 1}: 신규 {new_count}개 (누적 {len(self.asins)}개)")
+            
+            # 새 상품도 없고 페이지 높이도 그대로면 지연 로드가 끝난 것으로 판단
+            if new_count == 0 and height == last_height:
+                stalled += 1
+                if stalled >= CRAWLING["store_scroll_stall_steps"]:
+                    break
+            else:
+                stalled = 0
+            last_height = height
+            
+            time.sleep(CRAWLING["store_scroll_pause"])
+    
+    def _add_product_url(self, url):
+        """ASIN 기준으로 중복이 아니면 상품 추가 (공유 집합에는 merge_new_asins에서 반영)"""
+        return self.asins.add_url(url) is not None
+    
+    def _extract_all_product_links(self, max_products=None):
+        """페이지에서 모든 상품 링크를 한 번의 스크립트 호출로 직접 추출"""
         try:
             # 아마존 상품 링크 패턴에 맞는 모든 링크 추출
-            all_links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/dp/']")
+            all_links = self.driver.execute_script(ALL_PRODUCT_LINKS_SCRIPT) or []
             
-            for link in all_links:
-                try:
-                    url = link.get_attribute("href")
-                    if url and "/dp/" in url:
-                        normalized_url = self._normalize_url(url)
-                        if normalized_url and normalized_url not in self.product_urls:
-                            self.product_urls.append(normalized_url)
-                except Exception:
-                    continue
+            for url in all_links:
+                self._add_product_url(url)
+                if max_products and len(self.asins) >= max_products:
+                    break
             
             return len(all_links) > 0
         except Exception as e:
             logger.error(f"링크 직접 추출 중 오류: {str(e)}")
             return False
     
-    def _normalize_url(self, url):
-        """URL 정규화 (추적 매개변수 제거 등)"""
-        if not url:
-            return None
-            
-        # ASIN을 추출하고 표준 URL 형식으로 변환
-        if "/dp/" in url:
-            asin_match = re.search(r"/dp/([A-Z0-9]{10})", url)
-            if asin_match:
-                asin = asin_match.group(1)
-                return f"{AMAZON['base_url']}/dp/{asin}"
-            
-            # 정규식으로 찾지 못한 경우 다른 방법 시도
-            asin_start = url.find("/dp/") + 4
-            asin_end = url.find("/", asin_start) if url.find("/", asin_start) > 0 else None
-            if asin_end:
-                asin = url[asin_start:asin_end]
-            else:
-                asin = url[asin_start:]
-                if "?" in asin:
-                    asin = asin.split("?")[0]
-            
-            if len(asin) == 10 and re.match(r"[A-Z0-9]{10}", asin):
-                return f"{AMAZON['base_url']}/dp/{asin}"
-        
-        return url
-    
     def _go_to_next_page(self):
         """다음 페이지로 이동 (페이지네이션 처리)"""
         try:
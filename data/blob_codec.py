@@ -0,0 +1,89 @@
+"""상품 JSON 열 저장 형식 (압축 JSON, zlib 압축, 이미지 ID 인터닝, 내용 해시)"""
+import hashlib
+import json
+import zlib
+
+from config import DATABASE
+
+IMAGE_URL_PREFIX = "https://m.media-amazon.com/images/I/"
+IMAGE_URL_SUFFIX = ".jpg"
+
+# 압축 블롭 형식 표시 (앞 2바이트). 사전을 바꾸면 버전을 올리고 이전 사전도 남겨 둘 것
+BLOB_MAGIC = b"z1"
+
+# 상품마다 반복되는 상세 정보 키/이미지 URL 조각 (zlib 사전, 짧은 블롭도 잘 압축되도록)
+ZLIB_DICTIONARY = json.dumps([
+    "Product Dimensions", "Item model number", "Department", "Date First Available",
+    "Manufacturer", "ASIN", "Country of Origin", "Best Sellers Rank", "Customer Reviews",
+    "Is Discontinued By Manufacturer", "Package Dimensions", "Item Weight", "UPC",
+    "Units", "Brand", "Item Form", "Skin Type", "Scent", "Special Feature", "Ingredients",
+    "title", "value", "selected", "asin", "Fluid Ounces", "Pack of", "out of 5 stars",
+    "in Beauty & Personal Care", IMAGE_URL_PREFIX,
+], separators=(",", ":")).encode("utf-8")
+
+
+def encode_images(images):
+    """표준 아마존 이미지 URL은 이미지 ID만 저장"""
+    encoded = []
+    for url in images or []:
+        if url.startswith(IMAGE_URL_PREFIX) and url.endswith(IMAGE_URL_SUFFIX):
+            image_id = url[len(IMAGE_URL_PREFIX):-len(IMAGE_URL_SUFFIX)]
+            if "/" not in image_id:
+                encoded.append(image_id)
+                continue
+        encoded.append(url)
+    return encoded
+
+
+def decode_images(images):
+    """이미지 ID를 URL로 복원 ('/'가 없는 항목이 ID)"""
+    return [url if "/" in url else IMAGE_URL_PREFIX + url + IMAGE_URL_SUFFIX for url in images or []]
+
+
+def dumps(value):
+    """공백 없는 JSON 문자열"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_json(value):
+    """JSON 열 값 인코딩 (compress_min_bytes 이상이면 zlib 압축 블롭, 아니면 텍스트)"""
+    text = dumps(value)
+    data = text.encode("utf-8")
+    if len(data) < DATABASE["compress_min_bytes"]:
+        return text
+
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, zlib.Z_DEFAULT_STRATEGY, ZLIB_DICTIONARY)
+    blob = BLOB_MAGIC + compressor.compress(data) + compressor.flush()
+    # 압축 효과가 없으면 텍스트로 저장
+    return blob if len(blob) < len(data) else text
+
+
+def decode_json(value):
+    """encode_json 값(또는 이전 형식의 JSON 텍스트) 디코딩"""
+    if isinstance(value, (bytes, memoryview)):
+        value = bytes(value)
+        if value[:2] != BLOB_MAGIC:
+            raise ValueError("Unknown blob format")
+        decompressor = zlib.decompressobj(15, ZLIB_DICTIONARY)
+        value = decompressor.decompress(value[2:]) + decompressor.flush()
+    return json.loads(value)
+
+
+def encode_product_blobs(product):
+    """상품의 JSON 열 4개를 저장 형식으로 인코딩 (features, details, variations, images 순)"""
+    return (
+        encode_json(product.features),
+        encode_json(product.details),
+        encode_json(product.variations),
+        encode_json(encode_images(product.images)),
+    )
+
+
+def content_hash(product):
+    """수집 시각을 제외한 상품 내용 해시 (변경이 없으면 저장 생략)"""
+    payload = dumps([
+        product.url, product.title, product.price, product.rating, product.review_count,
+        product.description, product.features, product.details, product.variations,
+        product.images, product.brand,
+    ])
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
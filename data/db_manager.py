@@ -1,30 +1,77 @@
 import sqlite3
-import json
 import os
 import csv
-from datetime import datetime
+import functools
+import threading
+from datetime import datetime, timedelta
 
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from config import DATABASE, DATA_DIR
+from config import DATABASE, DATA_DIR, CRAWLING, ensure_dir
 from utils.logger import setup_logger
 from data.product_model import Product
+from data.blob_codec import content_hash, decode_images, decode_json, dumps, encode_product_blobs
 from data.review_model import Review
+from data.job_model import CrawlJob
 
 logger = setup_logger(__name__)
 
+PRODUCT_COLUMNS = ", ".join(Product.COLUMNS)
+REVIEW_COLUMNS = ", ".join(Review.COLUMNS)
+
+# 변형 그룹으로 연결된 리뷰까지 포함하는 ASIN 조건 (리뷰는 그룹에서 실제로 수집한 ASIN 하나로 저장됨)
+REVIEW_ASIN_FILTER = "(asin = ? OR review_id IN (SELECT review_id FROM review_asins WHERE asin = ?))"
+
+# 가격 추적 등을 위해 변경 이력을 남기는 상품 필드
+HISTORY_FIELDS = ("price", "rating", "review_count", "title", "brand")
+HISTORY_COLUMNS = ", ".join(HISTORY_FIELDS)
+
+# 리뷰 저장 (같은 review_id면 행을 교체하지 않고 갱신해 rowid와 전문 검색 색인을 유지)
+REVIEW_UPSERT = f"""
+INSERT INTO reviews ({REVIEW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (review_id) DO UPDATE SET {", ".join(f"{column} = excluded.{column}" for column in Review.COLUMNS[1:])}
+"""
+
+# 리뷰 전문 검색 색인 동기화 트리거 (외부 콘텐츠 FTS5 테이블)
+REVIEW_FTS_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_delete AFTER DELETE ON reviews BEGIN
+        INSERT INTO reviews_fts (reviews_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_update AFTER UPDATE OF title, body ON reviews BEGIN
+        INSERT INTO reviews_fts (reviews_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body);
+        INSERT INTO reviews_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+    END
+    ''',
+)
+
+def synchronized(method):
+    """여러 작업 스레드가 하나의 연결을 공유하므로 메서드 단위로 직렬화"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class DBManager:
     def __init__(self):
         self.db_path = DATABASE["path"]
         self.conn = None
         self.cursor = None
+        self.lock = threading.RLock()
+        self.fts_enabled = False
         self.initialize_db()
     
     def initialize_db(self):
         """데이터베이스 초기화 및 테이블 생성"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            ensure_dir(os.path.dirname(self.db_path))
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
             self.cursor = self.conn.cursor()
             
             # 상품 테이블 생성
@@ -42,9 +89,21 @@ class DBManager:
                 variations TEXT,
                 images TEXT,
                 brand TEXT,
-                crawl_date TEXT
+                crawl_date TEXT,
+                content_hash TEXT
             )
             ''')
+            self._add_missing_columns("products", {"content_hash": "TEXT"})
+            
+            # 상품 변경 이력 (추가 전용, 바뀐 필드만 JSON으로 기록)
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS product_history (
+                asin TEXT,
+                crawl_date TEXT,
+                changes TEXT,
+                PRIMARY KEY (asin, crawl_date)
+            ) WITHOUT ROWID
+            ''')
             
             # 리뷰 테이블 생성
             self.cursor.execute('''
@@ -63,16 +122,144 @@ class DBManager:
             )
             ''')
             
+            # 크롤링 작업 테이블 생성 (배치 실행 및 재개용)
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT,
+                target TEXT,
+                max_products INTEGER,
+                max_reviews INTEGER,
+                crawl_reviews INTEGER,
+                reviews_only INTEGER,
+                expand_variations INTEGER,
+                refresh INTEGER,
+                parent_id INTEGER,
+                status TEXT,
+                attempts INTEGER,
+                challenge_requeues INTEGER,
+                not_before REAL,
+                last_error TEXT,
+                created_at TEXT,
+                updated_at TEXT
+            )
+            ''')
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+            self._add_missing_columns("jobs", {
+                "reviews_only": "INTEGER",
+                "expand_variations": "INTEGER",
+                "refresh": "INTEGER",
+                "challenge_requeues": "INTEGER",
+            })
+            
+            # ASIN 레지스트리 (발견/수집 시점) 및 발견 경로 (스토어, 검색, 변형)
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS asin_registry (
+                asin TEXT PRIMARY KEY,
+                first_seen TEXT,
+                product_fetched_at TEXT,
+                reviews_fetched_at TEXT
+            )
+            ''')
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS asin_sources (
+                asin TEXT,
+                source_type TEXT,
+                source TEXT,
+                first_seen TEXT,
+                last_seen TEXT,
+                PRIMARY KEY (asin, source_type, source)
+            )
+            ''')
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_asin_sources_source ON asin_sources (source_type, source)")
+            
+            # 변형(옵션) 그룹: 같은 리뷰를 공유하는 ASIN 묶음 (부모 ASIN 기준)
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS variation_families (
+                asin TEXT PRIMARY KEY,
+                family_id TEXT,
+                updated_at TEXT
+            )
+            ''')
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_variation_families_family ON variation_families (family_id)")
+            
+            # 그룹에서 한 번 수집한 리뷰를 그룹의 모든 ASIN에 연결
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS review_asins (
+                asin TEXT,
+                review_id TEXT,
+                PRIMARY KEY (asin, review_id)
+            ) WITHOUT ROWID
+            ''')
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_reviews_asin ON reviews (asin)")
+            
+            if DATABASE["review_fts"]:
+                self.fts_enabled = self._create_review_fts()
+            
             self.conn.commit()
             logger.info("Database initialized successfully")
         except sqlite3.Error as e:
             logger.error(f"Database initialization error: {str(e)}")
     
+    def _create_review_fts(self):
+        """리뷰 제목/본문 전문 검색 테이블과 동기화 트리거 생성 (처음 만들 때 기존 리뷰 색인)"""
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reviews_fts'")
+        exists = self.cursor.fetchone() is not None
+        try:
+            self.cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5 (
+                title, body,
+                content = 'reviews', content_rowid = 'rowid',
+                tokenize = '{DATABASE["fts_tokenizer"]}'
+            )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"리뷰 전문 검색 색인을 사용할 수 없습니다 (FTS5 미지원): {str(e)}")
+            return False
+        
+        for trigger in REVIEW_FTS_TRIGGERS:
+            self.cursor.execute(trigger)
+        if not exists:
+            self.cursor.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')")
+            logger.info("Review full-text index built")
+        return True
+    
+    def _add_missing_columns(self, table, columns):
+        """이전 버전으로 만든 테이블에 새 열 추가"""
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in self.cursor.fetchall()}
+        for name, column_type in columns.items():
+            if name not in existing:
+                self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+                logger.info(f"Added column {table}.{name}")
+    
+    @synchronized
     def save_product(self, product):
-        """상품 정보 저장"""
+        """상품 정보 저장 (내용 해시가 같으면 쓰기 생략)"""
         try:
-            self.cursor.execute('''
-            INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            digest = content_hash(product)
+            self.cursor.execute(f"SELECT content_hash, {HISTORY_COLUMNS} FROM products WHERE asin = ?", (product.asin,))
+            row = self.cursor.fetchone()
+            if row and row[0] == digest:
+                logger.info(f"Product unchanged, skipped write: {product.asin}")
+                return True
+            
+            # 이전 값과 달라진 추적 필드만 이력에 기록 (첫 수집이면 전부)
+            changes = {}
+            for index, field in enumerate(HISTORY_FIELDS):
+                value = getattr(product, field)
+                if row is None or row[index + 1] != value:
+                    changes[field] = value
+            if changes:
+                self.cursor.execute(
+                    "INSERT OR REPLACE INTO product_history (asin, crawl_date, changes) VALUES (?, ?, ?)",
+                    (product.asin, product.crawl_date, dumps(changes))
+                )
+            
+            features, details, variations, images = encode_product_blobs(product)
+            self.cursor.execute(f'''
+            INSERT OR REPLACE INTO products ({PRODUCT_COLUMNS}, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 product.asin,
                 product.url,
@@ -81,37 +268,72 @@ class DBManager:
                 product.rating,
                 product.review_count,
                 product.description,
-                json.dumps(product.features),
-                json.dumps(product.details),
-                json.dumps(product.variations),
-                json.dumps(product.images),
+                features,
+                details,
+                variations,
+                images,
                 product.brand,
-                product.crawl_date
+                product.crawl_date,
+                digest
             ))
-            self.conn.commit()
+            self.conn.commit()  # 상품과 이력을 한 트랜잭션으로 기록
             logger.info(f"Product saved: {product.asin} - {product.title}")
             return True
         except sqlite3.Error as e:
+            self.conn.rollback()
             logger.error(f"Error saving product to database: {str(e)}")
             return False
     
+    @synchronized
+    def get_product_history(self, asin, start=None, end=None):
+        """상품 변경 이력 조회 (crawl_date 범위, 각 항목은 그 시점에 바뀐 필드만 포함)"""
+        query = "SELECT crawl_date, changes FROM product_history WHERE asin = ?"
+        params = [asin]
+        if start:
+            query += " AND crawl_date >= ?"
+            params.append(start)
+        if end:
+            query += " AND crawl_date <= ?"
+            params.append(end)
+        query += " ORDER BY crawl_date"
+        
+        try:
+            self.cursor.execute(query, params)
+            history = []
+            for crawl_date, changes in self.cursor.fetchall():
+                entry = {"crawl_date": crawl_date}
+                entry.update(decode_json(changes))
+                history.append(entry)
+            return history
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving product history: {str(e)}")
+            return []
+    
+    def get_field_series(self, asin, field, start=None, end=None):
+        """필드 하나의 시계열 [(crawl_date, value), ...] (값이 바뀐 시점만)"""
+        return [(entry["crawl_date"], entry[field])
+                for entry in self.get_product_history(asin, start, end) if field in entry]
+    
+    @staticmethod
+    def _review_values(review):
+        return (
+            review.review_id,
+            review.asin,
+            review.title,
+            review.rating,
+            review.date,
+            review.reviewer_name,
+            1 if review.verified_purchase else 0,
+            review.body,
+            review.helpful_count,
+            review.crawl_date
+        )
+    
+    @synchronized
     def save_review(self, review):
         """리뷰 정보 저장"""
         try:
-            self.cursor.execute('''
-            INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                review.review_id,
-                review.asin,
-                review.title,
-                review.rating,
-                review.date,
-                review.reviewer_name,
-                1 if review.verified_purchase else 0,
-                review.body,
-                review.helpful_count,
-                review.crawl_date
-            ))
+            self.cursor.execute(REVIEW_UPSERT, self._review_values(review))
             self.conn.commit()
             logger.debug(f"Review saved: {review.review_id}")
             return True
@@ -119,34 +341,42 @@ class DBManager:
             logger.error(f"Error saving review to database: {str(e)}")
             return False
     
+    @synchronized
     def save_reviews(self, reviews):
-        """여러 리뷰 정보 일괄 저장"""
+        """여러 리뷰 정보 일괄 저장 (한 트랜잭션, 리뷰 페이지 단위로 호출됨)"""
         try:
-            for review in reviews:
-                self.save_review(review)
+            self.cursor.executemany(REVIEW_UPSERT, [self._review_values(review) for review in reviews])
+            self.conn.commit()
             logger.info(f"Saved {len(reviews)} reviews")
             return True
-        except Exception as e:
+        except sqlite3.Error as e:
+            self.conn.rollback()
             logger.error(f"Error saving reviews to database: {str(e)}")
             return False
     
+    @synchronized
     def export_products_to_csv(self, file_path=None):
         """상품 정보를 CSV 파일로 내보내기"""
         if file_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_path = os.path.join(DATA_DIR, f"products_{timestamp}.csv")
+            file_path = os.path.join(ensure_dir(DATA_DIR), f"products_{timestamp}.csv")
         
         try:
-            self.cursor.execute("SELECT * FROM products")
-            products = self.cursor.fetchall()
+            self.cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products")
             
-            # 테이블 열 이름 가져오기
-            column_names = [description[0] for description in self.cursor.description]
+            # 압축/인터닝된 JSON 열은 일반 JSON 텍스트로 풀어서 기록
+            json_indexes = [Product.COLUMNS.index(name) for name in Product.JSON_FIELDS]
+            images_index = Product.COLUMNS.index("images")
             
             with open(file_path, 'w', newline='', encoding='utf-8') as csv_file:
                 csv_writer = csv.writer(csv_file)
-                csv_writer.writerow(column_names)  # 헤더 작성
-                csv_writer.writerows(products)     # 데이터 작성
+                csv_writer.writerow(Product.COLUMNS)  # 헤더 작성
+                for row in self.cursor:
+                    row = list(row)
+                    for index in json_indexes:
+                        value = decode_json(row[index])
+                        row[index] = dumps(decode_images(value) if index == images_index else value)
+                    csv_writer.writerow(row)  # 데이터 작성
             
             logger.info(f"Products exported to CSV: {file_path}")
             return True
@@ -154,16 +384,17 @@ class DBManager:
             logger.error(f"Error exporting products to CSV: {str(e)}")
             return False
     
+    @synchronized
     def export_reviews_to_csv(self, asin=None, file_path=None):
         """리뷰 정보를 CSV 파일로 내보내기"""
         if file_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             file_name = f"reviews_{asin}_{timestamp}.csv" if asin else f"reviews_all_{timestamp}.csv"
-            file_path = os.path.join(DATA_DIR, file_name)
+            file_path = os.path.join(ensure_dir(DATA_DIR), file_name)
         
         try:
             if asin:
-                self.cursor.execute("SELECT * FROM reviews WHERE asin = ?", (asin,))
+                self.cursor.execute(f"SELECT * FROM reviews WHERE {REVIEW_ASIN_FILTER}", (asin, asin))
             else:
                 self.cursor.execute("SELECT * FROM reviews")
                 
@@ -183,53 +414,378 @@ class DBManager:
             logger.error(f"Error exporting reviews to CSV: {str(e)}")
             return False
     
+    @synchronized
     def get_product(self, asin):
         """ASIN으로 상품 정보 조회"""
         try:
-            self.cursor.execute("SELECT * FROM products WHERE asin = ?", (asin,))
+            self.cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE asin = ?", (asin,))
             result = self.cursor.fetchone()
             
             if result:
-                column_names = [description[0] for description in self.cursor.description]
-                product_dict = {column_names[i]: result[i] for i in range(len(column_names))}
-                
-                # JSON 문자열을 리스트/딕셔너리로 변환
-                product_dict["features"] = json.loads(product_dict["features"])
-                product_dict["details"] = json.loads(product_dict["details"])
-                product_dict["variations"] = json.loads(product_dict["variations"])
-                product_dict["images"] = json.loads(product_dict["images"])
-                
-                return Product.from_dict(product_dict)
+                # JSON 열은 처음 접근할 때 디코딩
+                return Product.from_row(result)
             return None
         except sqlite3.Error as e:
             logger.error(f"Error retrieving product from database: {str(e)}")
             return None
     
+    @synchronized
     def get_reviews(self, asin, limit=None):
         """ASIN으로 상품 리뷰 조회"""
+        return list(self.iter_reviews(asin, limit))
+    
+    def _iter_rows(self, query, params=(), batch_size=None):
+        """전용 커서로 batch_size 행씩 읽어 하나씩 반환 (배치를 읽는 동안만 잠금)"""
+        batch_size = batch_size or DATABASE["read_batch_size"]
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
         try:
-            if limit:
-                self.cursor.execute("SELECT * FROM reviews WHERE asin = ? LIMIT ?", (asin, limit))
-            else:
-                self.cursor.execute("SELECT * FROM reviews WHERE asin = ?", (asin,))
-                
-            results = self.cursor.fetchall()
-            reviews = []
-            
-            if results:
-                column_names = [description[0] for description in self.cursor.description]
-                
-                for result in results:
-                    review_dict = {column_names[i]: result[i] for i in range(len(column_names))}
-                    # Boolean 값 변환
-                    review_dict["verified_purchase"] = bool(review_dict["verified_purchase"])
-                    reviews.append(Review.from_dict(review_dict))
-            
-            return reviews
+            while True:
+                with self.lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+    
+    def iter_reviews(self, asin=None, limit=None, batch_size=None):
+        """리뷰를 한 건씩 반환하는 제너레이터 (전체 테이블도 일정한 메모리로 순회)"""
+        query = f"SELECT {REVIEW_COLUMNS} FROM reviews"
+        params = []
+        if asin:
+            query += f" WHERE {REVIEW_ASIN_FILTER}"
+            params.extend([asin, asin])
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        from_row = Review.from_row
+        try:
+            for row in self._iter_rows(query, params, batch_size):
+                yield from_row(row)
         except sqlite3.Error as e:
             logger.error(f"Error retrieving reviews from database: {str(e)}")
+    
+    def iter_products(self, asins=None, batch_size=None):
+        """상품을 한 건씩 반환하는 제너레이터 (JSON 열은 처음 접근할 때 디코딩)"""
+        query = f"SELECT {PRODUCT_COLUMNS} FROM products"
+        params = []
+        if asins is not None:
+            asins = list(asins)
+            if not asins:
+                return
+            query += f" WHERE asin IN ({','.join('?' * len(asins))})"
+            params = asins
+        
+        from_row = Product.from_row
+        try:
+            for row in self._iter_rows(query, params, batch_size):
+                yield from_row(row)
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving products from database: {str(e)}")
+    
+    @synchronized
+    def search_reviews(self, query, asin=None, min_rating=None, max_rating=None, limit=20, offset=0):
+        """리뷰 제목/본문 전문 검색 (bm25 순위, 일치 부분 스니펫 포함)
+        
+        query는 FTS5 검색식(구문 "...", OR, NOT, 접두어*)을 그대로 쓰고, 문법 오류면 각 단어를 일반 검색어로 다시 검색한다.
+        점수가 높은 순으로 리뷰 딕셔너리에 score, snippet을 붙여 반환한다.
+        """
+        filters, params = [], []
+        if asin:
+            filters.append("(r.asin = ? OR r.review_id IN (SELECT review_id FROM review_asins WHERE asin = ?))")
+            params.extend([asin, asin])
+        if min_rating is not None:
+            filters.append("r.rating >= ?")
+            params.append(min_rating)
+        if max_rating is not None:
+            filters.append("r.rating <= ?")
+            params.append(max_rating)
+        columns = ", ".join(f"r.{column}" for column in Review.COLUMNS)
+        
+        if not self.fts_enabled:
+            # 색인이 없으면 전체 스캔 (순위/스니펫 없음)
+            logger.warning("리뷰 전문 검색 색인이 없어 LIKE 검색을 사용합니다")
+            where = " AND ".join(["(r.title LIKE ? OR r.body LIKE ?)"] + filters)
+            sql = f"SELECT {columns}, NULL, NULL FROM reviews r WHERE {where} LIMIT ? OFFSET ?"
+            pattern = f"%{query}%"
+            return self._search_rows(sql, [pattern, pattern] + params + [limit, offset])
+        
+        title_weight, body_weight = DATABASE["fts_weights"]
+        where = " AND ".join(["reviews_fts MATCH ?"] + filters)
+        sql = f'''
+        SELECT {columns}, -bm25(reviews_fts, {title_weight}, {body_weight}) AS score,
+               snippet(reviews_fts, -1, '[', ']', '...', 16)
+        FROM reviews_fts JOIN reviews r ON r.rowid = reviews_fts.rowid
+        WHERE {where}
+        ORDER BY bm25(reviews_fts, {title_weight}, {body_weight})
+        LIMIT ? OFFSET ?
+        '''
+        try:
+            return self._search_rows(sql, [query] + params + [limit, offset], raise_errors=True)
+        except sqlite3.OperationalError as e:
+            logger.info(f"검색식을 해석하지 못해 일반 검색어로 다시 검색합니다: {str(e)}")
+            quoted = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+            return self._search_rows(sql, [quoted] + params + [limit, offset])
+    
+    def _search_rows(self, sql, params, raise_errors=False):
+        count = len(Review.COLUMNS)
+        try:
+            self.cursor.execute(sql, params)
+            results = []
+            for row in self.cursor.fetchall():
+                entry = Review.from_row(row[:count]).to_dict()
+                entry["score"] = round(row[count], 4) if row[count] is not None else None
+                entry["snippet"] = row[count + 1]
+                results.append(entry)
+            return results
+        except sqlite3.OperationalError:
+            if raise_errors:
+                raise
+            logger.error("Error searching reviews", exc_info=True)
+            return []
+        except sqlite3.Error as e:
+            logger.error(f"Error searching reviews: {str(e)}")
+            return []
+    
+    @synchronized
+    def add_jobs(self, jobs):
+        """크롤링 작업 일괄 등록 (단일 트랜잭션, job_id 할당)"""
+        try:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for job in jobs:
+                self.cursor.execute('''
+                INSERT INTO jobs (kind, target, max_products, max_reviews, crawl_reviews, reviews_only,
+                                  expand_variations, refresh, parent_id, status, attempts, challenge_requeues,
+                                  not_before, last_error, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    job.kind,
+                    job.target,
+                    job.max_products,
+                    job.max_reviews,
+                    1 if job.crawl_reviews else 0,
+                    1 if job.reviews_only else 0,
+                    1 if job.expand_variations else 0,
+                    1 if job.refresh else 0,
+                    job.parent_id,
+                    job.status,
+                    job.attempts,
+                    job.challenge_requeues,
+                    job.not_before,
+                    job.last_error,
+                    job.created_at,
+                    now
+                ))
+                job.job_id = self.cursor.lastrowid
+            self.conn.commit()
+            logger.info(f"Added {len(jobs)} jobs")
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error adding jobs to database: {str(e)}")
+            return False
+    
+    @synchronized
+    def update_job(self, job):
+        """작업 상태 갱신"""
+        try:
+            self.cursor.execute('''
+            UPDATE jobs SET status = ?, attempts = ?, challenge_requeues = ?, not_before = ?, last_error = ?,
+                            updated_at = ?
+            WHERE job_id = ?
+            ''', (
+                job.status,
+                job.attempts,
+                job.challenge_requeues,
+                job.not_before,
+                job.last_error,
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                job.job_id
+            ))
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error updating job {job.job_id}: {str(e)}")
+            return False
+    
+    @synchronized
+    def get_pending_jobs(self):
+        """미완료 작업 조회 (중단된 실행의 running 작업은 pending으로 되돌림)"""
+        try:
+            self.cursor.execute("UPDATE jobs SET status = ? WHERE status = ?", (CrawlJob.PENDING, CrawlJob.RUNNING))
+            self.conn.commit()
+            
+            self.cursor.execute("SELECT * FROM jobs WHERE status = ? ORDER BY job_id", (CrawlJob.PENDING,))
+            column_names = [description[0] for description in self.cursor.description]
+            return [CrawlJob.from_dict(dict(zip(column_names, row))) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving pending jobs: {str(e)}")
             return []
     
+    @synchronized
+    def register_asins(self, asins, source_type, source):
+        """발견한 ASIN과 발견 경로 기록 (source_type: store, search, variation)"""
+        asins = list(asins)
+        if not asins:
+            return True
+        try:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.cursor.executemany(
+                "INSERT OR IGNORE INTO asin_registry (asin, first_seen) VALUES (?, ?)",
+                [(asin, now) for asin in asins]
+            )
+            self.cursor.executemany('''
+            INSERT INTO asin_sources (asin, source_type, source, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (asin, source_type, source) DO UPDATE SET last_seen = excluded.last_seen
+            ''', [(asin, source_type, source, now, now) for asin in asins])
+            self.conn.commit()
+            logger.info(f"Registered {len(asins)} ASINs from {source_type}: {source}")
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error registering ASINs: {str(e)}")
+            return False
+    
+    @synchronized
+    def mark_asin_fetched(self, asin, what="product"):
+        """상품 정보(product) 또는 리뷰(reviews) 수집 시점 기록"""
+        column = "reviews_fetched_at" if what == "reviews" else "product_fetched_at"
+        try:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.cursor.execute(f'''
+            INSERT INTO asin_registry (asin, first_seen, {column}) VALUES (?, ?, ?)
+            ON CONFLICT (asin) DO UPDATE SET {column} = excluded.{column}
+            ''', (asin, now, now))
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error updating ASIN registry: {str(e)}")
+            return False
+    
+    @synchronized
+    def get_fresh_asins(self, asins, what="product", max_age=None):
+        """max_age(초) 이내에 이미 수집한 ASIN 집합"""
+        column = "reviews_fetched_at" if what == "reviews" else "product_fetched_at"
+        max_age = CRAWLING["refetch_after"] if max_age is None else max_age
+        cutoff = (datetime.now() - timedelta(seconds=max_age)).strftime("%Y-%m-%d %H:%M:%S")
+        asins = list(asins)
+        fresh = set()
+        try:
+            # SQLite 변수 개수 제한을 고려해 나누어 조회
+            for start in range(0, len(asins), 500):
+                chunk = asins[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                self.cursor.execute(
+                    f"SELECT asin FROM asin_registry WHERE asin IN ({placeholders}) AND {column} >= ?",
+                    chunk + [cutoff]
+                )
+                fresh.update(row[0] for row in self.cursor.fetchall())
+            return fresh
+        except sqlite3.Error as e:
+            logger.error(f"Error querying ASIN registry: {str(e)}")
+            return set()
+    
+    @synchronized
+    def get_unfetched_asins(self, source_type, source, what="product", max_age=None):
+        """특정 경로로 발견했지만 max_age 이내에 수집하지 않은 ASIN 목록"""
+        column = "reviews_fetched_at" if what == "reviews" else "product_fetched_at"
+        max_age = CRAWLING["refetch_after"] if max_age is None else max_age
+        cutoff = (datetime.now() - timedelta(seconds=max_age)).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self.cursor.execute(f'''
+            SELECT s.asin FROM asin_sources s JOIN asin_registry r ON r.asin = s.asin
+            WHERE s.source_type = ? AND s.source = ? AND (r.{column} IS NULL OR r.{column} < ?)
+            ORDER BY s.first_seen
+            ''', (source_type, source, cutoff))
+            return [row[0] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error querying ASIN registry: {str(e)}")
+            return []
+    
+    @synchronized
+    def get_asin_sources(self, asin):
+        """ASIN의 발견 경로 목록"""
+        try:
+            self.cursor.execute(
+                "SELECT source_type, source, first_seen, last_seen FROM asin_sources WHERE asin = ? ORDER BY first_seen",
+                (asin,)
+            )
+            column_names = [description[0] for description in self.cursor.description]
+            return [dict(zip(column_names, row)) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Error querying ASIN sources: {str(e)}")
+            return []
+    
+    @synchronized
+    def save_variation_family(self, family_id, asins):
+        """변형 그룹 구성원 기록 (이미 다른 그룹에 있던 ASIN은 새 그룹으로 이동)"""
+        asins = list(dict.fromkeys(asin for asin in asins if asin))
+        if not family_id or not asins:
+            return 0
+        try:
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.cursor.executemany('''
+            INSERT INTO variation_families (asin, family_id, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (asin) DO UPDATE SET family_id = excluded.family_id, updated_at = excluded.updated_at
+            ''', [(asin, family_id, now) for asin in asins])
+            self.conn.commit()
+            return len(asins)
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error saving variation family: {str(e)}")
+            return 0
+    
+    @synchronized
+    def get_variation_family(self, asin):
+        """ASIN이 속한 변형 그룹 (그룹 ID, 구성원 ASIN 목록). 그룹이 없으면 (None, [])"""
+        try:
+            self.cursor.execute('''
+            SELECT m.family_id, m.asin FROM variation_families f
+            JOIN variation_families m ON m.family_id = f.family_id
+            WHERE f.asin = ?
+            ORDER BY m.asin
+            ''', (asin,))
+            rows = self.cursor.fetchall()
+            if not rows:
+                return None, []
+            return rows[0][0], [row[1] for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Error querying variation family: {str(e)}")
+            return None, []
+    
+    @synchronized
+    def link_family_reviews(self, family_id):
+        """그룹 구성원 중 누군가로 수집한 리뷰를 모든 구성원에 연결하고 구성원 전체의 리뷰 수집 시점 기록
+        
+        새로 연결한 (ASIN, 리뷰) 수 반환
+        """
+        try:
+            before = self.conn.total_changes
+            self.cursor.execute('''
+            INSERT OR IGNORE INTO review_asins (asin, review_id)
+            SELECT m.asin, r.review_id FROM variation_families f
+            JOIN reviews r ON r.asin = f.asin
+            JOIN variation_families m ON m.family_id = f.family_id
+            WHERE f.family_id = ?
+            ''', (family_id,))
+            linked = self.conn.total_changes - before
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.cursor.execute('''
+            INSERT INTO asin_registry (asin, first_seen, reviews_fetched_at)
+            SELECT asin, ?, ? FROM variation_families WHERE family_id = ?
+            ON CONFLICT (asin) DO UPDATE SET reviews_fetched_at = excluded.reviews_fetched_at
+            ''', (now, now, family_id))
+            self.conn.commit()
+            return linked
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logger.error(f"Error linking family reviews: {str(e)}")
+            return 0
+    
+    @synchronized
     def close(self):
         """데이터베이스 연결 종료"""
         if self.conn:
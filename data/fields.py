@@ -0,0 +1,43 @@
+"""모델 필드 변환 도우미 (타입 변환, 수집 시각)"""
+
+import time
+
+_cached_second = None
+_cached_text = ""
+
+
+def now_str():
+    """현재 시각 문자열 ("%Y-%m-%d %H:%M:%S")
+
+    같은 초 안에서는 이전에 만든 문자열을 재사용해 객체를 대량 생성할 때 strftime 호출을 줄인다.
+    """
+    global _cached_second, _cached_text
+    second = int(time.time())
+    if second != _cached_second:
+        _cached_text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        _cached_second = second
+    return _cached_text
+
+
+def to_float(value, default=0.0):
+    """숫자/문자열(쉼표, 통화 기호 포함)을 float로 변환 (실패 시 default)"""
+    if value is None or value == "":
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").strip().lstrip("$"))
+    except ValueError:
+        return default
+
+
+def to_int(value, default=0):
+    """숫자/문자열(쉼표 포함)을 int로 변환 (실패 시 default)"""
+    if value is None or value == "":
+        return default
+    if isinstance(value, int):
+        return value
+    try:
+        return int(float(str(value).replace(",", "").strip()))
+    except ValueError:
+        return default
@@ -0,0 +1,69 @@
+import json
+from datetime import datetime
+
+class CrawlJob:
+    # 작업 상태
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, kind="", target=""):
+        self.job_id = None
+        self.kind = kind  # store, product, reviews
+        self.target = target  # 스토어 URL, 상품 URL 또는 ASIN
+        self.max_products = None
+        self.max_reviews = None
+        self.crawl_reviews = False
+        self.reviews_only = False  # 리뷰만 수집 (상품 페이지 생략)
+        self.expand_variations = False  # 변형(옵션) 하위 ASIN도 수집
+        self.refresh = False  # 최근 수집한 ASIN도 다시 수집
+        self.parent_id = None
+        self.status = self.PENDING
+        self.attempts = 0
+        self.challenge_requeues = 0  # 캡차/로그인으로 인한 재시도 횟수 (CHALLENGE["max_requeues"]와 비교)
+        self.not_before = 0.0  # 재시도 대기 (이 시각 이전에는 실행하지 않음)
+        self.last_error = ""
+        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def to_dict(self):
+        """객체를 딕셔너리로 변환"""
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "target": self.target,
+            "max_products": self.max_products,
+            "max_reviews": self.max_reviews,
+            "crawl_reviews": self.crawl_reviews,
+            "reviews_only": self.reviews_only,
+            "expand_variations": self.expand_variations,
+            "refresh": self.refresh,
+            "parent_id": self.parent_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "challenge_requeues": self.challenge_requeues,
+            "not_before": self.not_before,
+            "last_error": self.last_error,
+            "created_at": self.created_at
+        }
+
+    def to_json(self):
+        """객체를 JSON 문자열로 변환"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_dict(cls, data):
+        """딕셔너리에서 객체 생성"""
+        job = cls()
+        for key, value in data.items():
+            if hasattr(job, key):
+                setattr(job, key, value)
+        job.crawl_reviews = bool(job.crawl_reviews)
+        job.reviews_only = bool(job.reviews_only)
+        job.expand_variations = bool(job.expand_variations)
+        job.refresh = bool(job.refresh)
+        job.challenge_requeues = job.challenge_requeues or 0
+        return job
+
+    def __repr__(self):
+        return f"CrawlJob({self.job_id}, {self.kind}, {self.target})"
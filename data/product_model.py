@@ -1,7 +1,45 @@
 import json
-from datetime import datetime
+
+from data.fields import now_str, to_float, to_int
+from data.blob_codec import decode_images, decode_json
+
+def _json_field(name, convert=None):
+    """DB에서 읽은 JSON 값(텍스트 또는 압축 블롭)을 처음 접근할 때 디코딩하는 속성"""
+    slot = "_" + name
+    
+    def getter(self):
+        value = getattr(self, slot)
+        if value.__class__ in (str, bytes):
+            value = decode_json(value)
+            if convert is not None:
+                value = convert(value)
+            setattr(self, slot, value)
+        return value
+    
+    def setter(self, value):
+        setattr(self, slot, value)
+    
+    return property(getter, setter, doc=f"{name} (지연 JSON 디코딩)")
 
 class Product:
+    # 속성 딕셔너리 없이 고정 슬롯만 사용 (대량 로드 시 메모리 절약)
+    __slots__ = (
+        "asin", "url", "title", "price", "rating", "review_count", "description",
+        "_features", "_details", "_variations", "_images", "brand", "crawl_date"
+    )
+    
+    # products 테이블 열 순서 (from_row와 같은 순서로 조회해야 함)
+    COLUMNS = (
+        "asin", "url", "title", "price", "rating", "review_count", "description",
+        "features", "details", "variations", "images", "brand", "crawl_date"
+    )
+    JSON_FIELDS = ("features", "details", "variations", "images")
+    
+    features = _json_field("features")
+    details = _json_field("details")
+    variations = _json_field("variations")
+    images = _json_field("images", decode_images)
+    
     def __init__(self):
         self.asin = ""
         self.url = ""
@@ -15,7 +53,7 @@ class Product:
         self.variations = []
         self.images = []
         self.brand = ""
-        self.crawl_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.crawl_date = now_str()
     
     def to_dict(self):
         """객체를 딕셔너리로 변환"""
@@ -43,7 +81,22 @@ class Product:
     def from_dict(cls, data):
         """딕셔너리에서 객체 생성"""
         product = cls()
-        for key, value in data.items():
-            if hasattr(product, key):
-                setattr(product, key, value)
-        return product
\ No newline at end of file
+        for key in cls.COLUMNS:
+            if key in data:
+                setattr(product, key, data[key])
+        product.price = to_float(product.price)
+        product.rating = to_float(product.rating)
+        product.review_count = to_int(product.review_count)
+        return product
+    
+    @classmethod
+    def from_row(cls, row):
+        """COLUMNS 순서의 DB 행(튜플)에서 객체 생성 (JSON 열은 처음 접근할 때 디코딩)"""
+        product = cls.__new__(cls)
+        (product.asin, product.url, product.title, price, rating, review_count,
+         product.description, product._features, product._details, product._variations,
+         product._images, product.brand, product.crawl_date) = row
+        product.price = to_float(price)
+        product.rating = to_float(rating)
+        product.review_count = to_int(review_count)
+        return product
@@ -1,7 +1,17 @@
 import json
-from datetime import datetime
+
+from data.fields import now_str, to_float, to_int
 
 class Review:
+    # 속성 딕셔너리 없이 고정 슬롯만 사용 (대량 로드 시 메모리 절약)
+    __slots__ = (
+        "review_id", "asin", "title", "rating", "date", "reviewer_name",
+        "verified_purchase", "body", "helpful_count", "crawl_date"
+    )
+    
+    # reviews 테이블 열 순서 (from_row와 같은 순서로 조회해야 함)
+    COLUMNS = __slots__
+    
     def __init__(self):
         self.review_id = ""
         self.asin = ""
@@ -12,7 +22,7 @@ class Review:
         self.verified_purchase = False
         self.body = ""
         self.helpful_count = 0
-        self.crawl_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.crawl_date = now_str()
     
     def to_dict(self):
         """객체를 딕셔너리로 변환"""
@@ -37,7 +47,22 @@ class Review:
     def from_dict(cls, data):
         """딕셔너리에서 객체 생성"""
         review = cls()
-        for key, value in data.items():
-            if hasattr(review, key):
-                setattr(review, key, value)
-        return review
\ No newline at end of file
+        for key in cls.__slots__:
+            if key in data:
+                setattr(review, key, data[key])
+        review.rating = to_float(review.rating)
+        review.verified_purchase = bool(review.verified_purchase)
+        review.helpful_count = to_int(review.helpful_count)
+        return review
+    
+    @classmethod
+    def from_row(cls, row):
+        """COLUMNS 순서의 DB 행(튜플)에서 객체 생성"""
+        review = cls.__new__(cls)
+        (review.review_id, review.asin, review.title, rating, review.date,
+         review.reviewer_name, verified_purchase, review.body, helpful_count,
+         review.crawl_date) = row
+        review.rating = float(rating or 0.0)
+        review.verified_purchase = bool(verified_purchase)
+        review.helpful_count = helpful_count or 0
+        return review
@@ -1,14 +1,22 @@
-import time
+import argparse
+import glob
+import json
+import sys
 import os
 
-from utils.browser_manager import BrowserManager
+from utils.session_pool import SessionPool
+from utils.run_report import run_report
 from utils.logger import setup_logger
-from utils.proxy_rotator import ProxyRotator
-from crawlers.store_crawler import StoreCrawler
-from crawlers.product_crawler import ProductCrawler
-from crawlers.review_crawler import ReviewCrawler
+from utils.asin_set import OrderedAsinSet, family_id_for, product_url as product_url_for
+from utils.resource_policy import page_type_for_url
+from utils.single_flight import fetch_flights, normalize_url
+from crawlers.fetch_planner import extract_asin, plan_fetches
+from crawlers.scheduler import CrawlScheduler, load_jobs_file, make_job, target_to_url
 from data.db_manager import DBManager
-from config import CRAWLING, DATA_DIR
+from data.job_model import CrawlJob
+from config import CRAWLING, DATA_DIR, SCHEDULER, ensure_dir
+
+# Selenium을 사용하는 크롤러 모듈은 크롤링 작업을 실행할 때만 가져온다 (export/query/report 등은 빠르게 시작)
 
 logger = setup_logger(__name__)
 
@@ -85,119 +93,439 @@ def get_user_input():
         print("잘못된 선택입니다. 다시 시도해주세요.")
         return get_user_input()
 
-def crawl_store_by_url(store_url, args, browser_manager, db_manager):
-    """URL로 스토어 크롤링 실행"""
-    store_crawler = StoreCrawler(browser_manager)
-    product_urls = store_crawler.crawl_store_by_url(store_url, args.get("max_products", CRAWLING["max_products"]))
-    
-    if not product_urls:
-        logger.warning("상품 URL을 찾을 수 없습니다.")
-        return False
-    
-    # 결과 저장
+def save_product_urls(store_url, product_urls):
+    """수집한 상품 URL을 스토어별 텍스트 파일로 저장"""
     # 스토어 URL에서 도메인과 경로를 추출하여 파일명 생성
     import re
     store_name = re.sub(r'[^\w]', '_', store_url.split('/')[-1])
     if not store_name:
         store_name = "amazon_store"
     
-    output_file = os.path.join(DATA_DIR, f"{store_name}_products.txt")
+    output_file = os.path.join(ensure_dir(DATA_DIR), f"{store_name}_products.txt")
     with open(output_file, "w") as f:
         for url in product_urls:
             f.write(f"{url}\n")
     
-    logger.info(f"{len(product_urls)}개의 상품 URL을 {output_file}에 저장했습니다.")
-    print(f"{len(product_urls)}개의 상품 URL을 {output_file}에 저장했습니다.")
+    return output_file
+
+# crawl_single_product 함수 수정 (개별 CSV 생성 부분 제거)
+def crawl_single_product(product_url, args, browser_manager, db_manager, session_pool=None):
+    """단일 상품 크롤링 (필요한 최소 페이지만 로드, session_pool이 있으면 리뷰 페이지 병렬 수집)"""
+    want_reviews = args.get("mode") == "review" or args.get("crawl_reviews", False)
+    want_product = not (want_reviews and args.get("reviews_only", False))
+    
+    # 최근에 수집한 ASIN은 레지스트리를 확인해 다시 수집하지 않음
+    asin = extract_asin(product_url)
+    if asin and not args.get("refresh", False):
+        if want_product and db_manager.get_fresh_asins([asin], "product"):
+            want_product = False
+        if want_reviews and db_manager.get_fresh_asins([asin], "reviews"):
+            want_reviews = False
+        if not (want_product or want_reviews):
+            logger.info(f"최근에 수집한 상품이므로 건너뜁니다: {asin}")
+            return True
     
-    # 스토어 모드에서 상품 정보까지 크롤링할 경우
-    if args.get("crawl_reviews", False):
-        print(f"각 상품 및 리뷰 크롤링을 시작합니다... (상품당 최대 {args.get('max_reviews', CRAWLING['max_reviews'])}개 리뷰)")
-        crawl_products_from_list(product_urls, args, browser_manager, db_manager)
+    plan = plan_fetches(product_url, want_product, want_reviews)
     
+    # 상품 정보 크롤링 (리뷰만 필요하고 ASIN을 알면 생략)
+    # 다른 작업자가 같은 상품을 수집 중이면 기다렸다가 그 결과를 공유
+    product = None
+    use_cache = not args.get("refresh", False)
+    if plan.needs_product_page:
+        product, shared = fetch_flights.do(
+            ("product", normalize_url(product_url)),
+            lambda: fetch_product(product_url, plan, browser_manager, db_manager),
+            use_cache=use_cache,
+        )
+        
+        if not product:
+            logger.error(f"상품 크롤링 실패: {product_url}", extra={"asin": asin, "url": product_url, "stage": "product"})
+            if want_product or not plan.reviews_url:
+                return False
+        elif shared:
+            # 상품 페이지를 로드하지 않았으므로 리뷰 링크는 ASIN으로 구성
+            plan.learn(asin=product.asin)
+            logger.info(f"다른 작업의 상품 수집 결과 사용: {product.asin}", extra={"asin": product.asin, "stage": "product"})
+    
+    # 리뷰 크롤링 - 모드가 리뷰이거나 crawl_reviews 옵션이 활성화된 경우
+    if want_reviews:
+        # 같은 변형 그룹의 하위 상품은 리뷰를 공유하므로 그룹당 한 번만 수집하고 나머지는 연결만 함
+        family_id, members = db_manager.get_variation_family(plan.asin) if plan.asin else (None, [])
+        if family_id and use_cache and db_manager.get_fresh_asins(members, "reviews"):
+            linked = db_manager.link_family_reviews(family_id)
+            run_report.add_sample("variation_family.reviews_shared", 1)
+            logger.info(f"같은 변형 그룹 리뷰 이미 수집, 연결만 합니다: {plan.asin} (그룹 {family_id}, {linked}개 연결)",
+                        extra={"asin": plan.asin, "stage": "reviews"})
+            plan.finish()
+            return True
+        
+        max_reviews = args.get("max_reviews", CRAWLING["max_reviews"])
+        key = ("reviews", family_id or plan.asin or normalize_url(product_url))
+        result, shared = fetch_flights.do(
+            key,
+            lambda: fetch_reviews(product_url, plan, product, max_reviews, browser_manager, db_manager, session_pool),
+            use_cache=use_cache,
+        )
+        if not result:
+            plan.finish()
+            return False
+        if shared:
+            if family_id:
+                db_manager.link_family_reviews(family_id)
+                run_report.add_sample("variation_family.reviews_shared", 1)
+            logger.info(f"다른 작업이 이미 리뷰를 수집했습니다: {plan.asin}", extra={"asin": plan.asin, "stage": "reviews"})
+    
+    plan.finish()
     return True
 
-# crawl_single_product 함수 수정 (개별 CSV 생성 부분 제거)
-def crawl_single_product(product_url, args, browser_manager, db_manager):
-    """단일 상품 크롤링"""
-    # 상품 정보 크롤링
-    product_crawler = ProductCrawler(browser_manager)
-    product = product_crawler.crawl_product(product_url)
-    
+def fetch_product(product_url, plan, browser_manager, db_manager):
+    """상품 페이지 수집 및 저장 (실패하면 None)"""
+    from crawlers.product_crawler import ProductCrawler
+    crawler = ProductCrawler(browser_manager)
+    product = crawler.crawl_product(product_url, plan=plan)
     if not product:
-        logger.error(f"상품 크롤링 실패: {product_url}")
-        print(f"상품 크롤링 실패: {product_url}")
-        return False
+        return None
     
     # 데이터베이스에 저장
     db_manager.save_product(product)
-    print(f"상품 정보 저장 완료: {product.title}")
+    logger.info(f"상품 정보 저장 완료: {product.title}", extra={"asin": product.asin, "stage": "save"})
     
-    # 리뷰 크롤링 - 모드가 리뷰이거나 crawl_reviews 옵션이 활성화된 경우
-    if args.get("mode") == "review" or args.get("crawl_reviews", False):
-        review_crawler = ReviewCrawler(browser_manager)
-        max_reviews = args.get("max_reviews", CRAWLING["max_reviews"])
-        print(f"상품 '{product.title}' 리뷰 크롤링 시작 (최대 {max_reviews}개)...")
-        reviews = review_crawler.crawl_reviews(product_url, max_reviews)
+    parent_asin = product.asin or plan.asin
+    if parent_asin:
+        db_manager.mark_asin_fetched(parent_asin, "product")
+        # 변형(옵션) 하위 ASIN을 부모 ASIN 경로로 등록
+        child_asins = [v["asin"] for v in product.variations
+                       if v.get("asin") and v["asin"] != parent_asin]
+        db_manager.register_asins(child_asins, "variation", parent_asin)
         
-        if reviews:
-            # 각 리뷰에 상품 ASIN 설정
-            for review in reviews:
-                review.asin = product.asin
-            
-            # 데이터베이스에 저장
-            db_manager.save_reviews(reviews)
-            print(f"{len(reviews)}개의 리뷰 저장 완료")
-            
-            # 개별 리뷰 내보내기 코드 제거
-        else:
-            print("이 상품에 대한 리뷰를 찾을 수 없거나 수집할 수 없습니다.")
-    
-    return True
+        # 변형 그룹 기록 (부모 ASIN 기준, 리뷰를 그룹 단위로 수집/연결하는 데 사용)
+        family_id = family_id_for(parent_asin, crawler.parent_asin, child_asins)
+        if family_id:
+            db_manager.save_variation_family(family_id, [parent_asin] + child_asins)
+    return product
 
-# crawl_products_from_list 함수 수정 (마지막에 통합 리뷰 CSV 내보내기 추가)
-def crawl_products_from_list(product_urls, args, browser_manager, db_manager):
-    """여러 상품 크롤링"""
-    total_products = len(product_urls)
-    success_count = 0
+def fetch_reviews(product_url, plan, product, max_reviews, browser_manager, db_manager, session_pool=None):
+    """리뷰 수집 (페이지마다 DB에 저장). 수집 결과 요약 반환"""
+    from crawlers.review_crawler import ReviewCrawler
+    review_crawler = ReviewCrawler(browser_manager)
+    label = product.title if product else plan.asin
+    logger.info(f"상품 '{label}' 리뷰 크롤링 시작 (최대 {max_reviews}개)...", extra={"asin": plan.asin, "stage": "reviews"})
+    # 페이지마다 ASIN을 붙인 리뷰를 바로 저장 (중간에 실패해도 저장한 페이지는 유지)
+    review_crawler.crawl_reviews(
+        product_url,
+        max_reviews,
+        plan=plan,
+        review_count=product.review_count if product else None,
+        session_pool=session_pool,
+        on_page=db_manager.save_reviews,
+    )
     
-    # 진행 상황 표시 기능 추가
-    from tqdm import tqdm
+    if not review_crawler.page_loaded:
+        # 수집 완료로 기록하지 않고 None 반환 (single-flight가 결과를 캐시/공유하지 않음)
+        logger.error(f"리뷰 페이지에 접근하지 못했습니다: {product_url}", extra={"asin": plan.asin, "stage": "reviews"})
+        return None
     
-    logger.info(f"{total_products}개의 상품 크롤링을 시작합니다")
-    print(f"{total_products}개의 상품 크롤링을 시작합니다")
+    if review_crawler.collected:
+        logger.info(f"{review_crawler.collected}개의 리뷰 저장 완료", extra={"asin": plan.asin, "stage": "save"})
+    else:
+        logger.info("이 상품에 대한 리뷰를 찾을 수 없거나 수집할 수 없습니다.", extra={"asin": plan.asin, "stage": "reviews"})
     
-    # tqdm으로 진행 상황 표시
-    for i, url in enumerate(tqdm(product_urls, desc="상품 크롤링"), 1):
-        logger.info(f"상품 크롤링 중 {i}/{total_products}: {url}")
-        print(f"\n상품 크롤링 중 {i}/{total_products}: {url}")
+    if plan.asin:
+        db_manager.mark_asin_fetched(plan.asin, "reviews")
+        # 변형 그룹이 있으면 수집한 리뷰를 그룹의 모든 하위 상품에 연결 (구성원 전체를 수집 완료로 기록)
+        family_id, _ = db_manager.get_variation_family(plan.asin)
+        if family_id:
+            linked = db_manager.link_family_reviews(family_id)
+            logger.info(f"변형 그룹 {family_id}의 하위 상품에 리뷰 {linked}건 연결", extra={"asin": plan.asin, "stage": "save"})
+    return {"asin": plan.asin, "collected": review_crawler.collected}
+
+def run_job(job, browser_manager, db_manager, scheduler, asin_index=None):
+    """스케줄러 작업 하나 실행 (asin_index: 배치 내 스토어들이 공유하는 ASIN 집합)"""
+    if job.kind == "store":
+        from crawlers.store_crawler import StoreCrawler
+        args = {
+            "max_products": job.max_products or CRAWLING["max_products"],
+            "crawl_reviews": job.crawl_reviews,
+            "max_reviews": job.max_reviews or CRAWLING["max_reviews"],
+        }
+        store_crawler = StoreCrawler(browser_manager, asin_index)
+        product_urls = store_crawler.crawl_store_by_url(job.target, args["max_products"])
+        if not product_urls:
+            logger.warning(f"상품 URL을 찾을 수 없습니다: {job.target}")
+            return False
+        
+        output_file = save_product_urls(job.target, product_urls)
+        logger.info(f"{len(product_urls)}개의 상품 URL을 {output_file}에 저장했습니다.", extra={"url": job.target, "stage": "store"})
         
-        if crawl_single_product(url, args, browser_manager, db_manager):
-            success_count += 1
+        # 발견 경로와 함께 레지스트리에 등록 (스토어/검색 결과)
+        source_type = "search" if page_type_for_url(job.target) == "search" else "store"
+        db_manager.register_asins(list(store_crawler.asins), source_type, job.target)
+        # 작업이 성공한 뒤에 배치 공유 집합에 반영 (실패 후 재시도하면 같은 ASIN을 다시 새 상품으로 봄)
+        new_asins = store_crawler.merge_new_asins()
         
-        # 상품 크롤링 간 지연 시간 추가 (단축된 지연 시간 사용)
-        if i < total_products:
-            delay = browser_manager.random_delay(min_delay=0.5, max_delay=1.0)
+        # 상품/리뷰 크롤링은 하위 작업으로 등록해 같은 세션 집합에서 이어서 실행
+        if job.crawl_reviews:
+            logger.info(f"각 상품 및 리뷰 크롤링을 시작합니다... (상품당 최대 {args['max_reviews']}개 리뷰)")
+            # 배치 내 다른 스토어에서 이미 등록한 상품과 최근에 수집한 상품은 제외
+            fresh = set() if job.refresh else db_manager.get_fresh_asins(new_asins, "reviews")
+            if fresh:
+                logger.info(f"최근에 수집한 상품 {len(fresh)}개를 제외합니다")
+            children = []
+            for asin in new_asins:
+                if asin in fresh:
+                    continue
+                child = CrawlJob("reviews", product_url_for(asin))
+                child.max_reviews = args["max_reviews"]
+                child.expand_variations = job.expand_variations
+                child.refresh = job.refresh
+                child.parent_id = job.job_id
+                children.append(child)
+            scheduler.submit_many(children)
+        return True
+    
+    product_url = target_to_url(job.target)
+    if job.kind == "reviews":
+        args = {
+            "mode": "review",
+            "max_reviews": job.max_reviews or CRAWLING["max_reviews"],
+            "reviews_only": job.reviews_only,
+        }
+    else:
+        args = {"mode": "product"}
+    args["refresh"] = job.refresh
+    ok = crawl_single_product(product_url, args, browser_manager, db_manager, scheduler.pool)
+    
+    # 변형 확장: 부모 상품에서 발견한 하위 ASIN 중 아직 수집하지 않은 것만 하위 작업으로 등록
+    # (하위 작업은 다시 확장하지 않으므로 이미 아는 부모를 다시 가져오지 않음)
+    parent_asin = extract_asin(product_url)
+    if ok and job.expand_variations and parent_asin:
+        what = "reviews" if job.kind == "reviews" else "product"
+        max_age = 0 if job.refresh else None
+        children = []
+        for asin in db_manager.get_unfetched_asins("variation", parent_asin, what, max_age):
+            if asin_index is not None and not asin_index.add(asin):
+                continue
+            child = CrawlJob(job.kind, asin)
+            child.max_reviews = job.max_reviews
+            child.reviews_only = job.reviews_only
+            child.refresh = job.refresh
+            child.parent_id = job.job_id
+            children.append(child)
+        if children:
+            logger.info(f"{parent_asin}의 변형 상품 {len(children)}개를 작업으로 등록합니다")
+            scheduler.submit_many(children)
+    return ok
+
+def run_jobs(jobs, db_manager, session_pool, workers=1, resume=False):
+    """작업 목록을 주어진 DB 연결과 브라우저 세션 집합으로 실행"""
+    asin_index = OrderedAsinSet()
+    scheduler = CrawlScheduler(
+        db_manager,
+        session_pool,
+        lambda job, browser_manager, sched: run_job(job, browser_manager, db_manager, sched, asin_index),
+        workers=workers,
+    )
+    if resume:
+        scheduler.resume()
+    scheduler.submit_many(jobs)
+    return scheduler.run()
+
+def args_to_job(args):
+    """대화형 입력을 작업으로 변환"""
+    kind = {"store": "store", "product": "product", "review": "reviews"}[args["mode"]]
+    job = CrawlJob(kind, args.get("store_url") or args.get("product_url"))
+    job.max_products = args.get("max_products")
+    job.max_reviews = args.get("max_reviews")
+    job.crawl_reviews = args.get("crawl_reviews", False)
+    job.refresh = True  # 대화형 실행은 사용자가 직접 요청한 대상이므로 항상 수집
+    return job
+
+def run_batch(jobs, options, resume=False):
+    """작업 목록을 하나의 DB 연결과 브라우저 세션 집합으로 일괄 실행"""
+    # 작업자 세션 + 리뷰 페이지 병렬 수집용 보조 세션
+    pool_size = options.workers + CRAWLING["review_parallel_sessions"] - 1
+    session_pool = SessionPool(size=pool_size, prewarm=options.workers).start()
+    db_manager = DBManager()
+    
+    try:
+        stats = run_jobs(jobs, db_manager, session_pool, options.workers, resume)
+        
+        if not options.no_export:
+            db_manager.export_products_to_csv()
+            db_manager.export_reviews_to_csv()
+        return stats["failed"] == 0 and not stats["layout_changed"] and not stats["session_failures"]
+    except KeyboardInterrupt:
+        logger.info("사용자에 의해 크롤링이 중단되었습니다 (resume으로 재개 가능)")
+        return False
+    finally:
+        db_manager.close()
+        session_pool.close()
+        run_report.save()
+        logger.info("크롤링 프로세스 종료")
+
+def build_parser():
+    """명령행 인자 파서 구성"""
+    parser = argparse.ArgumentParser(description="아마존 크롤러 (인자 없이 실행하면 대화형 모드)")
+    
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("targets", nargs="*", help="URL 또는 ASIN ('-'이면 표준 입력에서 한 줄씩 읽음)")
+    common.add_argument("--jobs", help="작업 파일 (CSV/JSONL/URL 목록, '-'이면 표준 입력)")
+    common.add_argument("--max-products", type=int, default=None, help="스토어당 최대 상품 수")
+    common.add_argument("--max-reviews", type=int, default=None, help="상품당 최대 리뷰 수")
+    common.add_argument("--expand-variations", action="store_true", help="상품의 변형(옵션) 하위 ASIN도 수집")
+    common.add_argument("--refresh", action="store_true", help="최근에 수집한 ASIN도 다시 수집")
+    
+    run_options = argparse.ArgumentParser(add_help=False)
+    run_options.add_argument("--workers", type=int, default=SCHEDULER["workers"], help="동시 작업 수 (작업자당 브라우저 1개)")
+    run_options.add_argument("--no-export", action="store_true", help="실행 후 CSV 내보내기 생략")
+    
+    subparsers = parser.add_subparsers(dest="command")
+    
+    store_parser = subparsers.add_parser("store", parents=[common, run_options], help="스토어 상품 URL 수집")
+    store_parser.add_argument("--reviews", action="store_true", help="수집한 각 상품의 상품 정보와 리뷰도 크롤링")
+    
+    subparsers.add_parser("product", parents=[common, run_options], help="상품 정보 크롤링")
+    reviews_parser = subparsers.add_parser("reviews", parents=[common, run_options], help="상품 정보 및 리뷰 크롤링")
+    reviews_parser.add_argument("--reviews-only", action="store_true", help="상품 페이지를 건너뛰고 리뷰만 수집")
+    subparsers.add_parser("resume", parents=[run_options], help="중단된 작업 재개")
     
-    logger.info(f"{total_products}개 중 {success_count}개 상품을 성공적으로 크롤링했습니다")
-    print(f"{total_products}개 중 {success_count}개 상품을 성공적으로 크롤링했습니다")
+    export_parser = subparsers.add_parser("export", help="DB의 상품/리뷰를 CSV로 내보내기 (브라우저 없음)")
+    export_parser.add_argument("--what", choices=["all", "products", "reviews"], default="all", help="내보낼 데이터")
+    export_parser.add_argument("--asin", help="이 ASIN의 리뷰만 내보내기")
+    
+    query_parser = subparsers.add_parser("query", help="상품 정보와 변경 이력 조회 (JSON 출력)")
+    query_parser.add_argument("asin", help="조회할 ASIN")
+    query_parser.add_argument("--field", help="이 필드의 시계열만 출력 (예: price)")
+    query_parser.add_argument("--start", help="이력 시작 시각 (YYYY-MM-DD[ HH:MM:SS])")
+    query_parser.add_argument("--end", help="이력 종료 시각 (YYYY-MM-DD[ HH:MM:SS])")
+    
+    search_parser = subparsers.add_parser("search", help="리뷰 제목/본문 전문 검색 (JSON 출력)")
+    search_parser.add_argument("query", help="검색어 (FTS5 검색식: \"구문\", OR, NOT, 접두어*)")
+    search_parser.add_argument("--asin", help="이 ASIN의 리뷰만 검색")
+    search_parser.add_argument("--min-rating", type=float, default=None, help="최소 별점")
+    search_parser.add_argument("--max-rating", type=float, default=None, help="최대 별점")
+    search_parser.add_argument("--limit", type=int, default=20, help="최대 결과 수")
+    search_parser.add_argument("--offset", type=int, default=0, help="건너뛸 결과 수 (페이지 이동)")
+    
+    report_parser = subparsers.add_parser("report", help="실행 보고서 출력 (기본: 가장 최근 보고서)")
+    report_parser.add_argument("file", nargs="?", help="보고서 파일 경로")
+    
+    return parser
+
+def collect_jobs(options):
+    """명령행 대상과 작업 파일에서 작업 목록 구성"""
+    defaults = {
+        "max_products": options.max_products,
+        "max_reviews": options.max_reviews,
+        "crawl_reviews": getattr(options, "reviews", False),
+        "reviews_only": getattr(options, "reviews_only", False),
+        "expand_variations": options.expand_variations,
+        "refresh": options.refresh,
+    }
+    
+    jobs = []
+    targets = list(options.targets)
+    if "-" in targets:
+        targets.remove("-")
+        jobs.extend(load_jobs_file("-", options.command, defaults))
+    for target in targets:
+        jobs.append(make_job({"target": target}, options.command, defaults))
+    if options.jobs:
+        jobs.extend(load_jobs_file(options.jobs, options.command, defaults))
+    return jobs
+
+def export_command(options):
+    """DB 내용을 CSV로 내보내기"""
+    db_manager = DBManager()
+    try:
+        ok = True
+        if options.what in ("all", "products") and not options.asin:
+            ok = db_manager.export_products_to_csv() and ok
+        if options.what in ("all", "reviews"):
+            ok = db_manager.export_reviews_to_csv(options.asin) and ok
+        return ok
+    finally:
+        db_manager.close()
+
+def query_command(options):
+    """상품 정보와 변경 이력을 JSON으로 출력"""
+    db_manager = DBManager()
+    try:
+        if options.field:
+            series = db_manager.get_field_series(options.asin, options.field, options.start, options.end)
+            print(json.dumps(series, ensure_ascii=False, indent=2))
+            return bool(series)
+        
+        product = db_manager.get_product(options.asin)
+        result = {
+            "product": product.to_dict() if product else None,
+            "history": db_manager.get_product_history(options.asin, options.start, options.end),
+            "sources": db_manager.get_asin_sources(options.asin),
+        }
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return product is not None
+    finally:
+        db_manager.close()
+
+def search_command(options):
+    """리뷰 전문 검색 결과를 점수 순 JSON으로 출력"""
+    db_manager = DBManager()
+    try:
+        results = db_manager.search_reviews(
+            options.query,
+            asin=options.asin,
+            min_rating=options.min_rating,
+            max_rating=options.max_rating,
+            limit=options.limit,
+            offset=options.offset,
+        )
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return bool(results)
+    finally:
+        db_manager.close()
+
+def report_command(options):
+    """실행 보고서 출력"""
+    file_path = options.file
+    if not file_path:
+        reports = sorted(glob.glob(os.path.join(DATA_DIR, "run_report_*.json")))
+        if not reports:
+            logger.error("실행 보고서가 없습니다.")
+            return False
+        file_path = reports[-1]
     
-    # 성공적으로 크롤링한 상품 CSV 내보내기
-    db_manager.export_products_to_csv()
-    print("모든 상품 데이터 CSV 내보내기 완료")
+    with open(file_path, "r", encoding="utf-8") as f:
+        print(json.dumps(json.load(f), ensure_ascii=False, indent=2))
+    return True
+
+def cli(argv):
+    """비대화형 명령행 실행"""
+    options = build_parser().parse_args(argv)
     
-    # 모든 리뷰를 하나의 CSV 파일로 내보내기 추가
-    db_manager.export_reviews_to_csv()
-    print("모든 리뷰 데이터를 통합 CSV 파일로 내보내기 완료")
+    if options.command == "export":
+        return export_command(options)
+    if options.command == "query":
+        return query_command(options)
+    if options.command == "search":
+        return search_command(options)
+    if options.command == "report":
+        return report_command(options)
+    if options.command == "resume":
+        return run_batch([], options, resume=True)
     
-    return success_count > 0
+    jobs = collect_jobs(options)
+    if not jobs:
+        logger.error("실행할 작업이 없습니다. URL/ASIN 또는 --jobs 파일을 지정하세요.")
+        return False
+    return run_batch(jobs, options)
 
 def main():
     """메인 실행 함수"""
     # 출력 디렉토리 확인
-    os.makedirs(DATA_DIR, exist_ok=True)
+    ensure_dir(DATA_DIR)
     
-    # 브라우저 관리자 초기화
-    browser_manager = BrowserManager()
+    # 브라우저 세션 풀 초기화 (사용자 입력을 받는 동안 백그라운드에서 브라우저 실행)
+    session_pool = SessionPool().start()
     
     # 데이터베이스 관리자 초기화
     db_manager = DBManager()
@@ -210,18 +538,14 @@ def main():
                 print("프로그램을 종료합니다.")
                 break
             
-            # 모드에 따른 크롤링 실행
-            if args["mode"] == "store":
-                # 스토어 크롤링
-                crawl_store_by_url(args["store_url"], args, browser_manager, db_manager)
-                
-            elif args["mode"] == "product":
-                # 단일 상품 크롤링
-                crawl_single_product(args["product_url"], args, browser_manager, db_manager)
-                
-            elif args["mode"] == "review":
-                # 단일 상품 및 리뷰 크롤링
-                crawl_single_product(args["product_url"], args, browser_manager, db_manager)
+            # 모드에 따른 크롤링 실행 (캡차/로그인 발생 시 해당 작업만 지연 후 새 세션으로 재시도)
+            stats = run_jobs([args_to_job(args)], db_manager, session_pool)
+            logger.info(f"작업 완료: 성공 {stats['done']}, 실패 {stats['failed']}")
+            
+            # 스토어의 상품 및 리뷰까지 크롤링한 경우 통합 CSV 내보내기
+            if args["mode"] == "store" and args.get("crawl_reviews", False):
+                db_manager.export_products_to_csv()
+                db_manager.export_reviews_to_csv()
             
             # 작업 완료 후 계속할지 확인
             continue_choice = input("\n다른 작업을 진행하시겠습니까? (y/n): ").lower().strip()
@@ -231,15 +555,16 @@ def main():
     
     except KeyboardInterrupt:
         logger.info("사용자에 의해 크롤링이 중단되었습니다")
-        print("\n사용자에 의해 크롤링이 중단되었습니다")
     except Exception as e:
         logger.error(f"크롤링 중 오류 발생: {str(e)}", exc_info=True)
-        print(f"크롤링 중 오류 발생: {str(e)}")
     finally:
         # 리소스 정리
         db_manager.close()
-        browser_manager.close()
+        session_pool.close()
+        run_report.save()
         logger.info("크롤링 프로세스 종료")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(0 if cli(sys.argv[1:]) else 1)
     main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+
+import main
+from crawlers.fetch_planner import plan_fetches
+from utils.single_flight import ResultCache, SingleFlight
+
+PRODUCT_URL = "https://www.amazon.com/dp/B000000001"
+
+
+def stub_crawler(page_loaded, collected=0):
+    """crawl_reviews 결과만 흉내 내는 ReviewCrawler 대체"""
+    crawler = mock.Mock()
+    crawler.page_loaded = page_loaded
+    crawler.collected = collected
+    return mock.Mock(return_value=crawler)
+
+
+def stub_db(family=(None, [])):
+    db_manager = mock.Mock()
+    db_manager.get_fresh_asins.return_value = set()
+    db_manager.get_variation_family.return_value = family
+    db_manager.link_family_reviews.return_value = 0
+    return db_manager
+
+
+class FetchReviewsTest(unittest.TestCase):
+    def fetch(self, crawler_class, db_manager):
+        plan = plan_fetches(PRODUCT_URL, want_product=False, want_reviews=True)
+        with mock.patch("crawlers.review_crawler.ReviewCrawler", crawler_class):
+            return main.fetch_reviews(PRODUCT_URL, plan, None, 10, mock.Mock(), db_manager)
+
+    def test_unreached_reviews_page_is_not_marked_fetched(self):
+        db_manager = stub_db(family=("B000000000", ["B000000000", "B000000001"]))
+        result = self.fetch(stub_crawler(page_loaded=False), db_manager)
+        self.assertIsNone(result)
+        db_manager.mark_asin_fetched.assert_not_called()
+        db_manager.link_family_reviews.assert_not_called()
+
+    def test_product_without_reviews_is_marked_fetched(self):
+        db_manager = stub_db()
+        result = self.fetch(stub_crawler(page_loaded=True), db_manager)
+        self.assertEqual(result, {"asin": "B000000001", "collected": 0})
+        db_manager.mark_asin_fetched.assert_called_once_with("B000000001", "reviews")
+
+    def test_success_links_variation_family(self):
+        db_manager = stub_db(family=("B000000000", ["B000000000", "B000000001"]))
+        self.fetch(stub_crawler(page_loaded=True, collected=5), db_manager)
+        db_manager.link_family_reviews.assert_called_once_with("B000000000")
+
+
+class CrawlSingleProductReviewsTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(main, "fetch_flights", SingleFlight(ResultCache()))
+        self.flights = patch.start()
+        self.addCleanup(patch.stop)
+
+    def crawl(self, crawler_class, db_manager):
+        args = {"mode": "review", "reviews_only": True, "max_reviews": 10}
+        with mock.patch("crawlers.review_crawler.ReviewCrawler", crawler_class):
+            return main.crawl_single_product(PRODUCT_URL, args, mock.Mock(), db_manager)
+
+    def test_failed_review_crawl_fails_job_and_is_not_cached(self):
+        crawler_class = stub_crawler(page_loaded=False)
+        db_manager = stub_db()
+        self.assertFalse(self.crawl(crawler_class, db_manager))
+        self.assertFalse(self.crawl(crawler_class, db_manager))
+        # 실패 결과가 캐시되지 않아 두 번째 작업도 다시 수집을 시도함
+        self.assertEqual(crawler_class.call_count, 2)
+        db_manager.mark_asin_fetched.assert_not_called()
+
+    def test_successful_review_crawl_is_cached(self):
+        crawler_class = stub_crawler(page_loaded=True, collected=3)
+        db_manager = stub_db()
+        self.assertTrue(self.crawl(crawler_class, db_manager))
+        self.assertTrue(self.crawl(crawler_class, db_manager))
+        self.assertEqual(crawler_class.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+from crawlers import product_crawler
+from crawlers.product_crawler import ProductCrawler
+from utils.field_health import FieldHealth
+from utils.retry_policy import RetryPolicy
+
+
+class StubBrowser:
+    """상품 제목이 끝내 나타나지 않는 페이지를 흉내 내는 브라우저 (wait_for_element는 시간 초과 시 None)"""
+
+    def __init__(self):
+        self.driver = None
+        self.loads = 0
+
+    def get_page(self, url, page_type=None):
+        self.loads += 1
+        return True
+
+    def wait_for_element(self, by, value, condition=None, timeout=None):
+        return None
+
+
+class EmptyProductPageTest(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy({
+            "jitter": 0,
+            "transient": {"max_attempts": 2, "base_delay": 1.0, "backoff_factor": 2, "max_delay": 30},
+        })
+        self.health = FieldHealth()
+        patches = [
+            mock.patch.object(product_crawler, "retry_policy", self.policy),
+            mock.patch.object(product_crawler, "field_health", self.health),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_reloads_with_backoff_then_records_missing_title(self):
+        browser = StubBrowser()
+        with mock.patch.object(product_crawler.time, "sleep") as sleep:
+            product = ProductCrawler(browser).crawl_product("https://www.amazon.com/dp/B000000001")
+
+        self.assertIsNone(product)
+        self.assertEqual(browser.loads, 3)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1.0, 2.0])
+        self.assertEqual(self.health.hit_rate("product", "title"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
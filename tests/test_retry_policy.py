@@ -0,0 +1,209 @@
+import unittest
+from unittest import mock
+
+from selenium.common.exceptions import (
+    InvalidArgumentException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from utils import browser_manager as browser_module
+from utils.browser_manager import BrowserManager
+from utils.page_events import CaptchaDetected
+from utils.retry_policy import (
+    BLOCK,
+    PERMANENT,
+    TRANSIENT,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpen,
+    RetryPolicy,
+    classify_error,
+    classify_page_type,
+)
+
+BREAKER_SETTINGS = {
+    "enabled": True,
+    "window": 4,
+    "min_calls": 2,
+    "failure_rate": 0.5,
+    "cooldown": 10,
+    "max_cooldown": 40,
+}
+
+
+class ClassifyErrorTest(unittest.TestCase):
+    def test_transient_errors(self):
+        for error in (TimeoutException(), StaleElementReferenceException(), WebDriverException(),
+                      ConnectionError(), TimeoutError()):
+            self.assertEqual(classify_error(error), TRANSIENT, type(error).__name__)
+
+    def test_challenge_is_block(self):
+        self.assertEqual(classify_error(CaptchaDetected("https://www.amazon.com/dp/B000000001")), BLOCK)
+
+    def test_invalid_argument_is_permanent_despite_webdriver_base(self):
+        self.assertEqual(classify_error(InvalidArgumentException()), PERMANENT)
+
+    def test_unknown_error_uses_default(self):
+        self.assertEqual(classify_error(ValueError()), PERMANENT)
+        self.assertEqual(classify_error(ValueError(), default=TRANSIENT), TRANSIENT)
+
+    def test_page_types(self):
+        self.assertEqual(classify_page_type("captcha"), BLOCK)
+        self.assertEqual(classify_page_type("unavailable"), BLOCK)
+        self.assertEqual(classify_page_type("error"), PERMANENT)
+        self.assertEqual(classify_page_type(None), TRANSIENT)
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy({
+            "jitter": 0,
+            "transient": {"max_attempts": 2, "base_delay": 1.0, "backoff_factor": 2, "max_delay": 3},
+            "permanent": {"max_attempts": 0},
+        })
+
+    def test_delay_backs_off_up_to_max(self):
+        self.assertEqual([self.policy.delay(TRANSIENT, attempt) for attempt in range(3)], [1.0, 2.0, 3])
+
+    def test_call_retries_only_matching_class(self):
+        fn = mock.Mock(side_effect=[TimeoutException(), TimeoutException(), "ok"])
+        with mock.patch("utils.retry_policy.time.sleep") as sleep:
+            self.assertEqual(self.policy.call(fn), "ok")
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+        fn = mock.Mock(side_effect=ValueError())
+        with mock.patch("utils.retry_policy.time.sleep"):
+            with self.assertRaises(ValueError):
+                self.policy.call(fn)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_call_gives_up_after_max_attempts(self):
+        fn = mock.Mock(side_effect=TimeoutException())
+        with mock.patch("utils.retry_policy.time.sleep"):
+            with self.assertRaises(TimeoutException):
+                self.policy.call(fn)
+        self.assertEqual(fn.call_count, 3)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def open_breaker(self, now=100.0):
+        breaker = CircuitBreaker("www.amazon.com/product", BREAKER_SETTINGS)
+        breaker.record(False, now=now)
+        breaker.record(False, now=now)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        return breaker
+
+    def test_stays_closed_below_min_calls_and_failure_rate(self):
+        breaker = CircuitBreaker("key", BREAKER_SETTINGS)
+        breaker.record(False, now=100.0)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)  # min_calls 미만
+
+        breaker = CircuitBreaker("key", BREAKER_SETTINGS)
+        breaker.record(True, now=100.0)
+        breaker.record(True, now=100.0)
+        breaker.record(False, now=100.0)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)  # 실패 비율 1/3 < 0.5
+        self.assertTrue(breaker.allow(now=100.0))
+
+    def test_open_rejects_until_cooldown(self):
+        breaker = self.open_breaker()
+        with self.assertRaises(CircuitOpen) as raised:
+            breaker.allow(now=104.0)
+        self.assertAlmostEqual(raised.exception.retry_after, 6.0)
+
+    def test_half_open_allows_single_probe(self):
+        breaker = self.open_breaker()
+        self.assertTrue(breaker.allow(now=111.0))
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpen) as raised:
+            breaker.allow(now=112.0)
+        # 시험 요청 중에는 1초가 아니라 남은 cooldown 동안 기다리게 함
+        self.assertAlmostEqual(raised.exception.retry_after, 9.0)
+
+    def test_probe_success_closes(self):
+        breaker = self.open_breaker()
+        breaker.allow(now=111.0)
+        breaker.record(True, now=112.0)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(len(breaker.outcomes), 0)
+        self.assertTrue(breaker.allow(now=113.0))
+
+    def test_probe_failure_reopens_with_doubled_cooldown(self):
+        breaker = self.open_breaker()
+        breaker.allow(now=111.0)
+        breaker.record(False, now=112.0)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.cooldown, 20)
+        self.assertEqual(breaker.open_until, 132.0)
+
+        breaker.allow(now=133.0)
+        breaker.record(False, now=133.0)
+        breaker.allow(now=174.0)
+        breaker.record(False, now=174.0)
+        self.assertEqual(breaker.cooldown, 40)  # max_cooldown
+
+    def test_unrecorded_probe_is_replaced_after_cooldown(self):
+        breaker = self.open_breaker()
+        breaker.allow(now=111.0)
+        with self.assertRaises(CircuitOpen):
+            breaker.allow(now=115.0)
+        self.assertTrue(breaker.allow(now=121.0))
+
+    def test_breakers_keyed_by_host_and_page_type(self):
+        breakers = CircuitBreakers(BREAKER_SETTINGS)
+        first = breakers.get("https://www.amazon.com/dp/B000000001", "product")
+        self.assertIs(first, breakers.get("https://WWW.amazon.com/dp/B000000002", "product"))
+        self.assertIsNot(first, breakers.get("https://www.amazon.com/product-reviews/B000000001", "review"))
+        self.assertEqual(first.key, "www.amazon.com/product")
+
+
+class GetPageBreakerTest(unittest.TestCase):
+    """get_page가 시험 요청 결과를 모든 경로에서 기록하는지 (기록하지 않으면 차단기가 풀리지 않음)"""
+
+    URL = "https://www.amazon.com/dp/B000000001"
+
+    def setUp(self):
+        with mock.patch.object(BrowserManager, "setup_browser"):
+            self.browser = BrowserManager()
+        self.breakers = CircuitBreakers(BREAKER_SETTINGS)
+        self.breaker = self.breakers.get(self.URL, "product")
+        self.breaker.record(False)
+        self.breaker.record(False)
+        self.breaker.open_until = 0  # 바로 시험 요청 가능
+        patches = [
+            mock.patch.object(browser_module, "circuit_breakers", self.breakers),
+            mock.patch.object(browser_module.time, "sleep"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_error_page_probe_closes_breaker(self):
+        def load_error_page(url, page_type):
+            self.browser.last_page_type = "error"
+            return False
+
+        with mock.patch.object(self.browser, "_load_page", side_effect=load_error_page):
+            self.assertFalse(self.browser.get_page(self.URL, page_type="product"))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertFalse(self.breaker.probing)
+
+    def test_permanent_exception_probe_closes_breaker(self):
+        with mock.patch.object(self.browser, "_load_page", side_effect=InvalidArgumentException()):
+            with self.assertRaises(InvalidArgumentException):
+                self.browser.get_page(self.URL, page_type="product")
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_transient_probe_failure_reopens(self):
+        with mock.patch.object(self.browser, "_load_page", side_effect=TimeoutException()):
+            with self.assertRaises(CircuitOpen):
+                self.browser.get_page(self.URL, page_type="product")
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.probing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from unittest import mock
+
+from crawlers import scheduler as scheduler_module
+from crawlers.scheduler import CrawlScheduler
+from data.job_model import CrawlJob
+from utils.page_events import CaptchaDetected
+from utils.retry_policy import CircuitOpen
+
+
+class StubDB:
+    """작업 기록만 흉내 내는 DB (add_jobs/update_job/get_pending_jobs)"""
+
+    def __init__(self):
+        self.jobs = {}
+
+    def add_jobs(self, jobs):
+        for job in jobs:
+            job.job_id = len(self.jobs) + 1
+            self.jobs[job.job_id] = job
+        return True
+
+    def update_job(self, job):
+        return True
+
+    def get_pending_jobs(self):
+        return [job for job in self.jobs.values() if job.status == CrawlJob.PENDING]
+
+
+class StubSession:
+    degraded = False
+    dead = False
+
+    def __init__(self):
+        self.request_origin = None
+        self.first_request_at = None
+
+    def is_alive(self):
+        return True
+
+
+class StubPool:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.released = []
+
+    def acquire(self):
+        if self.fail:
+            raise RuntimeError("chrome failed to start")
+        return StubSession()
+
+    def release(self, session):
+        self.released.append(session)
+
+
+class SchedulerAccountingTest(unittest.TestCase):
+    def make_scheduler(self, handler, pool=None, workers=1):
+        scheduler = CrawlScheduler(StubDB(), pool or StubPool(), handler, workers=workers)
+        # 재시도 대기 없이 바로 다시 실행
+        patch = mock.patch.object(scheduler_module.random, "uniform", return_value=0)
+        patch.start()
+        self.addCleanup(patch.stop)
+        return scheduler
+
+    def submit(self, scheduler, count=1):
+        jobs = [CrawlJob("product", f"B00000000{index}") for index in range(count)]
+        scheduler.submit_many(jobs)
+        return jobs
+
+    def test_success_and_failure_counted_once(self):
+        scheduler = self.make_scheduler(lambda job, session, sched: job.target.endswith("0"))
+        jobs = self.submit(scheduler, 2)
+        stats = scheduler.run()
+        self.assertEqual((stats["done"], stats["failed"], stats["requeued"]), (1, 1, 0))
+        self.assertEqual([job.status for job in jobs], [CrawlJob.DONE, CrawlJob.FAILED])
+        self.assertEqual(scheduler.in_flight, 0)
+
+    def test_transient_error_requeued_until_max_attempts(self):
+        handler = mock.Mock(side_effect=ConnectionError("reset"))
+        scheduler = self.make_scheduler(handler)
+        job = self.submit(scheduler)[0]
+        with mock.patch.dict(scheduler_module.SCHEDULER, {"max_attempts": 3}):
+            stats = scheduler.run()
+        self.assertEqual(handler.call_count, 3)
+        self.assertEqual((stats["requeued"], stats["failed"]), (2, 1))
+        self.assertEqual((job.status, job.attempts), (CrawlJob.FAILED, 3))
+        self.assertEqual(scheduler.in_flight, 0)
+
+    def test_permanent_error_fails_without_requeue(self):
+        handler = mock.Mock(side_effect=ValueError("bad target"))
+        scheduler = self.make_scheduler(handler)
+        self.submit(scheduler)
+        with mock.patch.object(scheduler_module, "classify_error", return_value="permanent"):
+            stats = scheduler.run()
+        self.assertEqual(handler.call_count, 1)
+        self.assertEqual((stats["requeued"], stats["failed"]), (0, 1))
+
+    def test_circuit_open_deferred_without_counting_attempt(self):
+        handler = mock.Mock(side_effect=[CircuitOpen("www.amazon.com/product", 0), True])
+        scheduler = self.make_scheduler(handler)
+        job = self.submit(scheduler)[0]
+        stats = scheduler.run()
+        self.assertEqual((stats["deferred"], stats["done"]), (1, 1))
+        self.assertEqual(job.attempts, 1)
+
+    def test_challenge_requeues_counted_separately_from_attempts(self):
+        errors = [ConnectionError("reset")] * 2 + [CaptchaDetected("https://www.amazon.com/dp/B000000000")] * 4
+        handler = mock.Mock(side_effect=errors)
+        scheduler = self.make_scheduler(handler)
+        job = self.submit(scheduler)[0]
+        with mock.patch.dict(scheduler_module.SCHEDULER, {"max_attempts": 10}), \
+                mock.patch.dict(scheduler_module.CHALLENGE, {"max_requeues": 3}):
+            stats = scheduler.run()
+        # 일반 오류 2회 뒤에도 캡차 재시도 3회를 모두 받고 4번째 캡차에서 실패
+        self.assertEqual(handler.call_count, 6)
+        self.assertEqual((stats["challenges"], stats["requeued"], stats["failed"]), (4, 5, 1))
+        self.assertEqual(job.challenge_requeues, 3)
+
+    def test_session_start_failure_releases_job(self):
+        scheduler = self.make_scheduler(mock.Mock(return_value=True), pool=StubPool(fail=True), workers=2)
+        jobs = self.submit(scheduler, 2)
+        # 작업자는 예외를 다시 발생시키며 종료함. 작업자가 모두 종료되어도 멈추지 않아야 함
+        with mock.patch.object(scheduler_module.threading, "excepthook") as excepthook:
+            stats = scheduler.run()
+        self.assertEqual(excepthook.call_count, 2)
+        self.assertEqual(stats["session_failures"], 2)
+        self.assertEqual(scheduler.in_flight, 0)
+        self.assertEqual([job.status for job in jobs], [CrawlJob.PENDING, CrawlJob.PENDING])
+        self.assertEqual([job.attempts for job in jobs], [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
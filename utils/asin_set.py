@@ -0,0 +1,78 @@
+import re
+
+from config import AMAZON
+
+ASIN_RE = re.compile(r"[A-Z0-9]{10}")
+DP_ASIN_RE = re.compile(r"/(?:dp|gp/product)/([A-Z0-9]{10})")
+PRODUCT_URL_PREFIX = f"{AMAZON['base_url']}/dp/"
+
+
+def asin_from_url(url):
+    """상품 URL에서 ASIN 추출 (없으면 None)
+
+    대부분의 링크는 '/dp/' 바로 뒤에 ASIN이 오므로 문자열 검색으로 먼저 확인하고,
+    그 외의 형식에만 정규식을 사용한다.
+    """
+    if not url:
+        return None
+
+    index = url.find("/dp/")
+    if index >= 0:
+        candidate = url[index + 4:index + 14]
+        if ASIN_RE.fullmatch(candidate):
+            return candidate
+
+    match = DP_ASIN_RE.search(url)
+    return match.group(1) if match else None
+
+
+def family_id_for(asin, parent_asin=None, sibling_asins=()):
+    """변형 그룹 ID (부모 ASIN, 없으면 그룹 구성원 중 가장 작은 ASIN, 변형이 없으면 None)
+
+    부모 ASIN을 찾지 못해도 어느 하위 상품에서 계산하든 같은 ID가 나오도록 구성원 최솟값을 쓴다.
+    """
+    if parent_asin:
+        return parent_asin
+    members = {a for a in sibling_asins if a}
+    if asin:
+        members.add(asin)
+    return min(members) if len(members) > 1 else None
+
+
+def product_url(asin):
+    """ASIN의 표준 상품 URL"""
+    return PRODUCT_URL_PREFIX + asin
+
+
+class OrderedAsinSet:
+    """발견 순서를 유지하는 ASIN 집합 (dict 기반, 포함 여부 확인 O(1))"""
+
+    def __init__(self, asins=None):
+        self._asins = dict.fromkeys(asins or ())
+
+    def add(self, asin):
+        """새 ASIN이면 추가하고 True 반환"""
+        if asin in self._asins:
+            return False
+        self._asins[asin] = None
+        return True
+
+    def add_url(self, url):
+        """URL에서 ASIN을 추출해 추가 (새 ASIN이면 반환, 아니면 None)"""
+        asin = asin_from_url(url)
+        if asin and self.add(asin):
+            return asin
+        return None
+
+    def __contains__(self, asin):
+        return asin in self._asins
+
+    def __len__(self):
+        return len(self._asins)
+
+    def __iter__(self):
+        return iter(self._asins)
+
+    def urls(self):
+        """발견 순서대로 표준 상품 URL 목록"""
+        return [PRODUCT_URL_PREFIX + asin for asin in self._asins]
@@ -1,4 +1,7 @@
+import itertools
+import os
 import random
+import signal
 import time
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -6,51 +9,117 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
-from config import BROWSER, CRAWLING
+from config import AMAZON, BROWSER, BROWSER_PROFILES, CRAWLING, CHALLENGE, DATA_DIR, ensure_dir
 from utils.logger import setup_logger
+from utils.driver_cache import get_driver_path, invalidate as invalidate_driver_cache
+from utils.run_report import run_report
+from utils.process_stats import process_tree_pids, process_tree_rss
+from utils.resource_policy import ResourcePolicy, PAGE_METRICS_SCRIPT, page_type_for_url
+from utils.page_events import CaptchaDetected, LoginRequired, PageChallenge
+from utils.page_classifier import classify_page
+from utils.memory_monitor import memory_monitor
+from utils.retry_policy import PERMANENT, circuit_breakers, classify_error, classify_page_type, retry_policy
 
 logger = setup_logger(__name__)
 
+_session_ids = itertools.count(1)
+
 class BrowserManager:
-    def __init__(self):
+    def __init__(self, profile=None, proxy=None):
+        self.session_id = next(_session_ids)
+        self.profile_name = profile or BROWSER["profile"]
+        self.profile = BROWSER_PROFILES[self.profile_name]
+        self.proxy = proxy
+        self.degraded = False  # 캡차/로그인 요구를 받은 세션 (풀에서 교체 대상)
+        self.challenge_count = 0
+        self.last_challenge = None
+        self.dead = False  # 워치독이 강제 종료했거나 드라이버가 죽은 세션 (풀에서 폐기)
+        self.last_page_type = None  # 마지막으로 판정한 페이지 유형 (product, review, login, captcha 등)
+        self.pages_loaded = 0  # 현재 브라우저 프로세스가 연 페이지 수 (재시작 시 초기화)
+        self.last_rss_mb = None  # 마지막으로 측정한 세션 RSS(MB)
+        self.recycle_count = 0
         self.driver = None
         self.options = None
         self.wait = None
+        self.created_at = time.time()
+        self.request_origin = self.created_at  # 첫 요청까지의 시간 측정 기준 시점
+        self.startup_timings = {}
+        self.first_request_at = None
+        self.resource_policy = ResourcePolicy()
         self.setup_browser()
     
     def setup_browser(self):
         """셀레늄 웹드라이버 초기화"""
+        setup_start = time.time()
         self.options = Options()
         
-        if BROWSER["headless"]:
-            self.options.add_argument("--headless")
+        if self.profile["headless"]:
+            self.options.add_argument("--headless=new")
         
-        self.options.add_argument(f"--window-size={BROWSER['window_size'][0]},{BROWSER['window_size'][1]}")
+        width, height = self.profile["window_size"]
+        self.options.add_argument(f"--window-size={width},{height}")
         self.options.add_argument(f"user-agent={BROWSER['user_agent']}")
         self.options.add_argument("--disable-notifications")
         self.options.add_argument("--disable-popup-blocking")
         self.options.add_argument("--no-sandbox")
         self.options.add_argument("--disable-dev-shm-usage")
         
+        if self.proxy:
+            self.options.add_argument(f"--proxy-server={self.proxy}")
+        
+        # 프로필별 추가 옵션 (서버 프로필: GPU/확장/백그라운드 네트워킹 비활성화 등)
+        for argument in self.profile["extra_args"]:
+            self.options.add_argument(argument)
+        
         # 브라우저 탐지 우회
         self.options.add_experimental_option("excludeSwitches", ["enable-automation"])
         self.options.add_experimental_option("useAutomationExtension", False)
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=self.options)
+        # 리소스 차단 정책 (페이지 로드 전략, 이미지 차단 등)
+        self.resource_policy.reset()
+        self.resource_policy.apply_to_options(self.options)
+        
+        resolve_start = time.time()
+        service = Service(get_driver_path())
+        launch_start = time.time()
+        try:
+            self.driver = webdriver.Chrome(service=service, options=self.options)
+        except (WebDriverException, OSError) as e:
+            # 크롬 업데이트 후 캐시된 크롬드라이버가 맞지 않을 수 있으므로 캐시를 지우고 한 번만 다시 시도
+            logger.warning(f"브라우저 실행 실패, 크롬드라이버 캐시를 무효화하고 다시 시도합니다: {str(e)}")
+            invalidate_driver_cache()
+            service = Service(get_driver_path(force_refresh=True))
+            launch_start = time.time()
+            self.driver = webdriver.Chrome(service=service, options=self.options)
         self.driver.implicitly_wait(BROWSER["implicitly_wait"])
         self.driver.set_page_load_timeout(BROWSER["page_load_timeout"])
         
         self.wait = WebDriverWait(self.driver, BROWSER["implicitly_wait"])
         
-        logger.info("Browser initialized successfully")
+        ready = time.time()
+        self.startup_timings = {
+            "driver_resolve": round(launch_start - resolve_start, 3),
+            "browser_launch": round(ready - launch_start, 3),
+            "setup_total": round(ready - setup_start, 3),
+        }
+        run_report.add_sample("browser_launch", ready - launch_start)
+        run_report.record("browser", "profile", self.profile_name)
+        logger.info(f"Browser initialized successfully ({self.profile_name}, {self.startup_timings['setup_total']:.2f}s)")
+    
+    def mark_first_request(self):
+        """첫 요청 시점 기록 (세션 생성 또는 풀에서 할당된 시점 기준)"""
+        if self.first_request_at is not None:
+            return
+        
+        self.first_request_at = time.time()
+        elapsed = self.first_request_at - self.request_origin
+        self.startup_timings["time_to_first_request"] = round(elapsed, 3)
+        run_report.add_sample("time_to_first_request", elapsed)
+        logger.info(f"Time to first request: {elapsed:.2f}s "
+                    f"(driver resolve {self.startup_timings.get('driver_resolve', 0):.2f}s, "
+                    f"launch {self.startup_timings.get('browser_launch', 0):.2f}s)")
     
     def is_login_page(self):
         """로그인 페이지인지 확인"""
@@ -121,64 +190,183 @@ class BrowserManager:
         print("\n로그인 제한 시간이 초과되었습니다. 크롤링이 취소될 수 있습니다.\n")
         return False
     
-    def get_page(self, url, retry=0):
-        """페이지 접근 및 재시도 로직"""
-        try:
-            logger.info(f"Navigating to: {url}")
-            self.driver.get(url)
-            self.random_delay(min_delay=1.0, max_delay=2.0)  # 더 짧은 지연 시간
+    def get_page(self, url, page_type=None):
+        """페이지 접근 (실패를 분류해 일시적 오류만 지터 백오프로 재시도, 호스트/페이지 유형별 차단기 적용)
+        
+        차단기가 열려 있으면 요청하지 않고 CircuitOpen을 발생시킨다.
+        """
+        self.mark_first_request()
+        page_type = page_type or page_type_for_url(url)
+        breaker = circuit_breakers.get(url, page_type) if CRAWLING["circuit_breaker"]["enabled"] else None
+        
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.allow()
             
-            # 최초 페이지 로드 대기
-            self.wait_for_page_load(timeout=5)
+            # 메모리/페이지 수 기준을 넘은 세션은 다음 페이지를 열기 전에 재시작 (쿠키 유지)
+            reason = memory_monitor.recycle_reason(self)
+            if reason and not self.dead:
+                self.recycle(reason)
             
-            # 로그인 페이지 확인
-            if self.is_login_page():
-                logger.info("로그인 페이지 감지됨")
-                if not self.wait_for_login():
-                    return False
-                
-                # 로그인 후 리디렉션 대기
-                self.wait_for_page_load(timeout=5)
-                
-                # 리디렉션 후 원래 URL로 다시 접근 (로그인 후 홈으로 가는 경우 대비)
-                if "amazon.com" in self.driver.current_url and not url in self.driver.current_url:
-                    logger.info("로그인 후 원래 URL로 다시 접근합니다.")
-                    self.driver.get(url)
-                    self.random_delay(min_delay=1.0, max_delay=2.0)
+            error = None
+            try:
+                ok = self._load_page(url, page_type)
+            except PageChallenge:
+                if breaker is not None:
+                    breaker.record(False)
+                raise
+            except Exception as e:
+                failure_class = classify_error(e)
+                if failure_class == PERMANENT:
+                    # 호스트는 응답했으므로 차단기에는 실패가 아님 (시험 요청이면 결과를 기록해야 차단기가 풀림)
+                    if breaker is not None:
+                        breaker.record(True)
+                    raise
+                ok, error = False, e
             
-            # 캡차 페이지 확인 및 처리 - 더 정확한 감지 조건 사용
-            page_source = self.driver.page_source.lower()
+            if ok:
+                if breaker is not None:
+                    breaker.record(True)
+                return True
             
-            # 캡차 페이지일 때만 실행 (텍스트와 이미지 둘 다 확인)
-            if ("captcha" in page_source and "enter the characters" in page_source) or \
-               ("robot" in page_source and "not a robot" in page_source) or \
-               ("automated access" in page_source and "verify" in page_source):
-                
-                # 실제 캡차 이미지 요소 확인
-                captcha_elements = self.driver.find_elements(By.CSS_SELECTOR, 
-                    "img[src*='captcha'], img[alt*='captcha'], img[src*='Captcha'], form[action*='captcha']")
-                
-                if captcha_elements:
-                    print("\n====== 보안 확인(캡차) 감지 ======")
-                    print("아마존 보안 확인이 필요합니다. 브라우저 창에서 보안 확인을 완료해주세요.")
-                    print("완료 후 Enter 키를 누르면 크롤링이 계속됩니다.")
-                    input("Enter 키를 눌러 계속...")
-                    print("크롤링을 계속합니다.\n")
-                    
-                    # 캡차 완료 후 페이지 새로고침
-                    self.driver.refresh()
-                    self.random_delay(min_delay=1.0, max_delay=2.0)
+            if error is None:
+                failure_class = classify_page_type(self.last_page_type)
+            if breaker is not None:
+                # 오류 페이지(없는 상품 등)는 차단이 아니므로 성공으로 기록
+                breaker.record(failure_class == PERMANENT)
             
-            return True
-        except TimeoutException as e:
-            if retry < CRAWLING["retry"]["max_attempts"]:
-                wait_time = CRAWLING["retry"]["backoff_factor"] ** retry
-                logger.warning(f"Timeout accessing {url}. Retrying in {wait_time}s... (Attempt {retry+1}/{CRAWLING['retry']['max_attempts']})")
-                time.sleep(wait_time)
-                return self.get_page(url, retry + 1)
-            else:
-                logger.error(f"Failed to access {url} after {CRAWLING['retry']['max_attempts']} attempts: {str(e)}")
+            if self.dead or not retry_policy.should_retry(failure_class, attempt):
+                if failure_class != PERMANENT:
+                    logger.error(f"Failed to access {url} ({failure_class}, {attempt + 1} attempts): "
+                                 f"{str(error) if error else self.last_page_type}",
+                                 extra={"url": url, "stage": page_type, "session_id": self.session_id})
                 return False
+            
+            wait_time = retry_policy.delay(failure_class, attempt)
+            logger.warning(f"{type(error).__name__ if error else self.last_page_type} accessing {url}. "
+                           f"Retrying in {wait_time:.1f}s... (Attempt {attempt + 1}/{retry_policy.max_attempts(failure_class)})")
+            run_report.add_sample(f"retry.{failure_class}", 1)
+            time.sleep(wait_time)
+            attempt += 1
+    
+    def _load_page(self, url, page_type):
+        """페이지 한 번 로드 및 유형 판정 (로그인/캡차는 기존 흐름으로 처리)"""
+        self.last_page_type = None
+        logger.info(f"Navigating to: {url}", extra={"url": url, "stage": page_type, "session_id": self.session_id})
+        self.resource_policy.apply_to_driver(self.driver, page_type)
+        load_start = time.time()
+        self.driver.get(url)
+        self.pages_loaded += 1
+        if memory_monitor.due(self.pages_loaded):
+            self.last_rss_mb = memory_monitor.sample(self)
+        logger.debug(f"Page loaded: {url}", extra={
+            "url": url, "stage": page_type, "session_id": self.session_id,
+            "duration": round(time.time() - load_start, 3),
+        })
+        self.record_page_metrics(page_type)
+        self.random_delay(min_delay=1.0, max_delay=2.0)  # 더 짧은 지연 시간
+        
+        # 최초 페이지 로드 대기
+        self.wait_for_page_load(timeout=5)
+        
+        # 페이지 유형 판정 (작은 탐색 스크립트 한 번, 애매할 때만 전체 소스 확인)
+        self.last_page_type = classify_page(self.driver, expected=page_type)
+        
+        # 로그인 페이지 확인
+        if self.last_page_type == "login":
+            logger.info("로그인 페이지 감지됨")
+            self._reload_with_challenge_policy()
+            if not CHALLENGE["block_for_operator"]:
+                self.raise_challenge(LoginRequired, url)
+            
+            if not self.wait_for_login():
+                return False
+            
+            # 로그인 후 리디렉션 대기
+            self.wait_for_page_load(timeout=5)
+            
+            # 리디렉션 후 원래 URL로 다시 접근 (로그인 후 홈으로 가는 경우 대비)
+            if "amazon.com" in self.driver.current_url and not url in self.driver.current_url:
+                logger.info("로그인 후 원래 URL로 다시 접근합니다.")
+                self.driver.get(url)
+                self.random_delay(min_delay=1.0, max_delay=2.0)
+        
+        # 캡차 페이지 확인 및 처리
+        elif self.last_page_type == "captcha":
+            self._reload_with_challenge_policy()
+            if not CHALLENGE["block_for_operator"]:
+                self.raise_challenge(CaptchaDetected, url)
+            
+            print("\n====== 보안 확인(캡차) 감지 ======")
+            print("아마존 보안 확인이 필요합니다. 브라우저 창에서 보안 확인을 완료해주세요.")
+            print("완료 후 Enter 키를 누르면 크롤링이 계속됩니다.")
+            input("Enter 키를 눌러 계속...")
+            print("크롤링을 계속합니다.\n")
+            
+            # 캡차 완료 후 페이지 새로고침
+            self.driver.refresh()
+            self.random_delay(min_delay=1.0, max_delay=2.0)
+        
+        # 오류 페이지 (없는 상품) / 일시적 서버 오류(503, 요청 제한)
+        elif self.last_page_type in ("error", "unavailable"):
+            logger.warning(f"오류 페이지({self.last_page_type}): {url}", extra={"url": url, "stage": page_type})
+            return False
+        
+        return True
+    
+    def _reload_with_challenge_policy(self):
+        """로그인/캡차 페이지용 리소스 정책(캡차 이미지 등 허용)을 적용하고, 차단 목록이 바뀌었으면 다시 로드
+        
+        요청 전에는 URL로만 페이지 유형을 알 수 있어 리디렉션된 챌린지 페이지는 원래 유형의 정책으로 열린다.
+        """
+        before = self.resource_policy.current_patterns
+        self.resource_policy.apply_to_driver(self.driver, self.last_page_type)
+        if self.resource_policy.current_patterns == before:
+            return
+        try:
+            self.driver.refresh()
+            self.wait_for_page_load(timeout=5)
+        except Exception as e:
+            logger.warning(f"챌린지 페이지 다시 로드 실패: {str(e)}")
+    
+    def raise_challenge(self, event_class, url):
+        """세션을 degraded로 표시하고 캡차/로그인 이벤트를 예외로 전달 (입력 대기 없음)"""
+        self.degraded = True
+        self.challenge_count += 1
+        
+        try:
+            current_url = self.driver.current_url
+        except Exception:
+            current_url = url
+        
+        screenshot = None
+        if CHALLENGE["screenshot"]:
+            challenge_dir = ensure_dir(os.path.join(DATA_DIR, "challenges"))
+            screenshot = os.path.join(challenge_dir, f"{event_class.kind}_{int(time.time())}_{self.session_id}.png")
+            try:
+                self.driver.save_screenshot(screenshot)
+            except Exception:
+                screenshot = None
+        
+        event = event_class(url, session_id=self.session_id, current_url=current_url, screenshot=screenshot)
+        self.last_challenge = event
+        run_report.add_sample(f"challenge.{event.kind}", 1)
+        logger.warning(f"{event.kind} 감지 (세션 {self.session_id}): {current_url}")
+        raise event
+    
+    def record_page_metrics(self, page_type):
+        """페이지 로드 시간과 전송량을 실행 보고서에 기록"""
+        try:
+            metrics = self.driver.execute_script(PAGE_METRICS_SCRIPT)
+        except Exception:
+            return None
+        
+        if metrics:
+            if metrics.get("load_time") is not None:
+                run_report.add_sample(f"page_load_time.{page_type}", metrics["load_time"])
+            run_report.add_sample(f"page_bytes.{page_type}", metrics.get("bytes") or 0)
+        return metrics
     
     def find_element(self, by, value, timeout=None):
         """요소 찾기 및 대기"""
@@ -216,10 +404,11 @@ class BrowserManager:
     def wait_for_page_load(self, timeout=None):
         """페이지 로드 완료 대기"""
         timeout = timeout or BROWSER["page_load_timeout"]
+        ready_states = self.resource_policy.ready_states()
         try:
-            # 페이지 로드 완료 기다리기
+            # 페이지 로드 완료 기다리기 (eager 전략에서는 interactive 상태도 완료로 간주)
             WebDriverWait(self.driver, timeout).until(
-                lambda d: d.execute_script('return document.readyState') == 'complete'
+                lambda d: d.execute_script('return document.readyState') in ready_states
             )
             return True
         except TimeoutException as e:
@@ -252,8 +441,119 @@ class BrowserManager:
                 break
             last_height = new_height
     
+    def memory_usage(self):
+        """크롬 세션(chromedriver 및 하위 프로세스 전체)의 RSS(MB)와 프로세스 수"""
+        try:
+            pid = self.driver.service.process.pid
+        except AttributeError:
+            return None
+        
+        rss, process_count = process_tree_rss(pid)
+        return {"rss_mb": round(rss / (1024 * 1024), 1), "processes": process_count}
+    
+    def report_memory(self):
+        """세션 RSS를 로그와 실행 보고서에 기록"""
+        usage = self.memory_usage()
+        if usage:
+            run_report.add_sample("session_rss_mb", usage["rss_mb"])
+            logger.info(f"Browser session RSS: {usage['rss_mb']}MB ({usage['processes']} processes, {self.profile_name})")
+        return usage
+    
+    def export_cookies(self):
+        """현재 브라우저의 쿠키 목록 (Selenium 형식)"""
+        try:
+            return self.driver.get_cookies()
+        except Exception as e:
+            logger.warning(f"쿠키 읽기 실패: {str(e)}")
+            return []
+    
+    def import_cookies(self, cookies):
+        """쿠키 복원. 페이지를 열지 않고 CDP로 설정하며, 실패하면 아마존 홈에서 하나씩 추가"""
+        if not cookies:
+            return 0
+        
+        cdp_cookies = []
+        for cookie in cookies:
+            entry = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly") if key in cookie}
+            if "expiry" in cookie:
+                entry["expires"] = cookie["expiry"]
+            if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+                entry["sameSite"] = cookie["sameSite"]
+            cdp_cookies.append(entry)
+        
+        try:
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": cdp_cookies})
+            return len(cdp_cookies)
+        except Exception as e:
+            logger.debug(f"CDP 쿠키 설정 실패, 페이지에서 추가합니다: {str(e)}")
+        
+        self.driver.get(AMAZON["base_url"])
+        restored = 0
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+                restored += 1
+            except Exception:
+                continue
+        return restored
+    
+    def recycle(self, reason):
+        """브라우저 프로세스를 새로 띄워 메모리 회수 (쿠키와 세션 ID 유지)"""
+        cookies = self.export_cookies()
+        rss_mb = self.last_rss_mb
+        pages = self.pages_loaded
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"재시작 전 브라우저 종료 중 오류: {str(e)}")
+        
+        self.setup_browser()
+        restored = self.import_cookies(cookies)
+        self.pages_loaded = 0
+        self.last_rss_mb = None
+        self.recycle_count += 1
+        memory_monitor.record_recycle(self, reason, rss_mb)
+        logger.info(f"세션 {self.session_id} 브라우저 재시작 ({reason}, {pages}페이지): 쿠키 {restored}/{len(cookies)}개 복원",
+                    extra={"session_id": self.session_id})
+    
+    def is_alive(self):
+        """chromedriver 프로세스가 살아 있는지"""
+        if self.dead or not self.driver:
+            return False
+        try:
+            return self.driver.service.process.poll() is None
+        except AttributeError:
+            return True
+    
+    def kill(self):
+        """멈춘 세션 강제 종료 (chromedriver와 하위 크롬 프로세스 전체에 SIGKILL)
+        
+        다른 스레드에서 호출하며, 이 세션에서 대기 중인 Selenium 호출은 연결 오류로 끝난다.
+        """
+        self.dead = True
+        try:
+            pid = self.driver.service.process.pid
+        except AttributeError:
+            return 0
+        
+        killed = 0
+        for child_pid in reversed(process_tree_pids(pid)):
+            try:
+                os.kill(child_pid, signal.SIGKILL)
+                killed += 1
+            except OSError:
+                continue
+        logger.warning(f"세션 {self.session_id} 강제 종료 ({killed}개 프로세스)")
+        return killed
+    
     def close(self):
         """브라우저 종료"""
         if self.driver:
+            if self.dead:
+                # 이미 강제 종료된 프로세스에 quit 요청을 보내지 않음
+                self.kill()
+                logger.info("Killed browser session discarded")
+                return
+            self.report_memory()
             self.driver.quit()
             logger.info("Browser closed successfully")
\ No newline at end of file
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+
+from config import BROWSER
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 프로세스 내 캐시 (세션 재시작 시 디스크도 다시 읽지 않음)
+_resolved_path = None
+_resolve_lock = threading.Lock()
+
+
+def _detect_browser_version():
+    """설치된 크롬 버전 확인 (확인 불가 시 None)"""
+    try:
+        from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception as e:
+        logger.debug(f"크롬 버전 확인 실패: {str(e)}")
+        return None
+
+
+def _major(version):
+    """버전 문자열의 메이저 번호"""
+    return version.split(".")[0] if version else None
+
+
+def _load_cache(cache_path):
+    """디스크 캐시 읽기"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache(cache_path, data):
+    """디스크 캐시 저장 (임시 파일 후 교체)"""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"드라이버 캐시 저장 실패: {str(e)}")
+
+
+def _is_valid(cache, browser_version):
+    """캐시 유효성 확인 (바이너리 존재 + 크롬 메이저 버전 일치)"""
+    if not cache or not os.path.isfile(cache.get("driver_path", "")):
+        return False
+
+    if browser_version:
+        return _major(cache.get("browser_version")) == _major(browser_version)
+
+    # 크롬 버전을 확인할 수 없으면 캐시 유효 기간으로 판단
+    max_age = BROWSER["driver_cache_max_age"]
+    return time.time() - cache.get("resolved_at", 0) < max_age
+
+
+def get_driver_path(force_refresh=False):
+    """크롬드라이버 경로 반환 (디스크 캐시 사용, 버전 불일치 시에만 재설치)"""
+    global _resolved_path
+
+    with _resolve_lock:
+        if _resolved_path and not force_refresh and os.path.isfile(_resolved_path):
+            return _resolved_path
+
+        cache_path = BROWSER["driver_cache_path"]
+        browser_version = _detect_browser_version()
+        cache = None if force_refresh else _load_cache(cache_path)
+
+        if _is_valid(cache, browser_version):
+            logger.info(f"캐시된 크롬드라이버 사용: {cache['driver_path']}")
+            _resolved_path = cache["driver_path"]
+            return _resolved_path
+
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        start = time.time()
+        driver_path = ChromeDriverManager().install()
+        logger.info(f"크롬드라이버 설치/확인 완료 ({time.time() - start:.2f}s): {driver_path}")
+
+        _save_cache(cache_path, {
+            "driver_path": driver_path,
+            "browser_version": browser_version,
+            "resolved_at": time.time(),
+        })
+        _resolved_path = driver_path
+        return _resolved_path
+
+
+def invalidate():
+    """캐시 무효화 (드라이버 실행 실패 시 호출)"""
+    global _resolved_path
+    with _resolve_lock:
+        _resolved_path = None
+        try:
+            os.remove(BROWSER["driver_cache_path"])
+        except OSError:
+            pass
@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from config import DATA_DIR, EXTRACTION, ensure_dir
+from utils.logger import setup_logger
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+# 진단 스냅샷에 저장할 페이지 소스 최대 길이
+SNAPSHOT_MAX_CHARS = 2 * 1024 * 1024
+
+
+class LayoutChanged(Exception):
+    """필수 필드 추출 성공률이 급락함 (페이지 구조 변경으로 판단, 크롤링 중단)"""
+
+    def __init__(self, kind, field, hit_rate, snapshot=None):
+        super().__init__(f"{kind}.{field} 추출 성공률 {hit_rate:.0%} - 페이지 구조 변경 의심")
+        self.kind = kind
+        self.field = field
+        self.hit_rate = hit_rate
+        self.snapshot = snapshot
+
+
+class FieldHealth:
+    """필드/선택자별 추출 성공률 추적
+
+    - 페이지 종류(product, review)별로 필드 추출 성공 여부를 최근 window개만큼 기록하고, 필수 필드의 성공률이
+      min_hit_rate 아래로 떨어지면 실패 페이지 스냅샷을 남기고 LayoutChanged를 발생시킨다.
+    - 선택자별 적중 수를 기록해 한 번도 맞지 않은 선택자는 건너뛴다 (대기 시간 절약, 가끔 다시 시도).
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or EXTRACTION
+        self.window = self.settings["window"]
+        self.hits = {}  # (종류, 필드) -> 최근 성공 여부
+        self.selector_stats = {}  # (필드 키, 선택자) -> [시도, 적중, 건너뜀]
+        self.failed_pages = {}  # 종류 -> 최근 필수 필드 누락 페이지
+        self.tripped = None
+        self._lock = threading.Lock()
+
+    def live_selectors(self, key, selectors):
+        """시도할 선택자 목록 (죽은 선택자는 probe_every번에 한 번만 포함)"""
+        live = []
+        with self._lock:
+            for selector in selectors:
+                stats = self.selector_stats.setdefault((key, selector), [0, 0, 0])
+                attempts, hits, skipped = stats
+                if hits == 0 and attempts >= self.settings["dead_selector_after"]:
+                    stats[2] += 1
+                    if stats[2] % self.settings["dead_selector_probe_every"]:
+                        if stats[2] == 1:
+                            logger.warning(f"선택자 건너뜀 ({key}): {selector} ({attempts}회 시도, 적중 없음)")
+                        continue
+                live.append(selector)
+        return live
+
+    def selector_result(self, key, selector, hit):
+        """선택자 시도 결과 기록"""
+        with self._lock:
+            stats = self.selector_stats.setdefault((key, selector), [0, 0, 0])
+            stats[0] += 1
+            if hit:
+                stats[1] += 1
+
+    def hit_rate(self, kind, field):
+        values = self.hits.get((kind, field))
+        if not values:
+            return None
+        return sum(values) / len(values)
+
+    def record(self, kind, fields, url=None, driver=None):
+        """페이지 하나의 필드 추출 결과 기록. 필수 필드 성공률이 무너지면 LayoutChanged 발생"""
+        required = self.settings["required"].get(kind, [])
+        with self._lock:
+            if self.tripped is not None:
+                raise self.tripped
+            for field, hit in fields.items():
+                self.hits.setdefault((kind, field), deque(maxlen=self.window)).append(bool(hit))
+            missing = [field for field in required if field in fields and not fields[field]]
+            # 성공률이 떨어지기 시작한 경우에만 실패 페이지 소스를 보관 (정상 실행에서는 비용 없음)
+            capture = driver is not None and any(
+                (self.hit_rate(kind, field) or 0) < self.settings["min_hit_rate"] * 2 for field in missing)
+
+        if capture:
+            self._keep_failed_page(kind, url, missing, driver)
+
+        collapsed = None
+        with self._lock:
+            for field in required:
+                values = self.hits.get((kind, field))
+                if not values or len(values) < self.settings["min_samples"]:
+                    continue
+                rate = sum(values) / len(values)
+                if rate < self.settings["min_hit_rate"]:
+                    collapsed = (field, rate)
+                    break
+            if collapsed is not None and self.tripped is None:
+                self.tripped = LayoutChanged(kind, *collapsed)
+            elif collapsed is not None:
+                raise self.tripped
+
+        if collapsed is not None:
+            self.tripped.snapshot = self.write_snapshot(kind, collapsed[0])
+            logger.error(f"{self.tripped} (최근 {len(self.hits[(kind, collapsed[0])])}개 페이지), "
+                         f"진단 스냅샷: {self.tripped.snapshot}")
+            run_report.record("extraction", "layout_changed", {
+                "kind": kind, "field": collapsed[0], "hit_rate": round(collapsed[1], 3),
+                "snapshot": self.tripped.snapshot,
+            })
+            raise self.tripped
+
+    def _keep_failed_page(self, kind, url, missing, driver):
+        try:
+            source = driver.page_source[:SNAPSHOT_MAX_CHARS]
+        except Exception as e:
+            logger.debug(f"실패 페이지 소스를 읽지 못했습니다: {str(e)}")
+            source = None
+        with self._lock:
+            pages = self.failed_pages.setdefault(kind, deque(maxlen=self.settings["snapshot_pages"]))
+            pages.append({"url": url, "missing": missing, "time": time.time(), "source": source})
+
+    def summary(self):
+        """필드 성공률과 선택자 적중 현황"""
+        with self._lock:
+            return {
+                "hit_rates": {f"{kind}.{field}": round(sum(values) / len(values), 3)
+                              for (kind, field), values in self.hits.items() if values},
+                "selectors": {f"{key} {selector}": {"attempts": stats[0], "hits": stats[1], "skipped": stats[2]}
+                              for (key, selector), stats in self.selector_stats.items()},
+            }
+
+    def write_snapshot(self, kind, field):
+        """진단 스냅샷 저장 (성공률/선택자 현황 + 최근 실패 페이지 소스). 저장한 디렉토리 반환"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        snapshot_dir = ensure_dir(os.path.join(DATA_DIR, "diagnostics", f"layout_{kind}_{field}_{timestamp}"))
+        with self._lock:
+            pages = list(self.failed_pages.get(kind, []))
+
+        summary = self.summary()
+        summary.update({"kind": kind, "field": field, "pages": []})
+        try:
+            for index, page in enumerate(pages, 1):
+                entry = {key: page[key] for key in ("url", "missing")}
+                if page["source"] is not None:
+                    entry["file"] = f"page_{index}.html"
+                    with open(os.path.join(snapshot_dir, entry["file"]), "w", encoding="utf-8") as f:
+                        f.write(page["source"])
+                summary["pages"].append(entry)
+            with open(os.path.join(snapshot_dir, "summary.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.error(f"진단 스냅샷 저장 실패: {str(e)}")
+        return snapshot_dir
+
+
+# 모든 세션이 공유하는 추출 상태 (한 세션에서 구조 변경을 감지하면 전체 중단)
+field_health = FieldHealth()
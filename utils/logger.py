@@ -1,41 +1,124 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from datetime import datetime
 
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import LOG_DIR, LOGGING, ensure_dir
 
-from config import LOG_DIR
+# extra={...}로 전달하면 JSON 로그에 별도 필드로 기록되는 값
+STRUCTURED_FIELDS = ("asin", "url", "stage", "duration", "job_id", "session_id")
 
-def setup_logger(name, log_level=logging.INFO):
-    """로거 설정"""
+_queue_handler = None
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나 (asin, url, stage, duration 등 구조화 필드 포함)"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = record.__dict__.get(field)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _build_handlers():
+    """백그라운드 작성 스레드가 사용할 실제 출력 핸들러 (파일 + 콘솔)"""
+    if LOGGING["format"] == "json":
+        file_formatter = JsonLineFormatter()
+    else:
+        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    console_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    handlers = []
+
+    # 로그 파일 경로 설정 (크기 기준 회전)
+    extension = "jsonl" if LOGGING["format"] == "json" else "log"
+    log_filepath = os.path.join(LOG_DIR, f"{datetime.now().strftime('%Y%m%d')}.{extension}")
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_filepath,
+        maxBytes=LOGGING["max_bytes"],
+        backupCount=LOGGING["backup_count"],
+        encoding='utf-8',
+        delay=True,
+    )
+    file_handler.setFormatter(file_formatter)
+    handlers.append(file_handler)
+
+    if LOGGING["console"]:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(console_formatter)
+        handlers.append(console_handler)
+
+    return handlers
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """첫 로그가 들어올 때 작성 스레드와 로그 파일을 준비하는 QueueHandler
+
+    모듈을 가져오기만 하는 경우(--help 등)에는 스레드도 파일도 만들지 않는다.
+    """
+
+    def enqueue(self, record):
+        if _listener is None:
+            _start_listener(self.queue)
+        super().enqueue(record)
+
+
+def _start_listener(log_queue):
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            ensure_dir(LOG_DIR)
+            _listener = logging.handlers.QueueListener(log_queue, *_build_handlers(), respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+
+def _get_queue_handler():
+    """모든 로거가 공유하는 QueueHandler"""
+    global _queue_handler
+    with _setup_lock:
+        if _queue_handler is None:
+            _queue_handler = _LazyQueueHandler(queue.SimpleQueue())
+    return _queue_handler
+
+
+def shutdown_logging():
+    """대기 중인 로그를 모두 기록하고 작성 스레드 종료"""
+    global _listener
+    with _setup_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def setup_logger(name, log_level=None):
+    """로거 설정 (호출 스레드는 큐에 넣기만 하고 파일/콘솔 출력은 백그라운드 스레드가 처리)"""
     logger = logging.getLogger(name)
-    
+
     # 이미 핸들러가 설정되어 있으면 반환
     if logger.handlers:
         return logger
-    
-    logger.setLevel(log_level)
-    
-    # 로그 파일 경로 설정
-    log_filename = f"{datetime.now().strftime('%Y%m%d')}.log"
-    log_filepath = os.path.join(LOG_DIR, log_filename)
-    
-    # 파일 핸들러 설정
-    file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
-    file_handler.setLevel(log_level)
-    
-    # 콘솔 핸들러 설정
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-    
-    # 포맷 설정
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    # 핸들러 추가
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+
+    logger.setLevel(log_level or getattr(logging, LOGGING["level"]))
+    logger.addHandler(_get_queue_handler())
+    logger.propagate = False
+
+    return logger
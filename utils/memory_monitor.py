@@ -0,0 +1,113 @@
+import threading
+import time
+import tracemalloc
+
+from config import MEMORY
+from utils.logger import setup_logger
+from utils.process_stats import current_rss
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+_MB = 1024 * 1024
+
+
+class MemoryMonitor:
+    """크롬 세션과 파이썬 프로세스의 메모리 추적
+
+    세션마다 sample_every 페이지마다 RSS를 측정해 실행 보고서의 추이(series["memory.rss"])에 남기고,
+    세션이 메모리/페이지 수 기준을 넘으면 재시작 사유를 알려준다. tracemalloc을 켜면 첫 측정 시점 대비
+    할당 증가량 상위 위치를 함께 기록한다.
+    """
+
+    def __init__(self, sample_every=None, max_rss_mb=None, max_pages=None, trace=None):
+        self.sample_every = sample_every or MEMORY["sample_every"]
+        self.max_rss_mb = MEMORY["max_session_rss_mb"] if max_rss_mb is None else max_rss_mb
+        self.max_pages = MEMORY["max_session_pages"] if max_pages is None else max_pages
+        self.trace = MEMORY["tracemalloc"] if trace is None else trace
+        self.stats = {"samples": 0, "recycled": 0, "python_rss_start_mb": None, "python_rss_last_mb": None}
+        self._baseline = None
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def due(self, pages_loaded):
+        """이 페이지 수에서 측정할 차례인지"""
+        return pages_loaded > 0 and pages_loaded % self.sample_every == 0
+
+    def sample(self, session):
+        """세션 RSS와 파이썬 RSS 측정 후 기록. 크롬 세션 RSS(MB) 반환 (측정 불가 시 None)"""
+        usage = session.memory_usage()
+        chrome_mb = usage["rss_mb"] if usage else None
+        python_mb = round(current_rss() / _MB, 1)
+
+        with self._lock:
+            self.stats["samples"] += 1
+            if self.stats["python_rss_start_mb"] is None:
+                self.stats["python_rss_start_mb"] = python_mb
+            self.stats["python_rss_last_mb"] = python_mb
+            stats = dict(self.stats)
+
+        run_report.add_point("memory.rss", {
+            "elapsed": round(time.time() - self._started, 1),
+            "session_id": session.session_id,
+            "pages": session.pages_loaded,
+            "chrome_mb": chrome_mb,
+            "python_mb": python_mb,
+        }, max_points=MEMORY["trend_points"])
+        if chrome_mb is not None:
+            run_report.add_sample("session_rss_mb", chrome_mb)
+        run_report.add_sample("python_rss_mb", python_mb)
+        run_report.record("memory", "stats", stats)
+        logger.debug(f"메모리 측정: 세션 {session.session_id} {chrome_mb}MB ({session.pages_loaded}페이지), "
+                     f"파이썬 {python_mb}MB", extra={"session_id": session.session_id})
+
+        if self.trace:
+            self._record_growth()
+        return chrome_mb
+
+    def recycle_reason(self, session):
+        """세션을 재시작해야 하면 사유 문자열, 아니면 None"""
+        if self.max_pages and session.pages_loaded >= self.max_pages:
+            return f"{session.pages_loaded}페이지 도달"
+        if self.max_rss_mb and session.last_rss_mb and session.last_rss_mb > self.max_rss_mb:
+            return f"RSS {session.last_rss_mb}MB > {self.max_rss_mb}MB"
+        return None
+
+    def record_recycle(self, session, reason, rss_mb):
+        with self._lock:
+            self.stats["recycled"] += 1
+            stats = dict(self.stats)
+        run_report.record("memory", "stats", stats)
+        run_report.add_point("memory.recycles", {
+            "elapsed": round(time.time() - self._started, 1),
+            "session_id": session.session_id,
+            "reason": reason,
+            "chrome_mb": rss_mb,
+        }, max_points=MEMORY["trend_points"])
+
+    def _record_growth(self):
+        """첫 측정 대비 할당 증가량 상위 위치 기록 (tracemalloc)"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            if self._baseline is None:
+                self._baseline = snapshot
+                return
+            growth = snapshot.compare_to(self._baseline, "lineno")[:MEMORY["tracemalloc_top"]]
+
+        top = [{
+            "where": str(stat.traceback[0]),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        } for stat in growth if stat.size_diff > 0]
+        run_report.record("memory", "tracemalloc_growth", top)
+        if top:
+            logger.debug(f"할당 증가 상위: {top[0]['where']} (+{top[0]['size_diff_kb']}KB)")
+
+
+# 모든 세션이 공유하는 메모리 추적
+memory_monitor = MemoryMonitor()
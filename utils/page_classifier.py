@@ -0,0 +1,99 @@
+from selenium.webdriver.common.by import By
+
+from utils.logger import setup_logger
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+PAGE_TYPES = ("product", "review", "store", "search", "login", "captcha", "error", "unavailable", "other")
+
+# 페이지 하나에 한 번 실행하는 작은 탐색 스크립트 (페이지 소스 전체를 가져오지 않고 표시 요소만 확인)
+PROBE_SCRIPT = """
+var q = function (selector) { return document.querySelector(selector) !== null; };
+var body = document.body;
+var fullText = body ? (body.innerText || '') : '';
+var text = fullText.slice(0, 2000).toLowerCase();
+return {
+    url: location.href.toLowerCase(),
+    title: (document.title || '').slice(0, 200).toLowerCase(),
+    text_length: fullText.length,
+    login_form: q("#ap_email, form[name='signIn'], #signIn, .auth-pagelet-container, input[name='email'][type='email']"),
+    captcha_form: q("form[action*='validateCaptcha'], input#captchacharacters, img[src*='captcha'], img[src*='Captcha'], img[alt*='captcha']"),
+    captcha_text: /enter the characters|not a robot|automated access/.test(text),
+    product: q("#productTitle, #dp-container"),
+    review_list: q("#cm_cr-review_list, [data-hook='review']"),
+    store: q("[data-testid='grid-item'], .stores-page, #stores-page"),
+    search: q("[data-component-type='s-search-result']"),
+    error: q("#g img[alt*='Dogs of Amazon'], img[alt*='Sorry! Something went wrong']")
+        || /page not found|sorry! something went wrong/.test(text.slice(0, 400)),
+    unavailable: /503 - service unavailable|service unavailable error|request was throttled/.test(text.slice(0, 400))
+};
+"""
+
+LOGIN_URLS = ("/ap/signin", "/ap/sign-in", "amazonlogin", "/auth/signin")
+LOGIN_TITLES = ("sign in", "amazon sign", "로그인", "amazon 로그인")
+
+
+def classify_probe(probe):
+    """탐색 결과로 페이지 유형 판정. (유형, 확실한지) 반환
+
+    캡차 문구만 있고 캡차 입력 요소가 없는 경우 등은 확실하지 않은 것으로 보고 전체 소스 확인을 요청한다.
+    """
+    if not probe:
+        return "other", False
+
+    if probe.get("captcha_form"):
+        return "captcha", True
+    if probe.get("login_form") or any(marker in probe.get("url", "") for marker in LOGIN_URLS) \
+            or any(marker in probe.get("title", "") for marker in LOGIN_TITLES):
+        return "login", True
+    if probe.get("unavailable"):
+        return "unavailable", True
+    if probe.get("error"):
+        return "error", True
+
+    # 캡차 문구만 있는 경우는 요소가 아직 렌더링되지 않았을 수 있음
+    confident = not probe.get("captcha_text")
+    if probe.get("review_list") or "/product-reviews/" in probe.get("url", ""):
+        return "review", confident
+    if probe.get("product"):
+        return "product", confident
+    if probe.get("store") or "/stores/" in probe.get("url", ""):
+        return "store", confident
+    if probe.get("search"):
+        return "search", confident
+    return "other", confident and probe.get("text_length", 0) > 0
+
+
+def classify_from_source(driver):
+    """전체 페이지 소스로 캡차 여부 확인 (탐색 결과가 애매할 때만 사용)"""
+    page_source = driver.page_source.lower()
+    if ("captcha" in page_source and "enter the characters" in page_source) or \
+       ("robot" in page_source and "not a robot" in page_source) or \
+       ("automated access" in page_source and "verify" in page_source):
+        captcha_elements = driver.find_elements(By.CSS_SELECTOR,
+            "img[src*='captcha'], img[alt*='captcha'], img[src*='Captcha'], form[action*='captcha']")
+        if captcha_elements:
+            return "captcha"
+    return None
+
+
+def classify_page(driver, expected=None):
+    """현재 페이지 유형 판정 (execute_script 한 번, 애매하면 전체 소스 확인)"""
+    try:
+        probe = driver.execute_script(PROBE_SCRIPT)
+    except Exception as e:
+        logger.debug(f"페이지 탐색 스크립트 실패: {str(e)}")
+        probe = None
+
+    page_type, confident = classify_probe(probe)
+    if confident:
+        run_report.add_sample("page_probe.full_source", 0)
+        return page_type
+
+    run_report.add_sample("page_probe.full_source", 1)
+    try:
+        return classify_from_source(driver) or (page_type if probe else expected or "other")
+    except Exception as e:
+        logger.warning(f"페이지 소스 확인 실패: {str(e)}")
+        return page_type
@@ -0,0 +1,43 @@
+import time
+from datetime import datetime
+
+
+class PageChallenge(Exception):
+    """페이지 접근 중 사람의 조치가 필요한 상황 (캡차, 로그인 요구 등)
+
+    크롤링 전체를 멈추지 않도록 대기 대신 예외로 전달하며,
+    스케줄러는 해당 작업만 지연 후 재시도하고 세션은 교체한다.
+    """
+
+    kind = "challenge"
+
+    def __init__(self, url, session_id=None, current_url=None, screenshot=None):
+        super().__init__(f"{self.kind} detected at {current_url or url}")
+        self.url = url
+        self.session_id = session_id
+        self.current_url = current_url or url
+        self.screenshot = screenshot
+        self.detected_at = time.time()
+
+    def to_dict(self):
+        """이벤트를 딕셔너리로 변환"""
+        return {
+            "kind": self.kind,
+            "url": self.url,
+            "current_url": self.current_url,
+            "session_id": self.session_id,
+            "screenshot": self.screenshot,
+            "detected_at": datetime.fromtimestamp(self.detected_at).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+class CaptchaDetected(PageChallenge):
+    """보안 확인(캡차) 페이지 감지"""
+
+    kind = "captcha"
+
+
+class LoginRequired(PageChallenge):
+    """로그인 페이지로 리디렉션됨"""
+
+    kind = "login"
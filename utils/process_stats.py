@@ -0,0 +1,79 @@
+import os
+
+try:
+    import psutil
+except ImportError:  # psutil이 없으면 /proc 파싱으로 대체 (리눅스 전용)
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _proc_children():
+    """/proc에서 부모 PID -> 자식 PID 목록 구성"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+            # comm 필드에 공백/괄호가 있을 수 있으므로 마지막 ')' 이후를 파싱
+            ppid = int(stat[stat.rfind(")") + 2:].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    return children
+
+
+def _proc_rss(pid):
+    """/proc/<pid>/statm에서 RSS(바이트) 읽기"""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_tree_pids(pid):
+    """pid와 모든 하위 프로세스 PID 목록"""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return [pid] + [child.pid for child in root.children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    if not os.path.isdir("/proc"):
+        return [pid]
+
+    children = _proc_children()
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+    return pids
+
+
+def process_tree_rss(pid):
+    """pid와 모든 하위 프로세스의 RSS 합계(바이트)와 프로세스 수"""
+    pids = process_tree_pids(pid)
+    total = 0
+
+    for child_pid in pids:
+        if psutil is not None:
+            try:
+                total += psutil.Process(child_pid).memory_info().rss
+            except psutil.Error:
+                continue
+        else:
+            total += _proc_rss(child_pid)
+
+    return total, len(pids)
+
+
+def current_rss():
+    """현재 파이썬 프로세스의 RSS(바이트)"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return _proc_rss(os.getpid())
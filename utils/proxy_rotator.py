@@ -4,10 +4,6 @@ import json
 import time
 from selenium import webdriver
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from config import PROXIES
 from utils.logger import setup_logger
 
@@ -0,0 +1,109 @@
+from config import RESOURCE_POLICY
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 리소스 종류별 차단 URL 패턴 (CDP Network.setBlockedURLs 와일드카드 형식)
+RESOURCE_PATTERNS = {
+    "images": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.ts", "*.mp3", "*.m4a"],
+}
+
+# 로드 후 페이지 로드 시간과 전송량 측정
+PAGE_METRICS_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+var bytes = nav ? nav.transferSize : 0;
+performance.getEntriesByType('resource').forEach(function (r) { bytes += r.transferSize || 0; });
+return {
+    load_time: nav ? (nav.domContentLoadedEventEnd || nav.responseEnd) / 1000 : null,
+    bytes: bytes
+};
+"""
+
+
+def page_type_for_url(url):
+    """URL로 페이지 유형 추정"""
+    url = (url or "").lower()
+    if "/product-reviews/" in url:
+        return "review"
+    if "/dp/" in url or "/gp/product/" in url:
+        return "product"
+    if "/stores/" in url:
+        return "store"
+    if "/ap/signin" in url or "/ap/sign-in" in url:
+        return "login"
+    if "/s?" in url or "/s/" in url:
+        return "search"
+    return "other"
+
+
+class ResourcePolicy:
+    """페이지 유형별 리소스 차단 정책 (크롬 설정 + CDP 차단 목록)"""
+
+    def __init__(self, policy=None):
+        self.policy = policy or RESOURCE_POLICY
+        self.current_patterns = None
+
+    @property
+    def enabled(self):
+        return self.policy.get("enabled", False)
+
+    def blocked_kinds(self, page_type=None):
+        """페이지 유형에 대해 차단할 리소스 종류"""
+        kinds = [kind for kind in RESOURCE_PATTERNS if self.policy.get(f"block_{kind}", False)]
+        allowed = self.policy.get("allow", {}).get(page_type, [])
+        return [kind for kind in kinds if kind not in allowed]
+
+    def blocked_patterns(self, page_type=None):
+        """페이지 유형에 대한 차단 URL 패턴 목록"""
+        patterns = []
+        for kind in self.blocked_kinds(page_type):
+            patterns.extend(RESOURCE_PATTERNS[kind])
+
+        allowed = self.policy.get("allow", {}).get(page_type, [])
+        if "trackers" not in allowed:
+            patterns.extend(f"*{domain}*" for domain in self.policy.get("blocked_domains", []))
+        return patterns
+
+    def apply_to_options(self, options):
+        """크롬 옵션에 정책 적용 (페이지 로드 전략, 전역 이미지 차단)"""
+        if not self.enabled:
+            return
+
+        options.page_load_strategy = self.policy.get("page_load_strategy", "normal")
+
+        # 어떤 페이지 유형도 이미지를 허용하지 않을 때만 크롬 설정으로 전역 차단
+        images_needed = any("images" in kinds for kinds in self.policy.get("allow", {}).values())
+        if self.policy.get("block_images", False) and not images_needed:
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+            })
+
+    def apply_to_driver(self, driver, page_type=None):
+        """CDP로 페이지 유형에 맞는 차단 목록 적용 (변경된 경우에만)"""
+        if not self.enabled:
+            return
+
+        patterns = self.blocked_patterns(page_type)
+        if patterns == self.current_patterns:
+            return
+
+        try:
+            if self.current_patterns is None:
+                driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            self.current_patterns = patterns
+            logger.debug(f"리소스 차단 목록 적용 ({page_type}): {len(patterns)}개 패턴")
+        except Exception as e:
+            logger.warning(f"리소스 차단 목록 적용 실패: {str(e)}")
+
+    def reset(self):
+        """드라이버 재시작 시 적용 상태 초기화"""
+        self.current_patterns = None
+
+    def ready_states(self):
+        """페이지 로드 완료로 간주할 document.readyState 값"""
+        if self.enabled and self.policy.get("page_load_strategy") == "eager":
+            return ("interactive", "complete")
+        return ("complete",)
@@ -0,0 +1,199 @@
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from config import CRAWLING
+from utils.logger import setup_logger
+from utils.page_events import PageChallenge
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+# 실패 분류
+TRANSIENT = "transient"  # 일시적 오류 (타임아웃, 연결 끊김, stale 요소, 빈 페이지) - 짧은 대기 후 재시도
+BLOCK = "block"  # 차단 (캡차, 로그인 요구, 503) - 같은 세션에서 재시도하지 않고 차단기에 기록
+PERMANENT = "permanent"  # 재시도해도 결과가 같은 오류 (없는 상품, 잘못된 URL)
+
+# 페이지 판정 결과별 분류
+PAGE_TYPE_CLASSES = {
+    "captcha": BLOCK,
+    "login": BLOCK,
+    "unavailable": BLOCK,
+    "error": PERMANENT,
+}
+
+
+def classify_error(error, default=PERMANENT):
+    """예외를 실패 분류로 변환 (알 수 없는 예외는 default)"""
+    # Selenium은 크롤링 중에만 필요하므로 여기서 가져옴 (main 시작 시간에 포함되지 않도록)
+    from selenium.common.exceptions import (
+        InvalidArgumentException,
+        StaleElementReferenceException,
+        TimeoutException,
+        WebDriverException,
+    )
+    
+    if isinstance(error, PageChallenge):
+        return BLOCK
+    if isinstance(error, InvalidArgumentException):
+        return PERMANENT
+    if isinstance(error, (TimeoutException, StaleElementReferenceException, WebDriverException,
+                          ConnectionError, TimeoutError)):
+        return TRANSIENT
+    return default
+
+
+def classify_page_type(page_type):
+    """페이지를 열지 못했을 때 판정된 페이지 유형으로 실패 분류 (알 수 없으면 일시적 오류)"""
+    return PAGE_TYPE_CLASSES.get(page_type, TRANSIENT)
+
+
+class RetryPolicy:
+    """실패 분류별 재시도 횟수와 지터를 넣은 지수 백오프 (CRAWLING["retry"])"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or CRAWLING["retry"]
+
+    def max_attempts(self, failure_class):
+        return self.settings.get(failure_class, {}).get("max_attempts", 0)
+
+    def should_retry(self, failure_class, attempt):
+        """attempt번째 재시도(0부터)를 해도 되는지"""
+        return attempt < self.max_attempts(failure_class)
+
+    def delay(self, failure_class, attempt):
+        """재시도 전 대기 시간(초): base_delay × backoff_factor^attempt (최대 max_delay, ±jitter)"""
+        rule = self.settings.get(failure_class, {})
+        delay = min(rule.get("max_delay", 60), rule.get("base_delay", 1.0) * rule.get("backoff_factor", 2) ** attempt)
+        jitter = self.settings.get("jitter", 0.2)
+        return delay * random.uniform(1 - jitter, 1 + jitter)
+
+    def call(self, fn, *args, failure_class=TRANSIENT, describe=None, **kwargs):
+        """fn 실행, 지정한 분류의 예외면 정책에 따라 재시도 (stale 요소 등 세션 안에서 해결되는 오류용)"""
+        attempt = 0
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if classify_error(e) != failure_class or not self.should_retry(failure_class, attempt):
+                    raise
+                wait_time = self.delay(failure_class, attempt)
+                logger.warning(f"{describe or getattr(fn, '__name__', 'call')} 재시도 {attempt + 1}회 "
+                               f"({type(e).__name__}, {wait_time:.1f}초 후)")
+                run_report.add_sample(f"retry.{failure_class}", 1)
+                time.sleep(wait_time)
+                attempt += 1
+
+
+class CircuitOpen(Exception):
+    """차단기가 열려 요청을 보내지 않음 (스케줄러가 작업을 retry_after초 뒤로 미룸)"""
+
+    def __init__(self, key, retry_after):
+        super().__init__(f"circuit open for {key} (retry after {retry_after:.0f}s)")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """호스트/페이지 유형 하나의 차단기
+
+    최근 window개 요청 중 실패 비율이 failure_rate 이상이면 열리고(요청 차단) cooldown 뒤 요청 하나만
+    시험으로 보낸다. 시험 요청이 성공하면 닫히고, 실패하면 대기 시간을 두 배로 늘려 다시 열린다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, key, settings=None):
+        self.key = key
+        self.settings = settings or CRAWLING["circuit_breaker"]
+        self.outcomes = deque(maxlen=self.settings["window"])
+        self.state = self.CLOSED
+        self.cooldown = self.settings["cooldown"]
+        self.open_until = 0.0
+        self.probing = False
+        self.probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self, now=None):
+        """요청을 보내도 되는지. 안 되면 다시 시도할 수 있을 때까지 남은 시간(초)으로 CircuitOpen 발생"""
+        now = now or time.time()
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and now >= self.open_until:
+                self.state = self.HALF_OPEN
+                self.probing = False
+            # 결과가 기록되지 않은 시험 요청(호출 측 예외 등)이 cooldown을 넘기면 다음 시험 요청 허용
+            if self.state == self.HALF_OPEN and (not self.probing or now - self.probe_started >= self.cooldown):
+                self.probing = True
+                self.probe_started = now
+                logger.info(f"차단기 시험 요청: {self.key}")
+                return True
+            if self.state == self.HALF_OPEN:
+                retry_after = max(self.probe_started + self.cooldown - now, 1.0)
+            else:
+                retry_after = max(self.open_until - now, 1.0)
+        raise CircuitOpen(self.key, retry_after)
+
+    def record(self, ok, now=None):
+        """요청 결과 기록 (일시적 오류/차단만 실패로 기록)"""
+        now = now or time.time()
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.probing = False
+                if ok:
+                    self.state = self.CLOSED
+                    self.cooldown = self.settings["cooldown"]
+                    self.outcomes.clear()
+                    logger.info(f"차단기 닫힘: {self.key}")
+                else:
+                    self.cooldown = min(self.cooldown * 2, self.settings["max_cooldown"])
+                    self._open(now)
+                return
+
+            self.outcomes.append(ok)
+            if self.state == self.CLOSED and len(self.outcomes) >= self.settings["min_calls"]:
+                failures = self.outcomes.count(False)
+                if failures / len(self.outcomes) >= self.settings["failure_rate"]:
+                    self._open(now)
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.open_until = now + self.cooldown
+        run_report.add_sample("circuit_open", 1)
+        logger.warning(f"차단기 열림: {self.key} (최근 {len(self.outcomes)}개 중 실패 {self.outcomes.count(False)}개, "
+                       f"{self.cooldown:.0f}초 동안 요청 중단)")
+
+
+class CircuitBreakers:
+    """호스트 + 페이지 유형별 차단기 모음"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or CRAWLING["circuit_breaker"]
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(url, page_type=None):
+        return f"{urlparse(url).netloc.lower()}/{page_type or 'other'}"
+
+    def get(self, url, page_type=None):
+        key = self.key_for(url, page_type)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(key, self.settings)
+        return breaker
+
+    def states(self):
+        with self._lock:
+            return {key: breaker.state for key, breaker in self._breakers.items()}
+
+
+# 프로세스 전역 재시도 정책과 차단기 (모든 세션이 같은 호스트 상태를 공유)
+retry_policy = RetryPolicy()
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from config import DATA_DIR, ensure_dir
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RunReport:
+    """크롤링 실행 중 수집한 성능 지표 모음 (실행 종료 시 JSON으로 저장)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.metrics = {}
+        self.samples = {}
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def record(self, section, key, value):
+        """단일 지표 기록"""
+        with self._lock:
+            self.metrics.setdefault(section, {})[key] = value
+
+    def add_sample(self, name, value):
+        """반복 측정값 기록 (요약 통계로 보고)"""
+        with self._lock:
+            self.samples.setdefault(name, []).append(value)
+
+    def add_point(self, name, point, max_points=500):
+        """시계열 지점 기록 (최대 개수를 넘으면 한 칸씩 건너뛰어 절반으로 줄임)"""
+        with self._lock:
+            points = self.series.setdefault(name, [])
+            points.append(point)
+            if len(points) > max_points:
+                del points[1::2]
+
+    def summarize(self, name):
+        """반복 측정값 요약 통계"""
+        with self._lock:
+            values = sorted(self.samples.get(name, []))
+
+        if not values:
+            return None
+
+        return {
+            "count": len(values),
+            "min": round(values[0], 3),
+            "median": round(values[len(values) // 2], 3),
+            "max": round(values[-1], 3),
+            "mean": round(sum(values) / len(values), 3),
+        }
+
+    def to_dict(self):
+        """보고서를 딕셔너리로 변환"""
+        with self._lock:
+            metrics = {section: dict(values) for section, values in self.metrics.items()}
+            sample_names = list(self.samples)
+            series = {name: list(points) for name, points in self.series.items()}
+
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed": round(time.time() - self.started_at, 3),
+            "metrics": metrics,
+            "samples": {name: self.summarize(name) for name in sample_names},
+            "series": series,
+        }
+
+    def save(self, file_path=None):
+        """보고서를 JSON 파일로 저장"""
+        if file_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            file_path = os.path.join(ensure_dir(DATA_DIR), f"run_report_{timestamp}.json")
+
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            logger.info(f"실행 보고서 저장: {file_path}")
+            return file_path
+        except OSError as e:
+            logger.error(f"실행 보고서 저장 실패: {str(e)}")
+            return None
+
+
+# 프로세스 전역 보고서
+run_report = RunReport()
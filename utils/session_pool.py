@@ -0,0 +1,199 @@
+import importlib
+import queue
+import threading
+import time
+
+from config import BROWSER, CHALLENGE, PROXIES
+from utils.logger import setup_logger
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+
+def load_operator_hook():
+    """CHALLENGE["operator_hook"] ("모듈:함수" 또는 호출 가능 객체) 로드"""
+    hook = CHALLENGE.get("operator_hook")
+    if hook is None or callable(hook):
+        return hook
+
+    module_name, _, func_name = hook.partition(":")
+    try:
+        return getattr(importlib.import_module(module_name), func_name)
+    except (ImportError, AttributeError) as e:
+        logger.error(f"운영자 훅 로드 실패 ({hook}): {str(e)}")
+        return None
+
+
+class SessionPool:
+    """브라우저 세션 풀 (유휴 세션을 백그라운드에서 미리 실행해 두고 작업에 즉시 할당)"""
+
+    def __init__(self, size=None, prewarm=None, factory=None):
+        self.size = size or BROWSER["max_sessions"]
+        self.prewarm = min(BROWSER["prewarm_sessions"] if prewarm is None else prewarm, self.size)
+        self.factory = factory or self._default_factory
+        self.proxy_rotator = None
+        self.idle = queue.Queue()
+        self.sessions = []
+        self._launching = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _default_factory(self):
+        """새 브라우저 세션 생성 (프록시가 설정된 경우 세션마다 다른 프록시 사용)"""
+        from utils.browser_manager import BrowserManager
+
+        proxy = None
+        if PROXIES:
+            if self.proxy_rotator is None:
+                from utils.proxy_rotator import ProxyRotator
+                self.proxy_rotator = ProxyRotator()
+                proxy = self.proxy_rotator.get_proxy()
+            else:
+                self.proxy_rotator.rotate_proxy()
+                proxy = self.proxy_rotator.current_proxy
+        return BrowserManager(proxy=proxy)
+
+    def start(self):
+        """prewarm 수만큼 세션을 백그라운드 스레드에서 실행"""
+        for _ in range(self.prewarm):
+            self._launch_async()
+        return self
+
+    def _launch_async(self):
+        """세션 하나를 백그라운드에서 실행해 유휴 큐에 추가"""
+        with self._lock:
+            if self._closed or len(self.sessions) + self._launching >= self.size:
+                return False
+            self._launching += 1
+
+        thread = threading.Thread(target=self._launch_into_idle, daemon=True)
+        thread.start()
+        return True
+
+    def _launch_into_idle(self):
+        try:
+            session = self._launch()
+        except Exception as e:
+            logger.error(f"브라우저 세션 사전 실행 실패: {str(e)}")
+            self.idle.put(None)  # 대기 중인 acquire가 직접 실행하도록 알림
+            return
+        finally:
+            with self._lock:
+                self._launching -= 1
+        self.idle.put(session)
+
+    def _launch(self):
+        """세션 실행 및 등록"""
+        session = self.factory()
+        with self._lock:
+            self.sessions.append(session)
+            closed = self._closed
+        if closed:
+            self._discard(session)
+            raise RuntimeError("Session pool is closed")
+        return session
+
+    def acquire(self, timeout=None):
+        """유휴 세션 할당 (없으면 실행 중인 세션을 기다리거나 새로 실행)"""
+        wait_start = time.time()
+        session = None
+
+        try:
+            session = self.idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_launch = len(self.sessions) + self._launching < self.size
+                pending = self._launching > 0
+
+            if can_launch and not pending:
+                session = self._launch()
+            else:
+                try:
+                    session = self.idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError("No browser session available")
+
+        if session is None:
+            session = self._launch()
+
+        acquired = time.time()
+        run_report.add_sample("session_acquire_wait", acquired - wait_start)
+        session.request_origin = acquired
+        session.first_request_at = None
+
+        # 사용한 만큼 다음 세션을 미리 준비
+        if self.idle.qsize() + self._launching < self.prewarm:
+            self._launch_async()
+
+        return session
+
+    def release(self, session):
+        """세션 반납 (degraded 세션은 격리 후 교체)"""
+        if session is None:
+            return
+        if self._closed:
+            self._discard(session)
+        elif getattr(session, "dead", False):
+            # 워치독이 종료했거나 드라이버가 죽은 세션은 교체
+            self.discard(session)
+        elif getattr(session, "degraded", False):
+            self.quarantine(session, getattr(session, "last_challenge", None))
+        else:
+            self.idle.put(session)
+
+    def quarantine(self, session, event=None):
+        """degraded 세션을 풀에서 빼고 대체 세션 실행. 운영자 훅이 있으면 비동기로 해결 시도"""
+        hook = load_operator_hook()
+        if hook is None:
+            self.discard(session)
+            return
+
+        # 해결되는 동안 다른 작업자가 쓸 세션을 미리 준비
+        with self._lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+        if self.idle.qsize() + self._launching < max(self.prewarm, 1):
+            self._launch_async()
+
+        def resolve():
+            try:
+                resolved = hook(event, session)
+            except Exception as e:
+                logger.error(f"운영자 훅 실행 중 오류: {str(e)}")
+                resolved = False
+
+            if resolved and not self._closed:
+                logger.info(f"세션 {getattr(session, 'session_id', '')} 복구됨, 풀로 반환")
+                session.degraded = False
+                with self._lock:
+                    self.sessions.append(session)
+                self.idle.put(session)
+            else:
+                self._discard(session)
+
+        threading.Thread(target=resolve, name="challenge-operator", daemon=True).start()
+
+    def discard(self, session):
+        """세션 폐기 (손상된 세션 등)"""
+        self._discard(session)
+        if not self._closed and self.idle.qsize() + self._launching < self.prewarm:
+            self._launch_async()
+
+    def _discard(self, session):
+        with self._lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+        try:
+            session.close()
+        except Exception as e:
+            logger.warning(f"세션 종료 중 오류: {str(e)}")
+
+    def close(self):
+        """모든 세션 종료"""
+        with self._lock:
+            self._closed = True
+            sessions = list(self.sessions)
+
+        for session in sessions:
+            self._discard(session)
+        logger.info("Session pool closed")
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+from config import CRAWLING
+from utils.asin_set import asin_from_url, product_url
+from utils.logger import setup_logger
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+# 결과에 영향이 없는 추적용 쿼리 파라미터
+TRACKING_PARAMS = ("ref", "ref_", "pf_rd_", "pd_rd_", "qid", "sr", "th", "psc", "content-id", "_encoding", "crid", "sprefix")
+
+
+def normalize_url(url):
+    """같은 페이지를 가리키는 URL을 하나의 키로 정규화
+
+    상품 URL은 표준 /dp/ASIN 형식으로, 그 외에는 추적 파라미터/경로의 ref 조각/프래그먼트를 제거한다.
+    """
+    if "/product-reviews/" not in url:
+        asin = asin_from_url(url)
+        if asin:
+            return product_url(asin)
+
+    parts = urlparse(url)
+    path = parts.path.split("/ref=")[0].rstrip("/")
+    query = sorted((key, value) for key, value in parse_qsl(parts.query)
+                   if not key.startswith(TRACKING_PARAMS))
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, "", urlencode(query), ""))
+
+
+class ResultCache:
+    """최근 수집 결과 캐시 (LRU + 만료 시간)"""
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries or CRAWLING["result_cache_size"]
+        self.ttl = CRAWLING["result_cache_ttl"] if ttl is None else ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(적중 여부, 값)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 키의 동시 수집을 하나로 합침
+
+    이미 수집 중인 키를 요청한 작업자는 새로 요청하지 않고 끝날 때까지 기다린 뒤 같은 결과를 사용한다.
+    성공한 결과는 캐시에 넣어 같은 실행 안의 이후 요청도 재사용한다. 먼저 수집하던 작업자가 실패하면
+    기다리던 작업자가 직접 다시 시도한다.
+    """
+
+    def __init__(self, cache=None, wait_timeout=None):
+        self.cache = cache
+        self.wait_timeout = CRAWLING["single_flight_wait"] if wait_timeout is None else wait_timeout
+        self.stats = {"fetched": 0, "shared": 0, "cached": 0}
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fetch, use_cache=True):
+        """fetch()를 키당 하나만 실행. (결과, 다른 작업의 결과를 공유했는지) 반환
+
+        결과가 거짓 값(None, False 등)이면 실패로 보고 공유하거나 캐시하지 않는다.
+        """
+        while True:
+            with self._lock:
+                if use_cache and self.cache is not None:
+                    hit, value = self.cache.get(key)
+                    if hit:
+                        self.stats["cached"] += 1
+                        return value, True
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+
+            if leader:
+                return self._run(key, call, fetch), False
+
+            logger.info(f"수집 중인 요청을 기다립니다: {key}")
+            if not call.event.wait(self.wait_timeout):
+                # 먼저 시작한 작업이 멈춘 경우 기다리지 않고 직접 수집
+                logger.warning(f"대기 시간 초과, 직접 수집합니다: {key}")
+                self.stats["fetched"] += 1
+                return fetch(), False
+            if call.error is None and call.result:
+                self.stats["shared"] += 1
+                run_report.record("single_flight", "stats", dict(self.stats))
+                return call.result, True
+            # 실패한 경우 다시 시도 (이번에는 직접 수집할 수 있음)
+
+    def _run(self, key, call, fetch):
+        try:
+            call.result = fetch()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.stats["fetched"] += 1
+                if call.error is None and call.result and self.cache is not None:
+                    self.cache.put(key, call.result)
+            call.event.set()
+            run_report.record("single_flight", "stats", dict(self.stats))
+
+
+# 실행 전체에서 공유하는 수집 결과 합치기/캐시
+fetch_flights = SingleFlight(ResultCache())
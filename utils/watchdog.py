@@ -0,0 +1,119 @@
+import itertools
+import threading
+import time
+
+from config import SCHEDULER
+from utils.logger import setup_logger
+from utils.run_report import run_report
+
+logger = setup_logger(__name__)
+
+
+class Watchdog:
+    """작업별 실행 시간 감시
+
+    - 작업 종류별 제한 시간(SCHEDULER["job_deadline"])을 넘기면 해당 세션의 브라우저 프로세스를 강제 종료한다.
+      멈춰 있던 Selenium 호출은 오류로 끝나고, 스케줄러가 작업을 다시 큐에 넣고 세션을 교체한다.
+    - 완료된 작업 시간의 중앙값 × stuck_factor를 넘긴 세션은 멈춘 세션으로 기록한다.
+    """
+
+    def __init__(self, deadlines=None, interval=None, stuck_factor=None, min_samples=None):
+        self.deadlines = deadlines or SCHEDULER["job_deadline"]
+        self.interval = interval or SCHEDULER["watchdog_interval"]
+        self.stuck_factor = stuck_factor or SCHEDULER["stuck_factor"]
+        self.min_samples = min_samples or SCHEDULER["stuck_min_samples"]
+        self.active = {}  # token -> 감시 항목
+        self.durations = {}  # 작업 종류 -> 최근 완료 시간 목록
+        self.stats = {"killed": 0, "stuck": 0}
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """감시 스레드 시작"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="crawl-watchdog", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        run_report.record("watchdog", "stats", dict(self.stats))
+
+    def deadline_for(self, kind):
+        return self.deadlines.get(kind) or self.deadlines.get("default")
+
+    def watch(self, job, session):
+        """작업 감시 시작 (finish에 넘길 토큰 반환)"""
+        token = next(self._tokens)
+        with self._lock:
+            self.active[token] = {
+                "job": job,
+                "session": session,
+                "started": time.time(),
+                "deadline": self.deadline_for(job.kind),
+                "killed": False,
+                "stuck": False,
+            }
+        return token
+
+    def finish(self, token):
+        """작업 감시 종료. 제한 시간 초과로 세션을 종료했으면 True"""
+        with self._lock:
+            entry = self.active.pop(token, None)
+        if entry is None:
+            return False
+        if not entry["killed"]:
+            durations = self.durations.setdefault(entry["job"].kind, [])
+            durations.append(time.time() - entry["started"])
+            del durations[:-200]  # 최근 200개만 유지
+        return entry["killed"]
+
+    def median(self, kind):
+        """작업 종류의 완료 시간 중앙값 (표본이 부족하면 None)"""
+        values = sorted(self.durations.get(kind, []))
+        if len(values) < self.min_samples:
+            return None
+        return values[len(values) // 2]
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"워치독 확인 중 오류: {str(e)}")
+
+    def check(self, now=None):
+        """제한 시간 초과 세션 종료 및 멈춘 세션 기록"""
+        now = now or time.time()
+        with self._lock:
+            entries = list(self.active.values())
+
+        for entry in entries:
+            elapsed = now - entry["started"]
+            job, session = entry["job"], entry["session"]
+            session_id = getattr(session, "session_id", None)
+
+            median = self.median(job.kind)
+            if not entry["stuck"] and median and elapsed > median * self.stuck_factor:
+                entry["stuck"] = True
+                self.stats["stuck"] += 1
+                logger.warning(f"세션 {session_id}가 작업 {job.job_id}에서 {elapsed:.0f}초째 진행 중 "
+                               f"(중앙값 {median:.0f}초의 {self.stuck_factor}배 초과)",
+                               extra={"job_id": job.job_id, "session_id": session_id, "duration": round(elapsed, 1)})
+                run_report.add_sample("watchdog.stuck_elapsed", elapsed)
+
+            if not entry["killed"] and entry["deadline"] and elapsed > entry["deadline"]:
+                entry["killed"] = True
+                self.stats["killed"] += 1
+                logger.error(f"작업 {job.job_id} 제한 시간 {entry['deadline']}초 초과, 세션 {session_id} 강제 종료",
+                             extra={"job_id": job.job_id, "session_id": session_id, "url": job.target,
+                                    "duration": round(elapsed, 1)})
+                try:
+                    session.kill()
+                except Exception as e:
+                    logger.error(f"세션 강제 종료 실패: {str(e)}")